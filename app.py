@@ -1,33 +1,64 @@
+import click
 from flask import Flask
 from flask_restful import Api
 from flask_migrate import Migrate
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
+from werkzeug.middleware.proxy_fix import ProxyFix
 from dotenv import load_dotenv
 from config import Config
 from routes.booking_routes import (
     AccommodationBookingResource, TransportBookingResource, 
     AccommodationBookingByID, TransportBookingByID,
     HostBookingsResource, HostAccommodationBookingsResource,
-    DriverBookingsResource, DriverTransportBookingsResource
+    DriverBookingsResource, DriverTransportBookingsResource,
+    HostBookingChangesResource, DriverBookingChangesResource
 )
 from extensions import db, bcrypt, jwt
 import models 
 # Importing routes
 from routes.auth_routes import auth_bp
-from routes.accommodation_routes import AccommodationResource
-from routes.transport import TransportResource
+from routes.accommodation_routes import AccommodationResource, AccommodationBulkResource, SimilarAccommodationsResource
+from routes.transport import TransportResource, TransportAvailabilityResource, TransportBulkResource
+from routes.stream_routes import HostBookingStreamResource, DriverBookingStreamResource
+from routes.hold_routes import HoldResource
+from routes.export_routes import HostBookingExportResource, DriverBookingExportResource
+from routes.trip_routes import MyTripsResource
+from routes.itinerary_routes import ItineraryResource
+from routes.analytics_routes import HostOccupancyResource, DriverUtilizationResource
+from routes.audit_routes import AuditEventsResource
+from services import events
+from services.archive import archive_bookings
+from services import partitions, db_routing, sharding, booking_view, slow_queries, rate_limit, similarity, audit
+from services.representation import output_json
+from services.jobs import worker as job_worker
+import services.notifications  # registers background job handlers
+import services.inventory  # registers the expired-hold sweeper
 
 
 load_dotenv()
 
 app = Flask(__name__)
 app.config.from_object(Config)
+# Behind a proxy every request would otherwise come from the proxy's address,
+# putting all anonymous clients in one rate limit bucket
+if app.config["PROXY_COUNT"]:
+    hops = app.config["PROXY_COUNT"]
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops, x_host=hops)
 
+db_routing.init_app(app)
+sharding.init_app(app)
 db.init_app(app)
 bcrypt.init_app(app)
-migrate = Migrate(app, db)
+# include_schemas: archived bookings live in the separate "archive" schema
+migrate = Migrate(app, db, include_schemas=True)
 jwt.init_app(app)
+job_worker.init_app(app)
+events.init_app(app)
+partitions.init_app(app)
+slow_queries.init_app(app)
+rate_limit.init_app(app)
+audit.init_app(app)
 
 # Parse CORS_ORIGINS from string to list
 cors_origins = app.config.get("CORS_ORIGINS", "")
@@ -36,6 +67,8 @@ if isinstance(cors_origins, str):
 
 CORS(app, supports_credentials=True, origins=cors_origins)
 api = Api(app)
+# Fast orjson encoder (handles dates natively) with gzip/brotli for large bodies
+api.representations['application/json'] = output_json
 
 app.register_blueprint(auth_bp, url_prefix="/auth")
 
@@ -43,22 +76,87 @@ api.add_resource(TransportBookingResource, '/transport_bookings')
 api.add_resource(TransportBookingByID, '/transport_bookings/<int:id>')
 api.add_resource(AccommodationBookingResource, '/accommodation_bookings')
 api.add_resource(AccommodationBookingByID, '/accommodation_bookings/<int:id>')
+api.add_resource(HoldResource, '/holds', '/holds/<int:id>')
+api.add_resource(MyTripsResource, '/me/trips')
+api.add_resource(ItineraryResource, '/itineraries', '/itineraries/<int:id>')
+api.add_resource(AuditEventsResource, '/audit/events')
 
 # Host booking routes
 api.add_resource(HostBookingsResource, '/host/bookings')
+api.add_resource(HostBookingChangesResource, '/host/bookings/changes')
+api.add_resource(HostBookingStreamResource, '/host/bookings/stream')
+api.add_resource(HostBookingExportResource, '/host/bookings/export')
+api.add_resource(HostOccupancyResource, '/host/occupancy')
 api.add_resource(HostAccommodationBookingsResource, '/host/accommodations/<int:accommodation_id>/bookings')
 
 # Driver booking routes
 api.add_resource(DriverBookingsResource, '/driver/bookings')
+api.add_resource(DriverBookingChangesResource, '/driver/bookings/changes')
+api.add_resource(DriverBookingStreamResource, '/driver/bookings/stream')
+api.add_resource(DriverBookingExportResource, '/driver/bookings/export')
+api.add_resource(DriverUtilizationResource, '/driver/utilization')
 api.add_resource(DriverTransportBookingsResource, '/driver/transports/<int:transport_id>/bookings')
 
 # Register Routes
 api.add_resource(AccommodationResource, '/accommodations', '/accommodations/<int:id>')
 api.add_resource(TransportResource, '/transports', '/transports/<int:id>')
+api.add_resource(TransportAvailabilityResource, '/transports/available')
+api.add_resource(AccommodationBulkResource, '/accommodations/bulk')
+api.add_resource(SimilarAccommodationsResource, '/accommodations/<int:id>/similar')
+api.add_resource(TransportBulkResource, '/transports/bulk')
 
 @app.route("/")
 def health_check():
     return {"status": "SafariConnect API running"}, 200
 
+# Rolls past bookings over into the archive schema (monthly partitions on
+# Postgres, attached archive database on SQLite). Run from cron, e.g.
+# nightly: flask archive-bookings --days 90
+@app.cli.command("archive-bookings")
+@click.option("--days", default=90, show_default=True, help="Archive bookings finished or cancelled more than this many days ago.")
+@click.option("--batch-size", default=1000, show_default=True)
+def archive_bookings_command(days, batch_size):
+    """Move old cancelled and completed bookings to the archive tables"""
+    results = sharding.each_database(lambda: archive_bookings(days, batch_size))
+    for region, (accommodation_count, transport_count) in results:
+        click.echo(f"[{region}] Archived {accommodation_count} accommodation and {transport_count} transport bookings")
+
+
+@app.cli.command("rebuild-booking-view")
+def rebuild_booking_view_command():
+    """Regenerate the booking_view read model from the booking tables"""
+    for region, count in sharding.each_database(booking_view.rebuild):
+        click.echo(f"[{region}] Rebuilt booking_view with {count} rows")
+
+
+@app.cli.command("rebuild-similar")
+def rebuild_similar_command():
+    """Recompute the similar-accommodation lists for every listing"""
+    if not similarity.available():
+        raise click.ClickException("numpy is required: pipenv install numpy")
+    for region, count in sharding.each_database(similarity.rebuild):
+        click.echo(f"[{region}] Computed similar accommodations for {count} listings")
+
+
+# New region shards, e.g. for a local multi-shard setup:
+#   SHARD_DATABASE_URLS=tz=sqlite:///tz.db,ug=sqlite:///ug.db flask init-shards
+# The primary keeps using `flask db upgrade`.
+@app.cli.command("init-shards")
+def init_shards_command():
+    """Create the listing and booking tables on every shard database"""
+    for region, engine in sharding.shard_engines().items():
+        sharding.create_shard_tables(engine)
+        click.echo(f"[{region}] Created tables on {engine.url.render_as_string(hide_password=True)}")
+
+
+# Local two-file replica setup, e.g.
+#   DATABASE_URL=sqlite:///primary.db REPLICA_DATABASE_URLS=sqlite:///replica.db
+# GET reads then come from replica.db, which only changes when this is run.
+@app.cli.command("sync-replicas")
+def sync_replicas_command():
+    """Copy the SQLite primary into the replica files (development only)"""
+    for url in db_routing.copy_sqlite_primary_to_replicas():
+        click.echo(f"Synced {url}")
+
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
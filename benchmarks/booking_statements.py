@@ -0,0 +1,155 @@
+"""Compare the booking-create availability checks: the same SQL built per call vs services/statements.py.
+
+Run from the repo root:  python benchmarks/booking_statements.py [calls]
+Uses an in-memory SQLite database with a few rows, so the timings are
+almost all Python-side statement building, cache-key lookup and result
+handling. Both sides run identical SQL through the same execute() path, so
+the difference is only what reusing the prebuilt statement saves.
+"""
+import os
+import sys
+import timeit
+from datetime import date, datetime
+
+from sqlalchemy import bindparam
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ["ARCHIVE_DATABASE_PATH"] = ":memory:"
+os.environ["JOBS_ENABLED"] = "false"
+
+import config  # noqa: E402
+config.Config.SQLALCHEMY_ECHO = False
+
+from app import app  # noqa: E402
+from extensions import db  # noqa: E402
+from models import User, Accommodation, Transport, AccommodationBooking, TransportBooking, InventoryHold  # noqa: E402
+from services import inventory, statements  # noqa: E402
+
+
+def seed():
+    db.create_all()
+    host = User(name='host', email='host@example.com', role='host', password_hash='x')
+    driver = User(name='driver', email='driver@example.com', role='driver', password_hash='x')
+    tourist = User(name='tourist', email='tourist@example.com', role='tourist', password_hash='x')
+    db.session.add_all([host, driver, tourist])
+    db.session.flush()
+    stay = Accommodation(title='Camp', description='Tented camp', location='Mara', price_per_night=100,
+                         capacity=2, host_id=host.id)
+    van = Transport(vehicle_type='van', price_per_day=50, total_capacity=7, driver_id=driver.id)
+    db.session.add_all([stay, van])
+    db.session.flush()
+    db.session.add_all([
+        AccommodationBooking(accommodation_id=stay.id, tourist_id=tourist.id, check_in_date=date(2030, 1, 1),
+                             check_out_date=date(2030, 1, 4), total_price=300),
+        TransportBooking(transport_id=van.id, tourist_id=tourist.id, travel_date=date(2030, 1, 1),
+                         seats_booked=2, total_price=50),
+    ])
+    db.session.commit()
+    return stay.id, van.id
+
+
+# The statements of services/statements.py, built afresh on every call
+
+def build_lock_transport():
+    return db.select(Transport).where(Transport.id == bindparam('transport_id')).with_for_update()
+
+
+def build_seats_taken():
+    return db.select(
+        db.select(db.func.coalesce(db.func.sum(TransportBooking.seats_booked), 0)).where(
+            TransportBooking.transport_id == bindparam('transport_id'),
+            TransportBooking.travel_date == bindparam('travel_date'),
+            TransportBooking.live(),
+            TransportBooking.id != bindparam('except_booking_id')
+        ).scalar_subquery()
+        + db.select(db.func.coalesce(db.func.sum(InventoryHold.seats), 0)).where(
+            InventoryHold.transport_id == bindparam('transport_id'),
+            InventoryHold.travel_date == bindparam('travel_date'),
+            InventoryHold.active(bindparam('now'))
+        ).scalar_subquery()
+    )
+
+
+def build_dates_taken():
+    return db.select(
+        db.exists().where(
+            AccommodationBooking.accommodation_id == bindparam('accommodation_id'),
+            AccommodationBooking.check_in_date < bindparam('check_out_date'),
+            AccommodationBooking.check_out_date > bindparam('check_in_date'),
+            AccommodationBooking.live(),
+            AccommodationBooking.id != bindparam('except_booking_id')
+        )
+        | db.exists().where(
+            InventoryHold.accommodation_id == bindparam('accommodation_id'),
+            InventoryHold.check_in_date < bindparam('check_out_date'),
+            InventoryHold.check_out_date > bindparam('check_in_date'),
+            InventoryHold.active(bindparam('now'))
+        )
+    )
+
+
+def same_sql(built, prebuilt):
+    return str(built.compile(db.engine)) == str(prebuilt.compile(db.engine))
+
+
+def old_transport_check(transport_id, travel_date):
+    transport = db.session.execute(build_lock_transport(), {'transport_id': transport_id}).scalars().first()
+    taken = db.session.execute(build_seats_taken(), {
+        'transport_id': transport_id, 'travel_date': travel_date, 'now': datetime.utcnow(),
+        'except_booking_id': 0
+    }).scalar()
+    return transport.total_capacity - taken
+
+
+def old_stay_check(accommodation_id, check_in_date, check_out_date):
+    return bool(db.session.execute(build_dates_taken(), {
+        'accommodation_id': accommodation_id, 'check_in_date': check_in_date,
+        'check_out_date': check_out_date, 'now': datetime.utcnow(), 'except_booking_id': 0
+    }).scalar())
+
+
+def new_transport_check(transport_id, travel_date):
+    transport = inventory.lock_transport(transport_id)
+    return transport.total_capacity - inventory.seats_taken(transport_id, travel_date)
+
+
+def new_stay_check(accommodation_id, check_in_date, check_out_date):
+    return inventory.dates_taken(accommodation_id, check_in_date, check_out_date)
+
+
+def best_us(func, calls, repeat=5):
+    return min(timeit.repeat(func, number=calls, repeat=repeat)) / calls * 1e6
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    with app.app_context():
+        stay_id, van_id = seed()
+        assert same_sql(build_lock_transport(), statements.LOCK_TRANSPORT)
+        assert same_sql(build_seats_taken(), statements.SEATS_TAKEN)
+        assert same_sql(build_dates_taken(), statements.DATES_TAKEN)
+        day, check_in, check_out = date(2030, 1, 1), date(2030, 1, 2), date(2030, 1, 3)
+        assert old_transport_check(van_id, day) == new_transport_check(van_id, day) == 5
+        assert old_stay_check(stay_id, check_in, check_out) is new_stay_check(stay_id, check_in, check_out) is True
+
+        def run(func, *args):
+            # Expire the identity map like a new request would, so the lock query really runs
+            def call():
+                func(*args)
+                db.session.expire_all()
+            return best_us(call, calls)
+
+        print(f"per call, best of 5 x {calls}")
+        for label, old, new, args in (
+            ("transport booking (lock + seat sum)", old_transport_check, new_transport_check, (van_id, day)),
+            ("accommodation booking (overlap)", old_stay_check, new_stay_check, (stay_id, check_in, check_out)),
+        ):
+            old_us, new_us = run(old, *args), run(new, *args)
+            print(f"  {label}")
+            print(f"    built per call:        {old_us:8.1f} us")
+            print(f"    prebuilt statements:   {new_us:8.1f} us  ({old_us - new_us:+.1f} us saved)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Compare booking-list JSON encoding: stdlib json + manual isoformat vs orjson.
+
+Run from the repo root:  python benchmarks/json_encoding.py [rows]
+Needs no database; the bookings are generated in memory.
+"""
+import gzip
+import json
+import sys
+import timeit
+from datetime import date, datetime, timedelta
+
+import orjson
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def make_bookings(n):
+    start = date(2026, 1, 1)
+    created = datetime(2025, 12, 1, 9, 30, 15, 123456)
+    return [{
+        'id': i,
+        'tourist_id': i % 500,
+        'accommodation_id': i % 80,
+        'check_in_date': start + timedelta(days=i % 365),
+        'check_out_date': start + timedelta(days=i % 365 + 3),
+        'total_price': 150.0 + i % 40,
+        'status': ('pending', 'confirmed', 'cancelled')[i % 3],
+        'created_at': created + timedelta(minutes=i),
+        'updated_at': created + timedelta(minutes=i, seconds=30),
+    } for i in range(n)]
+
+
+def old_encode(bookings):
+    # What the resources used to do: isoformat every date, then stdlib json
+    return json.dumps([{
+        'id': b['id'],
+        'tourist_id': b['tourist_id'],
+        'accommodation_id': b['accommodation_id'],
+        'check_in_date': b['check_in_date'].isoformat() if b['check_in_date'] else None,
+        'check_out_date': b['check_out_date'].isoformat() if b['check_out_date'] else None,
+        'total_price': b['total_price'],
+        'status': b['status'],
+        'created_at': b['created_at'].isoformat() if b['created_at'] else None,
+        'updated_at': b['updated_at'].isoformat() if b['updated_at'] else None,
+    } for b in bookings]).encode()
+
+
+def new_encode(bookings):
+    return orjson.dumps(bookings)
+
+
+def best_ms(func, arg, number=5, repeat=5):
+    return min(timeit.repeat(lambda: func(arg), number=number, repeat=repeat)) / number * 1000
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    bookings = make_bookings(rows)
+    old_body, new_body = old_encode(bookings), new_encode(bookings)
+    assert json.loads(old_body) == json.loads(new_body), "encoders disagree"
+
+    print(f"{rows} bookings")
+    print(f"  stdlib json + isoformat: {best_ms(old_encode, bookings):8.2f} ms")
+    print(f"  orjson:                  {best_ms(new_encode, bookings):8.2f} ms")
+    print("payload size")
+    print(f"  identity: {len(new_body):>9,} bytes")
+    print(f"  gzip(5):  {len(gzip.compress(new_body, compresslevel=5)):>9,} bytes"
+          f"  ({best_ms(lambda b: gzip.compress(b, compresslevel=5), new_body):.2f} ms)")
+    if brotli is not None:
+        print(f"  br(4):    {len(brotli.compress(new_body, quality=4)):>9,} bytes"
+              f"  ({best_ms(lambda b: brotli.compress(b, quality=4), new_body):.2f} ms)")
+    else:
+        print("  br:       (install brotli to include)")
+
+
+if __name__ == "__main__":
+    main()
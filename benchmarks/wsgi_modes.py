@@ -0,0 +1,228 @@
+"""Compare the gunicorn worker presets (sync / threaded / gevent) under a booking + catalog mix.
+
+Run from the repo root:  python benchmarks/wsgi_modes.py [seconds] [clients] [sse_streams]
+Needs gunicorn (and gevent for that mode; it is skipped otherwise). Each
+mode serves a fresh SQLite database with WEB_CONCURRENCY=2 so the modes get
+the same number of processes. `sse_streams` host streams are kept open for
+the whole run, the way dashboards do, to show what they cost each mode.
+"""
+import http.client
+import json
+import os
+import random
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from importlib.util import find_spec
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODES = ("sync", "threaded", "gevent")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def request(port, method, path, body=None, token=None, timeout=30):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+    headers = {"Content-Type": "application/json"}
+    if token:
+        headers["Authorization"] = "Bearer " + token
+    try:
+        conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+        response = conn.getresponse()
+        data = response.read()
+        return response.status, data
+    finally:
+        conn.close()
+
+
+def start_server(mode, port, workdir):
+    env = dict(
+        os.environ,
+        WORKER_MODE=mode,
+        WEB_CONCURRENCY="2",
+        BIND="127.0.0.1:{}".format(port),
+        DATABASE_URL="sqlite:///{}".format(os.path.join(workdir, "bench.db")),
+        ARCHIVE_DATABASE_PATH=os.path.join(workdir, "bench_archive.db"),
+        SQLALCHEMY_ECHO="false",
+        JOBS_ENABLED="false",
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--access-logfile", "/dev/null", "wsgi:app"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            request(port, "GET", "/accommodations", timeout=2)
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("gunicorn ({}) did not start".format(mode))
+
+
+def create_schema(workdir):
+    # Same tables the migrations produce; create_all is enough for a throwaway db
+    env = dict(os.environ, DATABASE_URL="sqlite:///{}".format(os.path.join(workdir, "bench.db")),
+               ARCHIVE_DATABASE_PATH=os.path.join(workdir, "bench_archive.db"), SQLALCHEMY_ECHO="false")
+    subprocess.run(
+        [sys.executable, "-c", "from app import app, db\nwith app.app_context(): db.create_all()"],
+        cwd=ROOT, env=env, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+
+def register(port, name, role):
+    status, data = request(port, "POST", "/auth/register", {
+        "name": name, "email": name + "@example.com", "password": "benchmark", "role": role
+    })
+    assert status == 201, data
+    return json.loads(data)["access_token"]
+
+
+def seed(port):
+    host = register(port, "host", "host")
+    driver = register(port, "driver", "driver")
+    tourists = [register(port, "tourist{}".format(i), "tourist") for i in range(20)]
+    for i in range(50):
+        status, data = request(port, "POST", "/accommodations", {
+            "title": "Camp {}".format(i), "description": "Tented camp by the river, full board",
+            "location": "Maasai Mara", "price_per_night": 100 + i, "capacity": 4
+        }, host)
+        assert status == 201, data
+    for i in range(20):
+        status, data = request(port, "POST", "/transports", {
+            "vehicle_type": "van", "price_per_day": 80 + i, "total_capacity": 1000
+        }, driver)
+        assert status == 201, data
+    return host, tourists
+
+
+def hold_streams(port, token, count, stop):
+    """Open `count` SSE connections and keep reading them until stop is set"""
+    def stream():
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+            conn.request("GET", "/host/bookings/stream?jwt=" + token)
+            response = conn.getresponse()
+            while not stop.is_set() and response.fp.readline():
+                pass
+        except OSError:
+            pass
+    threads = [threading.Thread(target=stream, daemon=True) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def run_clients(port, tourists, seconds, clients):
+    """Booking + catalog mix; returns the latency (s) of every request and the error count"""
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    stop_at = time.time() + seconds
+
+    def client(n):
+        rng = random.Random(n)
+        token = tourists[n % len(tourists)]
+        mine = []
+        while time.time() < stop_at:
+            roll = rng.random()
+            if roll < 0.4:
+                call = ("GET", "/accommodations?fields=id,title,price_per_night,location", None)
+            elif roll < 0.6:
+                call = ("GET", "/transports", None)
+            elif roll < 0.8:
+                call = ("GET", "/accommodation_bookings", None)
+            elif roll < 0.9:
+                day = date(2030, 1, 1) + timedelta(days=rng.randrange(3000))
+                call = ("POST", "/accommodation_bookings", {
+                    "accommodation_id": rng.randrange(1, 51), "check_in_date": day.isoformat(),
+                    "check_out_date": (day + timedelta(days=2)).isoformat(), "total_price": 200
+                })
+            else:
+                call = ("POST", "/transport_bookings", {
+                    "transport_id": rng.randrange(1, 21),
+                    "travel_date": (date(2030, 1, 1) + timedelta(days=rng.randrange(365))).isoformat(),
+                    "seats_booked": 1, "total_price": 80
+                })
+            started = time.perf_counter()
+            try:
+                status, _ = request(port, call[0], call[1], call[2], token)
+                failed = status >= 500
+            except OSError:
+                failed = True
+            mine.append(time.perf_counter() - started)
+            if failed:
+                with lock:
+                    errors[0] += 1
+        with lock:
+            latencies.extend(mine)
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors[0]
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def bench(mode, seconds, clients, sse_streams):
+    workdir = tempfile.mkdtemp(prefix="wsgi-bench-")
+    port = free_port()
+    create_schema(workdir)
+    server = start_server(mode, port, workdir)
+    stop = threading.Event()
+    try:
+        host, tourists = seed(port)
+        hold_streams(port, host, sse_streams, stop)
+        time.sleep(0.5)
+        latencies, errors = run_clients(port, tourists, seconds, clients)
+    finally:
+        stop.set()
+        # Quick shutdown; workers stuck in a stream are killed outright
+        server.send_signal(signal.SIGQUIT)
+        try:
+            server.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            os.killpg(server.pid, signal.SIGKILL)
+            server.wait()
+        shutil.rmtree(workdir, ignore_errors=True)
+    latencies.sort()
+    ms = [value * 1000 for value in latencies]
+    print("  {:<9} {:>8.0f} {:>8.1f} {:>8.1f} {:>8.1f} {:>7}".format(
+        mode, len(ms) / seconds, percentile(ms, 0.5), percentile(ms, 0.95), percentile(ms, 0.99), errors
+    ))
+
+
+def main():
+    seconds = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    sse_streams = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+    if find_spec("gunicorn") is None:
+        sys.exit("gunicorn is not installed (pipenv install gunicorn)")
+
+    print("{} clients for {}s, {} open SSE streams, 2 worker processes".format(clients, seconds, sse_streams))
+    print("  {:<9} {:>8} {:>8} {:>8} {:>8} {:>7}".format("mode", "req/s", "p50 ms", "p95 ms", "p99 ms", "errors"))
+    for mode in MODES:
+        if mode == "gevent" and find_spec("gevent") is None:
+            print("  {:<9} (install gevent to include)".format(mode))
+            continue
+        bench(mode, seconds, clients, sse_streams)
+
+
+if __name__ == "__main__":
+    main()
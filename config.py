@@ -7,7 +7,8 @@ class Config:
         "sqlite:///safariconnect.db"
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    SQLALCHEMY_ECHO = True
+    # Logs every statement; turn off (SQLALCHEMY_ECHO=false) when serving real traffic
+    SQLALCHEMY_ECHO = os.getenv("SQLALCHEMY_ECHO", "true").lower() == "true"
 
     SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-key")
 
@@ -20,3 +21,156 @@ class Config:
         "CORS_ORIGINS",
         "http://localhost:5173,http://localhost:3000,http://127.0.0.1:5173"
     )
+
+    # Background jobs (outbox worker for post-booking side effects)
+    JOBS_ENABLED = os.getenv("JOBS_ENABLED", "true").lower() == "true"
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+    JOB_MAX_ATTEMPTS = 5
+    JOB_RETRY_BACKOFF_SECONDS = 2
+    JOB_POLL_INTERVAL_SECONDS = 5
+    JOB_LEASE_SECONDS = 60
+    JOB_BATCH_SIZE = 50
+
+    # Booking confirmation emails (services/notifications.py). Without
+    # MAIL_SERVER they are only logged, e.g. in development.
+    MAIL_SERVER = os.getenv("MAIL_SERVER")
+    MAIL_PORT = int(os.getenv("MAIL_PORT", "587"))
+    MAIL_USE_TLS = os.getenv("MAIL_USE_TLS", "true").lower() == "true"
+    MAIL_USERNAME = os.getenv("MAIL_USERNAME")
+    MAIL_PASSWORD = os.getenv("MAIL_PASSWORD")
+    MAIL_SENDER = os.getenv("MAIL_SENDER", "SafariConnect <no-reply@safariconnect.local>")
+
+    # Booking change feed: recent writes (seconds) re-sent on the next sync
+    CHANGE_FEED_OVERLAP_SECONDS = 2
+
+    # Server-Sent Events push of booking updates
+    # EVENT_BROKER: import path of a services.events.Broker subclass, e.g.
+    # "services.events:RedisBroker" (+ EVENT_BROKER_URL) to share across workers
+    EVENT_BROKER = os.getenv("EVENT_BROKER")
+    EVENT_BROKER_URL = os.getenv("EVENT_BROKER_URL")
+    SSE_HEARTBEAT_SECONDS = 15
+    SSE_QUEUE_SIZE = 100
+
+    # SQLite only: file attached as the "archive" schema for rolled-over bookings
+    # (defaults to instance/safariconnect_archive.db)
+    ARCHIVE_DATABASE_PATH = os.getenv("ARCHIVE_DATABASE_PATH")
+
+    # Read replicas: comma separated URLs; GET-request reads are spread across them.
+    # A user's reads stay on the primary for REPLICA_STICKY_SECONDS after they write.
+    REPLICA_DATABASE_URLS = os.getenv("REPLICA_DATABASE_URLS", "")
+    REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", "5"))
+
+    # Regions listings can be in. SHARD_DATABASE_URLS ("tz=sqlite:///tz.db,ug=...")
+    # moves a region's listings and bookings to its own database; the others,
+    # DEFAULT_REGION included, stay on DATABASE_URL (see services/sharding.py)
+    DEFAULT_REGION = os.getenv("DEFAULT_REGION", "ke")
+    REGIONS = os.getenv("REGIONS", "ke,tz,ug,rw")
+    SHARD_DATABASE_URLS = os.getenv("SHARD_DATABASE_URLS", "")
+    # Threads for catalog queries run on every shard at once
+    SHARD_FAN_OUT_WORKERS = 8
+
+    # Checkout holds: default and maximum lifetime of a seat/room hold
+    HOLD_TTL_MINUTES = 10
+    HOLD_MAX_MINUTES = 30
+
+    # Rows fetched per batch by the CSV/Parquet exports (also the Parquet row group size)
+    EXPORT_BATCH_SIZE = 10000
+
+    # Bulk listing import: max rows per upload, rows per executemany
+    BULK_IMPORT_MAX_ROWS = 5000
+    BULK_INSERT_CHUNK_SIZE = 500
+
+    # Most ids accepted by a ?ids= batch GET
+    BATCH_MAX_IDS = 100
+
+    # Longest date range /transports/available will search
+    TRANSPORT_SEARCH_MAX_DAYS = 31
+
+    # Most bookings (stays + transport legs) accepted in one POST /itineraries
+    ITINERARY_MAX_ITEMS = 20
+
+    # /me/trips page size (?limit= is capped at the max)
+    TRIPS_PAGE_SIZE = 50
+    TRIPS_MAX_PAGE_SIZE = 200
+
+    # Slow-query log: statements taking at least SLOW_QUERY_MS are written with
+    # their parameters, route and EXPLAIN plan to a rotating file (0 = off;
+    # path defaults to instance/slow_queries.log). EXPLAIN_ANALYZE re-runs
+    # slow SELECTs on Postgres to get actual timings.
+    SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "0"))
+    SLOW_QUERY_LOG_PATH = os.getenv("SLOW_QUERY_LOG_PATH")
+    SLOW_QUERY_LOG_MAX_BYTES = 10 * 1024 * 1024
+    SLOW_QUERY_LOG_BACKUPS = 5
+    SLOW_QUERY_EXPLAIN_ANALYZE = os.getenv("SLOW_QUERY_EXPLAIN_ANALYZE", "false").lower() == "true"
+
+    # Gunicorn worker presets used by gunicorn.conf.py; WORKER_MODE picks one.
+    #   sync:     one request per process. Cheapest per request, but every open
+    #             SSE stream or long poll holds a whole process.
+    #   threaded: gthread workers with `threads` requests per process.
+    #   gevent:   cooperative greenlets, for many idle SSE connections
+    #             (needs `gevent`, and `psycogreen` on Postgres).
+    # pool_size is the DB connections each process keeps: one per request it
+    # can run at once (capped for gevent, which queues on the pool instead).
+    WORKER_MODE = os.getenv("WORKER_MODE", "sync")
+    WORKER_PRESETS = {
+        "sync": {"worker_class": "sync", "workers": 2 * (os.cpu_count() or 1) + 1, "threads": 1,
+                 "timeout": 30, "pool_size": 1},
+        "threaded": {"worker_class": "gthread", "workers": os.cpu_count() or 1, "threads": 8,
+                     "timeout": 60, "pool_size": 8},
+        "gevent": {"worker_class": "gevent", "workers": os.cpu_count() or 1, "threads": 1,
+                   "worker_connections": 1000, "timeout": 60, "pool_size": 20},
+    }
+    # Outside SQLite, size the pool for the preset; the overflow covers the
+    # background job threads (JOB_WORKERS plus the dispatcher)
+    if not SQLALCHEMY_DATABASE_URI.startswith("sqlite"):
+        SQLALCHEMY_ENGINE_OPTIONS = {
+            "pool_size": WORKER_PRESETS[WORKER_MODE]["pool_size"],
+            "max_overflow": JOB_WORKERS + 1,
+            "pool_timeout": 10,
+            "pool_pre_ping": True,
+        }
+
+    # Rate limits per route group: (requests, seconds) per client, i.e. bursts
+    # of `requests` refilling at requests/seconds per second. Clients are told
+    # apart by user id on JWT-protected routes, by IP elsewhere. Set
+    # RATE_LIMIT_STORE (e.g. "services.rate_limit:RedisStore" + RATE_LIMIT_STORE_URL)
+    # to share the counts between workers.
+    RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMITS = {
+        "auth": (10, 60),       # /auth/login, /auth/register (each costs a bcrypt hash)
+        "booking": (20, 60),    # booking, hold and itinerary POSTs
+        "catalog": (300, 60),   # accommodation/transport listings and search
+    }
+    RATE_LIMIT_STORE = os.getenv("RATE_LIMIT_STORE")
+    RATE_LIMIT_STORE_URL = os.getenv("RATE_LIMIT_STORE_URL")
+    # Reverse proxies in front of the app (1 for nginx -> gunicorn). Their
+    # X-Forwarded-For/-Proto/-Host headers are trusted that many hops deep so
+    # request.remote_addr is the client's address; 0 when clients connect directly.
+    PROXY_COUNT = int(os.getenv("PROXY_COUNT", "0"))
+
+    # /host/occupancy and /driver/utilization: default and maximum window (days),
+    # and how long a result may be served from cache (writes in the same
+    # process invalidate it straight away)
+    ANALYTICS_DEFAULT_DAYS = 30
+    ANALYTICS_MAX_DAYS = 366
+    ANALYTICS_CACHE_SECONDS = 300
+
+    # Audit trail of booking/listing writes, buffered and written in batches of
+    # AUDIT_BATCH_SIZE or every AUDIT_FLUSH_SECONDS. AUDIT_SINK: import path of a
+    # services.audit.Sink, e.g. "services.audit:JsonlSink" for a rotating file
+    # (AUDIT_LOG_PATH, default instance/audit.log) instead of the audit_events table
+    AUDIT_ENABLED = os.getenv("AUDIT_ENABLED", "true").lower() == "true"
+    AUDIT_SINK = os.getenv("AUDIT_SINK")
+    AUDIT_LOG_PATH = os.getenv("AUDIT_LOG_PATH")
+    AUDIT_BATCH_SIZE = 200
+    AUDIT_FLUSH_SECONDS = 2
+    # Events kept while the sink is failing; the oldest are dropped beyond this
+    AUDIT_MAX_BUFFER = 10000
+    AUDIT_PAGE_SIZE = 50
+    AUDIT_MAX_PAGE_SIZE = 200
+
+    # Neighbours stored per accommodation for /accommodations/<id>/similar
+    SIMILAR_TOP_K = int(os.getenv("SIMILAR_TOP_K", "10"))
+
+    # JSON responses at least this large are gzip/brotli compressed when the client accepts it
+    JSON_COMPRESS_MIN_BYTES = 1024
@@ -2,6 +2,7 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
 from flask_jwt_extended import JWTManager
 from sqlalchemy import MetaData
+from services.db_routing import RoutingSession
 
 # Naming convention for constraints (Alembic-friendly)
 naming_convention = {
@@ -12,6 +13,10 @@ naming_convention = {
     "pk": "pk_%(table_name)s",
 }
 
-db = SQLAlchemy(metadata=MetaData(naming_convention=naming_convention))
+# RoutingSession sends GET-request reads to replicas when REPLICA_DATABASE_URLS is set
+db = SQLAlchemy(
+    metadata=MetaData(naming_convention=naming_convention),
+    session_options={"class_": RoutingSession}
+)
 bcrypt = Bcrypt()
 jwt = JWTManager()
@@ -0,0 +1,42 @@
+import logging
+import os
+
+from config import Config
+
+# Gunicorn settings from the Config.WORKER_PRESETS entry named by WORKER_MODE.
+# WEB_CONCURRENCY overrides the number of worker processes.
+
+mode = Config.WORKER_MODE
+if mode not in Config.WORKER_PRESETS:
+    raise RuntimeError("WORKER_MODE must be one of: {}".format(", ".join(Config.WORKER_PRESETS)))
+preset = Config.WORKER_PRESETS[mode]
+
+bind = os.getenv("BIND", "0.0.0.0:{}".format(os.getenv("PORT", "5000")))
+worker_class = preset["worker_class"]
+workers = int(os.getenv("WEB_CONCURRENCY", preset["workers"]))
+threads = preset["threads"]
+worker_connections = preset.get("worker_connections", 1000)
+timeout = preset["timeout"]
+graceful_timeout = 30
+keepalive = 5
+# Import the app once in the master so workers share its memory copy-on-write.
+# Not for gevent: the app's locks and queues must be created after the worker
+# has monkey-patched threading.
+preload_app = mode != "gevent"
+accesslog = "-"
+
+
+def post_fork(server, worker):
+    if preload_app:
+        from wsgi import after_fork
+        after_fork()
+
+
+def post_worker_init(worker):
+    if mode == "gevent" and Config.SQLALCHEMY_DATABASE_URI.startswith("postgres"):
+        try:
+            from psycogreen.gevent import patch_psycopg
+            patch_psycopg()
+        except ImportError:
+            # Every query would then block the whole worker, not just its greenlet
+            logging.getLogger("gunicorn.error").warning("psycogreen is not installed; psycopg2 calls will block gevent workers")
@@ -0,0 +1,122 @@
+"""moved booking archives to archive schema
+
+Revision ID: 19a3df265d10
+Revises: 8d24b7e36e98
+Create Date: 2026-10-19 15:12:40.218317
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '19a3df265d10'
+down_revision = '8d24b7e36e98'
+branch_labels = None
+depends_on = None
+
+# On SQLite the "archive" schema is the database file that
+# services/partitions.py ATTACHes to every connection. On Postgres it is a
+# real schema and the tables are range-partitioned by month; monthly
+# partitions are created on demand by `flask archive-bookings`.
+
+# booking_status already exists on Postgres; reuse it instead of creating it again
+BOOKING_STATUS = sa.Enum('pending', 'confirmed', 'cancelled', name='booking_status').with_variant(
+    postgresql.ENUM('pending', 'confirmed', 'cancelled', name='booking_status', create_type=False), 'postgresql'
+)
+
+
+def _create_archive_tables(postgres):
+    op.create_table('accommodation_bookings_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('tourist_id', sa.Integer(), nullable=False),
+    sa.Column('accommodation_id', sa.Integer(), nullable=False),
+    sa.Column('check_in_date', sa.Date(), nullable=False),
+    sa.Column('check_out_date', sa.Date(), nullable=False),
+    sa.Column('total_price', sa.Float(), nullable=False),
+    sa.Column('status', BOOKING_STATUS, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id', 'check_in_date', name=op.f('pk_accommodation_bookings_archive')),
+    schema='archive',
+    postgresql_partition_by='RANGE (check_in_date)'
+    )
+    op.create_index(op.f('ix_archive_accommodation_bookings_archive_accommodation_id'), 'accommodation_bookings_archive', ['accommodation_id'], unique=False, schema='archive')
+    op.create_index(op.f('ix_archive_accommodation_bookings_archive_tourist_id'), 'accommodation_bookings_archive', ['tourist_id'], unique=False, schema='archive')
+
+    op.create_table('transport_bookings_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('tourist_id', sa.Integer(), nullable=False),
+    sa.Column('transport_id', sa.Integer(), nullable=False),
+    sa.Column('travel_date', sa.Date(), nullable=False),
+    sa.Column('seats_booked', sa.Integer(), nullable=False),
+    sa.Column('total_price', sa.Float(), nullable=False),
+    sa.Column('status', BOOKING_STATUS, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id', 'travel_date', name=op.f('pk_transport_bookings_archive')),
+    schema='archive',
+    postgresql_partition_by='RANGE (travel_date)'
+    )
+    op.create_index(op.f('ix_archive_transport_bookings_archive_tourist_id'), 'transport_bookings_archive', ['tourist_id'], unique=False, schema='archive')
+    op.create_index(op.f('ix_archive_transport_bookings_archive_transport_id'), 'transport_bookings_archive', ['transport_id'], unique=False, schema='archive')
+
+    if postgres:
+        # Catch-all so a missing monthly partition never fails an archive run
+        op.execute("CREATE TABLE archive.accommodation_bookings_archive_default PARTITION OF archive.accommodation_bookings_archive DEFAULT")
+        op.execute("CREATE TABLE archive.transport_bookings_archive_default PARTITION OF archive.transport_bookings_archive DEFAULT")
+
+
+def upgrade():
+    postgres = op.get_bind().dialect.name == 'postgresql'
+    if postgres:
+        op.execute("CREATE SCHEMA IF NOT EXISTS archive")
+
+    _create_archive_tables(postgres)
+
+    op.execute("INSERT INTO archive.accommodation_bookings_archive SELECT * FROM accommodation_bookings_archive")
+    op.execute("INSERT INTO archive.transport_bookings_archive SELECT * FROM transport_bookings_archive")
+    op.drop_table('accommodation_bookings_archive')
+    op.drop_table('transport_bookings_archive')
+
+
+def downgrade():
+    op.create_table('accommodation_bookings_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('tourist_id', sa.Integer(), nullable=False),
+    sa.Column('accommodation_id', sa.Integer(), nullable=False),
+    sa.Column('check_in_date', sa.Date(), nullable=False),
+    sa.Column('check_out_date', sa.Date(), nullable=False),
+    sa.Column('total_price', sa.Float(), nullable=False),
+    sa.Column('status', BOOKING_STATUS, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_accommodation_bookings_archive'))
+    )
+    op.create_table('transport_bookings_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('tourist_id', sa.Integer(), nullable=False),
+    sa.Column('transport_id', sa.Integer(), nullable=False),
+    sa.Column('travel_date', sa.Date(), nullable=False),
+    sa.Column('seats_booked', sa.Integer(), nullable=False),
+    sa.Column('total_price', sa.Float(), nullable=False),
+    sa.Column('status', BOOKING_STATUS, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_transport_bookings_archive'))
+    )
+    op.create_index(op.f('ix_accommodation_bookings_archive_accommodation_id'), 'accommodation_bookings_archive', ['accommodation_id'], unique=False)
+    op.create_index(op.f('ix_accommodation_bookings_archive_tourist_id'), 'accommodation_bookings_archive', ['tourist_id'], unique=False)
+    op.create_index(op.f('ix_transport_bookings_archive_tourist_id'), 'transport_bookings_archive', ['tourist_id'], unique=False)
+    op.create_index(op.f('ix_transport_bookings_archive_transport_id'), 'transport_bookings_archive', ['transport_id'], unique=False)
+
+    op.execute("INSERT INTO accommodation_bookings_archive SELECT * FROM archive.accommodation_bookings_archive")
+    op.execute("INSERT INTO transport_bookings_archive SELECT * FROM archive.transport_bookings_archive")
+    # Dropping a partitioned parent on Postgres drops its partitions too
+    op.drop_table('accommodation_bookings_archive', schema='archive')
+    op.drop_table('transport_bookings_archive', schema='archive')
@@ -1,3 +1,4 @@
+from datetime import datetime
 from sqlalchemy_serializer import SerializerMixin
 from sqlalchemy.orm import validates
 from extensions import db, bcrypt
@@ -44,7 +45,12 @@ class Accommodation(db.Model, SerializerMixin):
     price_per_night = db.Column(db.Float, nullable=False)
     capacity = db.Column(db.Integer, nullable=False)
     host_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    # Picks the database the listing and its bookings live in (services/sharding.py)
+    region = db.Column(db.String(16), nullable=False, server_default='ke', index=True)
     created_at = db.Column(db.DateTime, server_default=db.func.now())
+    # Optimistic concurrency: bumped on every UPDATE, checked in its WHERE clause (served as the ETag)
+    version = db.Column(db.Integer, nullable=False, server_default='1')
+    __mapper_args__ = {'version_id_col': version}
 
     host = db.relationship('User', back_populates='accommodations')
     bookings = db.relationship('AccommodationBooking', back_populates='accommodation', cascade='all, delete-orphan')
@@ -69,7 +75,10 @@ class Transport(db.Model,SerializerMixin):
     available = db.Column(db.Boolean, default=True, nullable=False)
     price_per_day = db.Column(db.Float, nullable=False)
     total_capacity = db.Column(db.Integer, nullable=False)
+    region = db.Column(db.String(16), nullable=False, server_default='ke', index=True)
     created_at = db.Column(db.DateTime, server_default=db.func.now())
+    version = db.Column(db.Integer, nullable=False, server_default='1')
+    __mapper_args__ = {'version_id_col': version}
 
    
     driver = db.relationship('User', back_populates='transports')
@@ -90,16 +99,44 @@ class AccommodationBooking(db.Model, SerializerMixin):
     id = db.Column(db.Integer, primary_key=True)
     tourist_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     accommodation_id = db.Column(db.Integer, db.ForeignKey('accommodations.id'), nullable=False)
+    # Set when the booking was made as part of a multi-leg itinerary
+    itinerary_id = db.Column(db.Integer, db.ForeignKey('itineraries.id'), index=True)
     check_in_date = db.Column(db.Date, nullable=False)
     check_out_date = db.Column(db.Date, nullable=False)
     total_price = db.Column(db.Float, nullable=False)
     status = db.Column(db.Enum("pending", "confirmed", "cancelled", name="booking_status"), default="pending", nullable=False)
     created_at = db.Column(db.DateTime, server_default=db.func.now())
+    # Bumped on every write; drives the /bookings/changes sync feed
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    version = db.Column(db.Integer, nullable=False, server_default='1')
+    __mapper_args__ = {'version_id_col': version}
 
     
     tourist = db.relationship('User', back_populates='accommodation_bookings')
     accommodation = db.relationship('Accommodation', back_populates='bookings')
 
+    # Overlap checks only ever look at live bookings, so keep cancelled ones out of the index
+    __table_args__ = (
+        db.Index(
+            'ix_accommodation_bookings_live_dates',
+            'accommodation_id', 'check_in_date', 'check_out_date',
+            sqlite_where=db.text("status != 'cancelled'"),
+            postgresql_where=db.text("status != 'cancelled'")
+        ),
+        # /me/trips walks a tourist's stays in (check_in_date, id) order
+        db.Index(
+            'ix_accommodation_bookings_tourist_check_in',
+            'tourist_id', 'check_in_date', 'id',
+            sqlite_where=db.text("status != 'cancelled'"),
+            postgresql_where=db.text("status != 'cancelled'")
+        ),
+    )
+
+    @classmethod
+    def live(cls):
+        # Inline literal rather than a bound parameter so the planner can match the partial index
+        return cls.status != db.literal_column("'cancelled'")
+
     serializer_rules = (
         '-tourist.accommodation_bookings',  # Cut User→booking loops
         '-tourist.transport_bookings',
@@ -114,17 +151,48 @@ class TransportBooking(db.Model, SerializerMixin):
     id = db.Column(db.Integer, primary_key=True)
     tourist_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     transport_id = db.Column(db.Integer, db.ForeignKey('transports.id'), nullable=False)
+    itinerary_id = db.Column(db.Integer, db.ForeignKey('itineraries.id'), index=True)
     travel_date = db.Column(db.Date, nullable=False)
     seats_booked = db.Column(db.Integer, nullable=False)
     total_price = db.Column(db.Float, nullable=False)
     
     status = db.Column(db.Enum("pending", "confirmed", "cancelled", name="booking_status"), default="pending", nullable=False)
     created_at = db.Column(db.DateTime, server_default=db.func.now())
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    version = db.Column(db.Integer, nullable=False, server_default='1')
+    __mapper_args__ = {'version_id_col': version}
 
 
     tourist = db.relationship('User', back_populates='transport_bookings')
     transport = db.relationship('Transport', back_populates='bookings')
 
+    # Seat counts only ever look at live bookings, so keep cancelled ones out of the index
+    __table_args__ = (
+        db.Index(
+            'ix_transport_bookings_live_travel_date',
+            'transport_id', 'travel_date',
+            sqlite_where=db.text("status != 'cancelled'"),
+            postgresql_where=db.text("status != 'cancelled'")
+        ),
+        # Fleet-wide availability search scans one date range; seats_booked makes it index-only
+        db.Index(
+            'ix_transport_bookings_live_day_seats',
+            'travel_date', 'transport_id', 'seats_booked',
+            sqlite_where=db.text("status != 'cancelled'"),
+            postgresql_where=db.text("status != 'cancelled'")
+        ),
+        db.Index(
+            'ix_transport_bookings_tourist_travel_date',
+            'tourist_id', 'travel_date', 'id',
+            sqlite_where=db.text("status != 'cancelled'"),
+            postgresql_where=db.text("status != 'cancelled'")
+        ),
+    )
+
+    @classmethod
+    def live(cls):
+        return cls.status != db.literal_column("'cancelled'")
+
     serializer_rules = (
             '-tourist.accommodation_bookings',
             '-tourist.transport_bookings',
@@ -132,3 +200,208 @@ class TransportBooking(db.Model, SerializerMixin):
             '-transport.bookings',
         )
     
+
+class InventoryHold(db.Model):
+    # Temporary reservation of an accommodation's dates or a transport's seats
+    # while the tourist checks out. Counts against capacity until it expires.
+    __tablename__ = 'holds'
+
+    id = db.Column(db.Integer, primary_key=True)
+    tourist_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    kind = db.Column(db.Enum("accommodation", "transport", name="hold_kind"), nullable=False)
+    accommodation_id = db.Column(db.Integer, db.ForeignKey('accommodations.id'))
+    check_in_date = db.Column(db.Date)
+    check_out_date = db.Column(db.Date)
+    transport_id = db.Column(db.Integer, db.ForeignKey('transports.id'))
+    travel_date = db.Column(db.Date)
+    seats = db.Column(db.Integer)
+    status = db.Column(db.Enum("active", "converted", "released", "expired", name="hold_status"), default="active", nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+
+    # Capacity checks only look at active holds
+    __table_args__ = (
+        db.Index(
+            'ix_holds_active_accommodation',
+            'accommodation_id', 'check_in_date', 'check_out_date',
+            sqlite_where=db.text("status = 'active'"),
+            postgresql_where=db.text("status = 'active'")
+        ),
+        db.Index(
+            'ix_holds_active_transport',
+            'transport_id', 'travel_date',
+            sqlite_where=db.text("status = 'active'"),
+            postgresql_where=db.text("status = 'active'")
+        ),
+    )
+
+    @classmethod
+    def active(cls, now):
+        return db.and_(cls.status == db.literal_column("'active'"), cls.expires_at > now)
+
+
+class Itinerary(db.Model):
+    # Groups the bookings of a multi-leg trip that was booked in one transaction
+    __tablename__ = 'itineraries'
+
+    id = db.Column(db.Integer, primary_key=True)
+    tourist_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+
+    accommodation_bookings = db.relationship('AccommodationBooking', order_by='AccommodationBooking.check_in_date')
+    transport_bookings = db.relationship('TransportBooking', order_by='TransportBooking.travel_date')
+
+
+# Cold storage for bookings moved out of the live tables by the archive job
+# (flask archive-bookings). Same columns, plus when the row was archived.
+# They live in the "archive" schema: an attached database file on SQLite,
+# tables partitioned by month on Postgres (see services/partitions.py).
+class AccommodationBookingArchive(db.Model):
+    __tablename__ = 'accommodation_bookings_archive'
+    __table_args__ = {
+        'schema': 'archive',
+        'postgresql_partition_by': 'RANGE (check_in_date)',
+    }
+
+    # The partition key has to be part of the primary key on Postgres
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    tourist_id = db.Column(db.Integer, nullable=False, index=True)
+    accommodation_id = db.Column(db.Integer, nullable=False, index=True)
+    itinerary_id = db.Column(db.Integer)
+    check_in_date = db.Column(db.Date, primary_key=True)
+    check_out_date = db.Column(db.Date, nullable=False)
+    total_price = db.Column(db.Float, nullable=False)
+    status = db.Column(db.Enum("pending", "confirmed", "cancelled", name="booking_status"), nullable=False)
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+
+class TransportBookingArchive(db.Model):
+    __tablename__ = 'transport_bookings_archive'
+    __table_args__ = {
+        'schema': 'archive',
+        'postgresql_partition_by': 'RANGE (travel_date)',
+    }
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    tourist_id = db.Column(db.Integer, nullable=False, index=True)
+    transport_id = db.Column(db.Integer, nullable=False, index=True)
+    itinerary_id = db.Column(db.Integer)
+    travel_date = db.Column(db.Date, primary_key=True)
+    seats_booked = db.Column(db.Integer, nullable=False)
+    total_price = db.Column(db.Float, nullable=False)
+    status = db.Column(db.Enum("pending", "confirmed", "cancelled", name="booking_status"), nullable=False)
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+
+class BookingView(db.Model):
+    # Read model for the booking lists: one row per booking (live or archived)
+    # with the listing and tourist details copied in, so lists are a single
+    # index-ordered read with no joins. Kept in step by services/booking_view.py;
+    # `flask rebuild-booking-view` regenerates it from the booking tables.
+    __tablename__ = 'booking_view'
+
+    kind = db.Column(db.String(16), primary_key=True)  # "accommodation" or "transport"
+    booking_id = db.Column(db.Integer, primary_key=True)
+    owner_id = db.Column(db.Integer, nullable=False)  # host_id or driver_id of the listing
+    listing_id = db.Column(db.Integer, nullable=False)
+    tourist_id = db.Column(db.Integer, nullable=False)
+    itinerary_id = db.Column(db.Integer)
+    title = db.Column(db.String())  # accommodation title
+    vehicle_type = db.Column(db.String())
+    unit_price = db.Column(db.Float)  # price_per_night or price_per_day
+    tourist_name = db.Column(db.String(80))
+    start_date = db.Column(db.Date, nullable=False)  # check_in_date or travel_date
+    end_date = db.Column(db.Date, nullable=False)  # check_out_date or travel_date
+    seats = db.Column(db.Integer)
+    total_price = db.Column(db.Float, nullable=False)
+    status = db.Column(db.String(16), nullable=False)
+    version = db.Column(db.Integer)
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        # Full history (?include_past=true), read in list order
+        db.Index('ix_booking_view_owner', 'owner_id', 'kind', 'start_date', 'booking_id'),
+        db.Index('ix_booking_view_tourist', 'tourist_id', 'kind', 'start_date', 'booking_id'),
+        db.Index('ix_booking_view_listing', 'kind', 'listing_id', 'start_date', 'booking_id'),
+        # Upcoming lists (end_date >= today): a range scan that skips past
+        # bookings, with only the upcoming rows sorted afterwards
+        db.Index('ix_booking_view_owner_upcoming', 'owner_id', 'kind', 'end_date'),
+        db.Index('ix_booking_view_tourist_upcoming', 'tourist_id', 'kind', 'end_date'),
+        db.Index('ix_booking_view_listing_upcoming', 'kind', 'listing_id', 'end_date'),
+    )
+
+
+class BookingTombstone(db.Model):
+    # Left behind when a booking leaves the live tables so sync clients can drop it
+    __tablename__ = 'booking_tombstones'
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.Enum("accommodation", "transport", name="booking_kind"), nullable=False)
+    booking_id = db.Column(db.Integer, nullable=False)
+    owner_id = db.Column(db.Integer, nullable=False)  # host_id or driver_id of the listing
+    tourist_id = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_booking_tombstones_kind_owner_id_deleted_at', 'kind', 'owner_id', 'deleted_at'),
+    )
+
+class OutboxEvent(db.Model):
+    __tablename__ = 'outbox_events'
+
+    id = db.Column(db.Integer, primary_key=True)
+    event_type = db.Column(db.String(64), nullable=False)
+    # One row per handler ("module.function"), so a retry only re-runs the
+    # handler that failed. NULL (rows from before this column): every handler.
+    handler = db.Column(db.String(128))
+    payload = db.Column(db.JSON, nullable=False)
+    status = db.Column(db.Enum("pending", "processing", "done", "failed", name="outbox_status"), default="pending", nullable=False)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    # When the event is next due; while "processing" this doubles as the claim lease expiry
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+
+    __table_args__ = (
+        db.Index('ix_outbox_events_status_next_attempt_at', 'status', 'next_attempt_at'),
+    )
+
+
+class AccommodationSimilarity(db.Model):
+    # Precomputed "similar accommodations": the top SIMILAR_TOP_K neighbours of
+    # each listing, in rank order. Written by services/similarity.py (on the
+    # job worker after listing changes, or `flask rebuild-similar`), so the
+    # similar endpoint is one primary-key range read.
+    __tablename__ = 'accommodation_similar'
+
+    accommodation_id = db.Column(db.Integer, primary_key=True)
+    rank = db.Column(db.Integer, primary_key=True)
+    similar_id = db.Column(db.Integer, nullable=False, index=True)
+    score = db.Column(db.Float, nullable=False)  # 1 / (1 + distance), higher is closer
+
+
+class AuditEvent(db.Model):
+    # Append-only trail of booking and listing writes: who did what to which
+    # row. Rows are written in batches by services/audit.py, after the write
+    # they describe has been committed.
+    __tablename__ = 'audit_events'
+
+    id = db.Column(db.Integer, primary_key=True)
+    occurred_at = db.Column(db.DateTime, nullable=False)
+    actor_id = db.Column(db.Integer)  # user id from the JWT, null for CLI/background writes
+    action = db.Column(db.String(16), nullable=False)  # created, updated, deleted, cancelled
+    entity_type = db.Column(db.String(32), nullable=False)  # accommodation, transport, accommodation_booking, ...
+    entity_id = db.Column(db.Integer, nullable=False)
+    region = db.Column(db.String(16), nullable=False, server_default='ke')  # ids are only unique within a region
+    route = db.Column(db.String(255))  # "PATCH /accommodations/3"
+    changes = db.Column(db.JSON)  # request fields for creates and updates
+
+    __table_args__ = (
+        db.Index('ix_audit_events_actor', 'actor_id', 'id'),
+        db.Index('ix_audit_events_entity', 'entity_type', 'entity_id', 'region', 'id'),
+    )
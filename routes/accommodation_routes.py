@@ -1,47 +1,66 @@
-from flask_restful import Resource, reqparse
+import heapq
+from flask import request, current_app
+from flask_restful import Resource
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models import Accommodation, User
 from extensions import db
+from services.bulk_import import request_rows, import_rows
+from services.archive import upcoming_bookings_exist, tombstone_listing_bookings
+from services import booking_view, analytics, similarity, jobs, audit, sharding
+from services.rate_limit import rate_limit
+from services.projection import parse_fields, parse_ids, columns
+from services.versioning import etag_header, if_match_failed, commit_versioned, PRECONDITION_FAILED
+from schemas.validation import Schema, Field
 
 # Validation Rules
 
-# Parser for POST requests (creating accommodations)
-parser = reqparse.RequestParser()
-parser.add_argument("title", type=str, required=True, help="Title is required")
-parser.add_argument("description", type=str, required=True, help="Description is required")
-parser.add_argument("location", type=str, required=True, help="Location is required")
-parser.add_argument("price_per_night", type=float, required=True, help="Price per night is required")
-parser.add_argument("capacity", type=int, required=True, help="Capacity is required")
-parser.add_argument("available", type=bool)
-
-# Parser for PATCH requests (updating existing accommodations)
-update_parser = reqparse.RequestParser()
-update_parser.add_argument("title", type=str)
-update_parser.add_argument("description", type=str)
-update_parser.add_argument("location", type=str)
-update_parser.add_argument("price_per_night", type=float)
-update_parser.add_argument("capacity", type=int)
-update_parser.add_argument("available", type=bool)
+# Schema for POST requests (creating accommodations)
+accommodation_schema = Schema(
+    title=Field(str, required=True, help="Title is required"),
+    description=Field(str, required=True, help="Description is required"),
+    location=Field(str, required=True, help="Location is required"),
+    price_per_night=Field(float, required=True, help="Price per night is required"),
+    capacity=Field(int, required=True, help="Capacity is required"),
+    available=Field(bool),
+)
+
+# Schema for PATCH requests (updating existing accommodations)
+accommodation_update_schema = accommodation_schema.partial()
+
+# Fields clients can ask for with ?fields=
+ACCOMMODATION_FIELDS = (
+    'id', 'title', 'description', 'location', 'price_per_night',
+    'capacity', 'available', 'host_id', 'region', 'created_at', 'version'
+)
 
 
 class AccommodationResource(Resource):
     # Handling GET, id = None means it works for both accomms and accomms/5 for example
+    @rate_limit("catalog")
     def get(self, id=None):
-        # If no ID provided return all accomms
+        # If no ID provided return all accomms (or the ?ids= batch)
         if id is None:
-            # Get all accommodations
-            accommodations = Accommodation.query.all()
-            return [{
-                'id': acc.id,
-                'title': acc.title,
-                'description': acc.description,
-                'location': acc.location,
-                'price_per_night': acc.price_per_night,
-                'capacity': acc.capacity,
-                'available': acc.available,
-                'host_id': acc.host_id,
-                'created_at': acc.created_at.isoformat() if acc.created_at else None
-            } for acc in accommodations]
+            fields, error = parse_fields(ACCOMMODATION_FIELDS)
+            if error:
+                return error
+            ids, error = parse_ids()
+            if error:
+                return error
+
+            region = sharding.requested_region()
+            # Ids repeat across regions, so rows from every region always carry theirs
+            if region is None and 'region' not in fields:
+                fields += ('region',)
+            # Only the requested columns are selected
+            query = db.select(*columns(Accommodation, fields)).order_by(Accommodation.region, Accommodation.id)
+            if ids is not None:
+                query = query.where(Accommodation.id.in_(ids))
+            if region is not None:
+                query = query.where(Accommodation.region == region)
+                return [dict(row) for row in db.session.execute(query).mappings()]
+            # Every region: each database in parallel, merged back into (region, id) order
+            results = sharding.fan_out(lambda: [dict(row) for row in db.session.execute(query).mappings()])
+            return list(heapq.merge(*results, key=lambda row: (row['region'], row['id'])))
 
         # Get single accommodation
         accommodation = Accommodation.query.filter(Accommodation.id == id).first()
@@ -57,8 +76,10 @@ class AccommodationResource(Resource):
             'capacity': accommodation.capacity,
             'available': accommodation.available,
             'host_id': accommodation.host_id,
-            'created_at': accommodation.created_at.isoformat() if accommodation.created_at else None
-        }
+            'region': accommodation.region,
+            'created_at': accommodation.created_at,
+            'version': accommodation.version
+        }, 200, etag_header(accommodation)
     
     @jwt_required()
     def post(self):
@@ -70,7 +91,7 @@ class AccommodationResource(Resource):
         if user.role != 'host':
             return {"message": "Only hosts can create accommodations"}, 403
         
-        data = parser.parse_args()
+        data = accommodation_schema.parse()
         
         # Create new accommodation (using current_user_id from token)
         accommodation = Accommodation(
@@ -80,10 +101,17 @@ class AccommodationResource(Resource):
             location=data['location'],
             price_per_night=data['price_per_night'],
             capacity=data['capacity'],
-            available=data.get('available', True)
+            available=data.get('available', True),
+            region=sharding.current_region()
         )
         db.session.add(accommodation)
+        db.session.flush()
+        similarity.listing_changed([accommodation.id])
         db.session.commit()
+        jobs.worker.notify()
+        audit.record('created', 'accommodation', accommodation.id, data)
+        # New row in the host's occupancy matrix
+        analytics.invalidate('accommodation', current_user_id)
         
         return {"message": "Accommodation created successfully"}, 201
     
@@ -93,8 +121,8 @@ class AccommodationResource(Resource):
         # Get current user from JWT
         current_user_id = get_jwt_identity()
         
-        # Parse the update data (Only fields being changed)
-        data = update_parser.parse_args()
+        # Validate the update data (Only fields being changed)
+        data = accommodation_update_schema.parse()
         
         # Find accommodation to update
         accommodation = Accommodation.query.filter(Accommodation.id == id).first()
@@ -104,14 +132,27 @@ class AccommodationResource(Resource):
         # Check if user owns this accommodation
         if accommodation.host_id != current_user_id:
             return {"message": "You can only update your own accommodations"}, 403
+
+        # Client edited an older copy than the one stored now
+        if if_match_failed(accommodation):
+            return PRECONDITION_FAILED
         
         # Update fields that were provided
         for key, value in data.items():
             if value is not None:
                 setattr(accommodation, key, value) # Only updates changed fields
+
+        refresh_similar = any(data.get(field) is not None for field in similarity.FEATURE_FIELDS)
+        if refresh_similar:
+            similarity.listing_changed([id])
         
-        db.session.commit()
-        return {"message": "Accommodation updated successfully"}
+        if not commit_versioned(lambda: booking_view.refresh_listing('accommodation', accommodation)):
+            return PRECONDITION_FAILED
+        if refresh_similar:
+            jobs.worker.notify()
+        audit.record('updated', 'accommodation', id, data)
+        analytics.invalidate('accommodation', current_user_id)
+        return {"message": "Accommodation updated successfully"}, 200, etag_header(accommodation)
     
     @jwt_required()
     def delete(self, id):
@@ -125,7 +166,70 @@ class AccommodationResource(Resource):
         # Check if user owns this accommodation
         if accommodation.host_id != current_user_id:
             return {"message": "You can only delete your own accommodations"}, 403
-        
+
+        if if_match_failed(accommodation):
+            return PRECONDITION_FAILED
+
+        # Guests with upcoming stays must be cancelled first; the remaining
+        # (past or cancelled) bookings go with the listing, so sync clients get tombstones
+        if upcoming_bookings_exist('accommodation', id):
+            return {"message": "Cancel the upcoming bookings of this accommodation before deleting it"}, 409
+        tombstone_listing_bookings('accommodation', id)
         db.session.delete(accommodation)
-        db.session.commit()
-        return {"message": "Accommodation deleted successfully"}
\ No newline at end of file
+        similarity.listing_changed([id])
+        if not commit_versioned(lambda: booking_view.remove_listing('accommodation', id)):
+            return PRECONDITION_FAILED
+        jobs.worker.notify()
+        audit.record('deleted', 'accommodation', id)
+        analytics.invalidate('accommodation', current_user_id)
+        return {"message": "Accommodation deleted successfully"}
+
+
+class AccommodationBulkResource(Resource):
+    @jwt_required()
+    def post(self):
+        """Create many accommodations from a JSON array or a CSV upload"""
+        current_user_id = get_jwt_identity()
+        user = db.session.get(User, current_user_id)
+
+        # Role is checked once for the whole upload
+        if user is None or user.role != 'host':
+            return {"message": "Only hosts can create accommodations"}, 403
+
+        rows = request_rows()
+        if rows is None:
+            return {"message": "Send a JSON array of accommodations or a CSV file"}, 400
+
+        result, error = import_rows(
+            Accommodation, accommodation_schema, rows, {'available': True},
+            before_commit=similarity.listing_changed, host_id=current_user_id, region=sharding.current_region()
+        )
+        if error:
+            return error
+        if not result['created'] and result['errors']:
+            return {"message": "No accommodations were created", **result}, 400
+        jobs.worker.notify()
+        for accommodation_id in result['created']:
+            audit.record('created', 'accommodation', accommodation_id)
+        analytics.invalidate('accommodation', current_user_id)
+
+        return {"message": "{} accommodations created".format(len(result['created'])), **result}, 201
+
+
+class SimilarAccommodationsResource(Resource):
+    @rate_limit("catalog")
+    def get(self, id):
+        """Precomputed similar listings, closest first (see services/similarity.py)"""
+        if db.session.get(Accommodation, id) is None:
+            return {"message": "Accommodation not found"}, 404
+
+        fields, error = parse_fields(ACCOMMODATION_FIELDS)
+        if error:
+            return error
+        top_k = current_app.config.get("SIMILAR_TOP_K", 10)
+        try:
+            limit = min(int(request.args.get('limit', top_k)), top_k)
+        except ValueError:
+            return {"message": "limit must be an integer"}, 400
+
+        return similarity.fetch(id, fields, max(limit, 0)), 200
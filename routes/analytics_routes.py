@@ -0,0 +1,57 @@
+from datetime import date, timedelta
+from flask import request, current_app
+from flask_restful import Resource
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity
+from services import analytics
+
+NUMPY_MISSING = {"message": "Occupancy analytics are not available on this server (numpy is not installed)"}, 501
+
+
+def parse_window():
+    """Returns (from, to, error response); defaults to the next ANALYTICS_DEFAULT_DAYS days"""
+    try:
+        first_day = date.fromisoformat(request.args['from']) if request.args.get('from') else date.today()
+        if request.args.get('to'):
+            last_day = date.fromisoformat(request.args['to'])
+        else:
+            last_day = first_day + timedelta(days=current_app.config.get("ANALYTICS_DEFAULT_DAYS", 30) - 1)
+    except ValueError:
+        return None, None, ({"message": "from and to must be dates (format: YYYY-MM-DD)"}, 400)
+    if last_day < first_day:
+        return None, None, ({"message": "to must not be before from"}, 400)
+    max_days = current_app.config.get("ANALYTICS_MAX_DAYS", 366)
+    if (last_day - first_day).days + 1 > max_days:
+        return None, None, ({"message": "At most {} days can be requested at once".format(max_days)}, 400)
+    return first_day, last_day, None
+
+
+class HostOccupancyResource(Resource):
+    @jwt_required()
+    def get(self):
+        """Nights booked per accommodation and day (1/0) with occupancy rates, for the host's listings"""
+        claims = get_jwt()
+        if claims.get("role") != 'host':
+            return {"message": "Access denied. Host access only."}, 403
+        if not analytics.available():
+            return NUMPY_MISSING
+
+        first_day, last_day, error = parse_window()
+        if error:
+            return error
+        return analytics.occupancy(get_jwt_identity(), first_day, last_day), 200
+
+
+class DriverUtilizationResource(Resource):
+    @jwt_required()
+    def get(self):
+        """Seats booked per vehicle and day with fill rates, for the driver's transports"""
+        claims = get_jwt()
+        if claims.get("role") != 'driver':
+            return {"message": "Access denied. Driver access only."}, 403
+        if not analytics.available():
+            return NUMPY_MISSING
+
+        first_day, last_day, error = parse_window()
+        if error:
+            return error
+        return analytics.utilization(get_jwt_identity(), first_day, last_day), 200
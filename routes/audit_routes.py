@@ -0,0 +1,91 @@
+from flask import request, current_app
+from flask_restful import Resource
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from models import db, AuditEvent, Accommodation, Transport, BookingView
+from services import audit, sharding
+from services.projection import columns
+
+# Audit trail reads. Everyone can page through their own actions; the owner
+# of a listing or booking (host/driver, or the tourist for a booking) can see
+# every event on it. Entity ids are only unique within a region, so events on
+# one entity are read in the request's region. Events show up once the audit buffer has been flushed
+# (AUDIT_FLUSH_SECONDS), and only with the default database sink.
+
+ENTITY_TYPES = ('accommodation', 'transport', 'accommodation_booking', 'transport_booking')
+
+AUDIT_FIELDS = ('id', 'occurred_at', 'actor_id', 'action', 'entity_type', 'entity_id', 'region', 'route', 'changes')
+
+
+def owns_entity(user_id, entity_type, entity_id):
+    """Whether the user owns the listing, or is the tourist or listing owner of the booking"""
+    if entity_type == 'accommodation':
+        return db.session.query(
+            db.select(Accommodation.id).where(Accommodation.id == entity_id, Accommodation.host_id == user_id).exists()
+        ).scalar()
+    if entity_type == 'transport':
+        return db.session.query(
+            db.select(Transport.id).where(Transport.id == entity_id, Transport.driver_id == user_id).exists()
+        ).scalar()
+    # booking_view keeps archived bookings too
+    return db.session.query(
+        db.select(BookingView.booking_id).where(
+            BookingView.kind == entity_type[:-len('_booking')],
+            BookingView.booking_id == entity_id,
+            db.or_(BookingView.tourist_id == user_id, BookingView.owner_id == user_id)
+        ).exists()
+    ).scalar()
+
+
+class AuditEventsResource(Resource):
+    @jwt_required()
+    def get(self):
+        """Audit events, newest first, filtered by actor_id, entity_type/entity_id and action"""
+        if not isinstance(audit.log.sink, audit.DatabaseSink):
+            return {"message": "Audit events are not stored in the database on this server"}, 501
+        current_user_id = get_jwt_identity()
+
+        entity_type = request.args.get('entity_type')
+        if entity_type is not None and entity_type not in ENTITY_TYPES:
+            return {"message": "entity_type must be one of: {}".format(", ".join(ENTITY_TYPES))}, 400
+        try:
+            entity_id = int(request.args['entity_id']) if request.args.get('entity_id') else None
+            actor_id = int(request.args['actor_id']) if request.args.get('actor_id') else None
+            cursor = int(request.args['cursor']) if request.args.get('cursor') else None
+            limit = int(request.args.get('limit', current_app.config.get("AUDIT_PAGE_SIZE", 50)))
+        except ValueError:
+            return {"message": "entity_id, actor_id, cursor and limit must be integers"}, 400
+        if entity_id is not None and entity_type is None:
+            return {"message": "entity_id needs an entity_type"}, 400
+        limit = max(1, min(limit, current_app.config.get("AUDIT_MAX_PAGE_SIZE", 200)))
+
+        # Owners see everyone's changes to the entity; anyone else only their own actions
+        owner = entity_id is not None and owns_entity(current_user_id, entity_type, entity_id)
+        if actor_id is None and not owner:
+            actor_id = current_user_id
+        if actor_id is not None and actor_id != current_user_id and not owner:
+            return {"message": "Access denied"}, 403
+
+        # Served by the (actor_id, id) or (entity_type, entity_id, region, id) index
+        query = db.select(*columns(AuditEvent, AUDIT_FIELDS))
+        if entity_type is not None:
+            query = query.where(AuditEvent.entity_type == entity_type)
+        if entity_id is not None:
+            # The region owns_entity() checked the id in
+            query = query.where(AuditEvent.entity_id == entity_id, AuditEvent.region == sharding.current_region())
+        elif sharding.requested_region() is not None:
+            query = query.where(AuditEvent.region == sharding.requested_region())
+        if actor_id is not None:
+            query = query.where(AuditEvent.actor_id == actor_id)
+        if request.args.get('action'):
+            query = query.where(AuditEvent.action == request.args['action'])
+        if cursor is not None:
+            query = query.where(AuditEvent.id < cursor)
+
+        # One extra row tells us whether there is another page
+        rows = db.session.execute(query.order_by(AuditEvent.id.desc()).limit(limit + 1)).mappings().all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = rows[-1]['id']
+
+        return {'events': [dict(row) for row in rows], 'next_cursor': next_cursor}, 200
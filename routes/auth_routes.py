@@ -6,6 +6,7 @@ from flask_jwt_extended import (
 )
 
 from models import db, User  # keep this consistent with how your team imports
+from services.rate_limit import rate_limit
 
 auth_bp = Blueprint("auth", __name__)
 
@@ -40,6 +41,7 @@ def login_user(email, password):
 
 # ----------------- ROUTES -----------------
 @auth_bp.route("/register", methods=["POST"])
+@rate_limit("auth")
 def register():
     data = request.get_json() or {}
 
@@ -73,6 +75,7 @@ def register():
 
 
 @auth_bp.route("/login", methods=["POST"])
+@rate_limit("auth")
 def login():
     data = request.get_json() or {}
 
@@ -1,29 +1,247 @@
+from datetime import datetime, timedelta
+from flask import request, current_app
 from flask_restful import Resource
 from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity
-from schemas.booking_schema import parser, transport_parser
-from models import db, AccommodationBooking, TransportBooking, Accommodation, Transport
+from schemas.booking_schema import (
+    accommodation_booking_schema, accommodation_booking_update_schema,
+    transport_booking_schema, transport_booking_update_schema
+)
+from models import (
+    db, AccommodationBooking, TransportBooking, Accommodation, Transport, BookingTombstone, BookingView
+)
 from routes.transport import TransportResource
+from services import jobs, events, booking_view, analytics, audit
+from services.db_routing import use_primary
+from services.projection import parse_fields, parse_ids
+from services.versioning import etag_header, if_match_failed, commit_versioned, PRECONDITION_FAILED
+from services.inventory import seats_taken, dates_taken, lock_transport, lock_accommodation, claim_hold
+from services.rate_limit import rate_limit
+
+
+def accommodation_booking_to_dict(b):
+    return {
+        'id': b.id,
+        'tourist_id': b.tourist_id,
+        'accommodation_id': b.accommodation_id,
+        'itinerary_id': b.itinerary_id,
+        'check_in_date': b.check_in_date,
+        'check_out_date': b.check_out_date,
+        'total_price': b.total_price,
+        'status': b.status,
+        'created_at': b.created_at,
+        'updated_at': b.updated_at,
+        # Archived rows can't be edited any more, so they carry no version
+        'version': getattr(b, 'version', None)
+    }
+
+
+def transport_booking_to_dict(b):
+    return {
+        'id': b.id,
+        'tourist_id': b.tourist_id,
+        'transport_id': b.transport_id,
+        'itinerary_id': b.itinerary_id,
+        'travel_date': b.travel_date,
+        'seats_booked': b.seats_booked,
+        'total_price': b.total_price,
+        'status': b.status,
+        'created_at': b.created_at,
+        'updated_at': b.updated_at,
+        'version': getattr(b, 'version', None)
+    }
+
+
+# Fields clients can ask for with ?fields=; the lists are served from booking_view,
+# so they also carry the listing title/price and the tourist's name
+ACCOMMODATION_BOOKING_FIELDS = tuple(booking_view.ACCOMMODATION_COLUMNS)
+TRANSPORT_BOOKING_FIELDS = tuple(booking_view.TRANSPORT_COLUMNS)
+
+
+def can_view_booking(role, user_id, tourist_id, owner_role, owner_id):
+    """Same rules as the single-booking GETs: tourists see their own, owners their listings'"""
+    if role == 'tourist':
+        return tourist_id == user_id
+    if role == owner_role:
+        return owner_id == user_id
+    return True
+
+
+def fetch_bookings_by_ids(kind, owner_role, fields, ids):
+    """?ids= batch: one IN query on booking_view for the requested columns, then the access check per row.
+
+    Ids that don't exist or that the caller may not see are left out.
+    """
+    claims = get_jwt()
+    role = claims.get("role")
+    current_user_id = get_jwt_identity()
+
+    view_columns = booking_view.COLUMNS[kind]
+    query = db.select(
+        *[view_columns[name].label(name) for name in fields],
+        BookingView.tourist_id.label('_tourist_id'),
+        BookingView.owner_id.label('_owner_id')
+    ).where(BookingView.kind == kind, BookingView.booking_id.in_(ids)).order_by(BookingView.booking_id)
+
+    return [
+        {name: row[name] for name in fields}
+        for row in db.session.execute(query).mappings()
+        if can_view_booking(role, current_user_id, row['_tourist_id'], owner_role, row['_owner_id'])
+    ]
+
+
+def include_past():
+    return request.args.get('include_past', 'false').lower() == 'true'
+
+
+def fetch_accommodation_bookings(fields, tourist_id=None, host_id=None, accommodation_id=None):
+    """Accommodation bookings for a list endpoint, as dicts of `fields` read from booking_view.
+
+    By default only stays that have not ended yet are returned.
+    ?include_past=true returns the full history, including bookings already
+    rolled over into the archive (the view keeps those rows).
+    """
+    return booking_view.fetch(
+        'accommodation', fields, owner_id=host_id, tourist_id=tourist_id,
+        listing_id=accommodation_id, include_past=include_past()
+    )
+
+
+def fetch_transport_bookings(fields, tourist_id=None, driver_id=None, transport_id=None):
+    """Transport bookings for a list endpoint; upcoming only unless ?include_past=true"""
+    return booking_view.fetch(
+        'transport', fields, owner_id=driver_id, tourist_id=tourist_id,
+        listing_id=transport_id, include_past=include_past()
+    )
+
+
+def patched(booking, data, key):
+    """The value `key` will have once the PATCH is applied (None in data means unchanged)"""
+    value = data.get(key)
+    return getattr(booking, key) if value is None else value
+
+
+def reopen_error(booking, data):
+    """PATCH can cancel a booking, but not bring a cancelled one back: its
+    seats or dates may have been booked by someone else since"""
+    if booking.status == 'cancelled' and patched(booking, data, 'status') != 'cancelled':
+        return {"message": "A cancelled booking can't be reopened; make a new booking instead"}, 409
+    return None
+
+
+def transport_patch_error(booking, data):
+    """Error response if the PATCH would reopen a cancelled booking or overbook the vehicle, else None.
+
+    A live booking that moves to another vehicle or date, or changes its
+    seats, is rechecked like a new one, with the vehicle row-locked.
+    """
+    error = reopen_error(booking, data)
+    if error or patched(booking, data, 'status') == 'cancelled':
+        return error
+    transport_id = patched(booking, data, 'transport_id')
+    travel_date = patched(booking, data, 'travel_date')
+    seats = patched(booking, data, 'seats_booked')
+    if (transport_id, travel_date, seats) == (booking.transport_id, booking.travel_date, booking.seats_booked):
+        return None
+    transport = lock_transport(transport_id)
+    if not transport:
+        return {"message": "Transport not found"}, 404
+    if seats_taken(transport_id, travel_date, except_booking_id=booking.id) + seats > transport.total_capacity:
+        return {"message": "Not enough seats available on this date"}, 400
+    return None
+
+
+def accommodation_patch_error(booking, data):
+    """Error response if the PATCH would reopen a cancelled booking or double-book the stay, else None"""
+    error = reopen_error(booking, data)
+    if error:
+        return error
+    accommodation_id = patched(booking, data, 'accommodation_id')
+    check_in_date = patched(booking, data, 'check_in_date')
+    check_out_date = patched(booking, data, 'check_out_date')
+    if check_out_date <= check_in_date:
+        return {"message": "check_out_date must be after check_in_date"}, 400
+    if patched(booking, data, 'status') == 'cancelled':
+        return None
+    if (accommodation_id, check_in_date, check_out_date) == (
+        booking.accommodation_id, booking.check_in_date, booking.check_out_date
+    ):
+        return None
+    # Serialise with other edits moving into the same listing
+    if not lock_accommodation(accommodation_id):
+        return {"message": "Accommodation not found"}, 404
+    if dates_taken(accommodation_id, check_in_date, check_out_date, except_booking_id=booking.id):
+        return {"message": "Dates already booked for this accommodation"}, 409
+    return None
+
+
+def booking_kind_and_owner(booking):
+    """Return ('accommodation', host_id) or ('transport', driver_id) for a booking"""
+    if isinstance(booking, AccommodationBooking):
+        return 'accommodation', booking.accommodation.host_id if booking.accommodation else None
+    return 'transport', booking.transport.driver_id if booking.transport else None
+
+
+def booking_stream_event(action, booking):
+    """Return (channel, event) for pushing this booking to its owner's SSE stream"""
+    kind, owner_id = booking_kind_and_owner(booking)
+    to_dict = accommodation_booking_to_dict if kind == 'accommodation' else transport_booking_to_dict
+    channel = '{}:{}'.format('host' if kind == 'accommodation' else 'driver', owner_id)
+    return channel, {'type': 'booking.' + action, 'kind': kind, 'booking': to_dict(booking)}
+
+
+def booking_committed(action, booking, changes=None):
+    """In-process follow-up once a booking write is committed: audit it, drop
+    the owner's cached occupancy/utilization and push the change to their
+    live stream. `changes` are the request fields, for the audit trail."""
+    kind, owner_id = booking_kind_and_owner(booking)
+    audit.record(action, kind + '_booking', booking.id, changes)
+    analytics.invalidate(kind, owner_id)
+    events.publish(*booking_stream_event(action, booking))
+
+
+def enqueue_booking_event(action, booking):
+    """Queue post-booking side effects (emails, owner notifications, analytics).
+
+    Must be called before the commit so the event is stored atomically with
+    the booking; call jobs.worker.notify() once the commit has gone through.
+    """
+    kind, owner_id = booking_kind_and_owner(booking)
+    jobs.enqueue('booking.' + action, {
+        'kind': kind,
+        'action': action,
+        'booking_id': booking.id,
+        'tourist_id': booking.tourist_id,
+        'owner_id': owner_id,
+    })
 
 
 class TransportBookingResource(Resource):
     @jwt_required()
+    @rate_limit("booking")
     def post(self):
         current_user_id = get_jwt_identity()
-        data = transport_parser.parse_args()
-        
-        transport = Transport.query.filter_by(id=data['transport_id']).with_for_update().first()
-        if not transport:
-            return {"message": "Transport not found"}, 404
-        
-        # Calculate already booked seats for that date
-        booked_seats = db.session.query(db.func.sum(TransportBooking.seats_booked)).filter(
-            TransportBooking.transport_id == data['transport_id'],
-            TransportBooking.travel_date == data['travel_date']
-        ).scalar() or 0
-        
-        # Check if new booking exceeds capacity
-        if booked_seats + data['seats_booked'] > transport.total_capacity:
-            return {"message": "Not enough seats available on this date"}, 400
+        data = transport_booking_schema.parse()
+        hold_id = data.pop('hold_id', None)
+
+        if hold_id is not None:
+            # Seats were reserved when the hold was taken; no lock or recount needed
+            error = claim_hold(
+                hold_id, current_user_id, kind='transport',
+                transport_id=data['transport_id'], travel_date=data['travel_date'], seats=data['seats_booked']
+            )
+            if error:
+                return {"message": error}, 409
+        else:
+            transport = lock_transport(data['transport_id'])
+            if not transport:
+                return {"message": "Transport not found"}, 404
+
+            # Seats already booked or held for that date
+            booked_seats = seats_taken(data['transport_id'], data['travel_date'])
+
+            # Check if new booking exceeds capacity
+            if booked_seats + data['seats_booked'] > transport.total_capacity:
+                return {"message": "Not enough seats available on this date"}, 400
 
 
         # new transport instance
@@ -31,7 +249,12 @@ class TransportBookingResource(Resource):
         trans_inputs.tourist_id = current_user_id
         # save to database
         db.session.add(trans_inputs)
+        db.session.flush()
+        enqueue_booking_event('created', trans_inputs)
+        booking_view.upsert(trans_inputs)
         db.session.commit()
+        jobs.worker.notify()
+        booking_committed('created', trans_inputs, data)
         return {
             "message": "Transport booking created successfully", 
             "booking_id": trans_inputs.id
@@ -43,31 +266,29 @@ class TransportBookingResource(Resource):
         claims = get_jwt()
         role = claims.get("role")
         current_user_id = get_jwt_identity()
+
+        fields, error = parse_fields(TRANSPORT_BOOKING_FIELDS)
+        if error:
+            return error
+        ids, error = parse_ids()
+        if error:
+            return error
+        if ids is not None:
+            return fetch_bookings_by_ids('transport', 'driver', fields, ids), 200
         
         if role == 'tourist':
             # Tourists see only their own bookings
-            bookings = TransportBooking.query.filter_by(tourist_id=current_user_id).all()
+            bookings = fetch_transport_bookings(fields, tourist_id=current_user_id)
         elif role == 'driver':
             # Drivers see bookings for their transport
-            bookings = TransportBooking.query.join(Transport).filter(
-                Transport.driver_id == current_user_id
-            ).all()
+            bookings = fetch_transport_bookings(fields, driver_id=current_user_id)
         elif role == 'host':
             # Hosts see all transport bookings (or can be restricted)
-            bookings = TransportBooking.query.all()
+            bookings = fetch_transport_bookings(fields)
         else:
             return {"message": "Invalid role"}, 403
 
-        return [{
-            'id': b.id,
-            'tourist_id': b.tourist_id,
-            'transport_id': b.transport_id,
-            'travel_date': b.travel_date.isoformat() if b.travel_date else None,
-            'seats_booked': b.seats_booked,
-            'total_price': b.total_price,
-            'status': b.status,
-            'created_at': b.created_at.isoformat() if b.created_at else None
-        } for b in bookings], 200
+        return bookings, 200
         
 class TransportBookingByID(Resource):
     @jwt_required()
@@ -90,16 +311,7 @@ class TransportBookingByID(Resource):
             if not transport or transport.driver_id != current_user_id:
                 return {"message": "Access denied"}, 403
 
-        return {
-            'id': booking.id,
-            'tourist_id': booking.tourist_id,
-            'transport_id': booking.transport_id,
-            'travel_date': booking.travel_date.isoformat() if booking.travel_date else None,
-            'seats_booked': booking.seats_booked,
-            'total_price': booking.total_price,
-            'status': booking.status,
-            'created_at': booking.created_at.isoformat() if booking.created_at else None
-        }, 200
+        return transport_booking_to_dict(booking), 200, etag_header(booking)
     
     @jwt_required()
     def patch(self, id):
@@ -121,23 +333,24 @@ class TransportBookingByID(Resource):
             if not transport or transport.driver_id != current_user_id:
                 return {"message": "Access denied"}, 403
         
-        # Parse arguments
-        data = transport_parser.parse_args()
+        # Parse only the fields being changed
+        data = transport_booking_update_schema.parse()
+        if if_match_failed(booking):
+            return PRECONDITION_FAILED
+        error = transport_patch_error(booking, data)
+        if error:
+            return error
         for key, value in data.items():
             if value is not None:
                 setattr(booking, key, value)
 
-        db.session.commit()
-        return {
-            'id': booking.id,
-            'tourist_id': booking.tourist_id,
-            'transport_id': booking.transport_id,
-            'travel_date': booking.travel_date.isoformat() if booking.travel_date else None,
-            'seats_booked': booking.seats_booked,
-            'total_price': booking.total_price,
-            'status': booking.status,
-            'created_at': booking.created_at.isoformat() if booking.created_at else None
-        }, 200
+        enqueue_booking_event('updated', booking)
+        # 412 if someone else changed the booking since we read it
+        if not commit_versioned(lambda: booking_view.upsert(booking)):
+            return PRECONDITION_FAILED
+        jobs.worker.notify()
+        booking_committed('updated', booking, data)
+        return transport_booking_to_dict(booking), 200, etag_header(booking)
     
     @jwt_required()
     def delete(self, id):
@@ -150,7 +363,7 @@ class TransportBookingByID(Resource):
         if not booking:
             return {"message": "Transport booking not found"}, 404
         
-        # Role-based access control for deleting
+        # Role-based access control for cancelling
         if role == 'tourist' and booking.tourist_id != current_user_id:
             return {"message": "Access denied"}, 403
         elif role == 'driver':
@@ -159,21 +372,32 @@ class TransportBookingByID(Resource):
             if not transport or transport.driver_id != current_user_id:
                 return {"message": "Access denied"}, 403
         
-        db.session.delete(booking)
-        db.session.commit()
-        return {"message": "Transport booking deleted successfully"}, 200
+        if if_match_failed(booking):
+            return PRECONDITION_FAILED
+
+        # Cancelling keeps the row (for history and the changes feed) but frees
+        # the seats/dates, since capacity checks only count live bookings
+        booking.status = 'cancelled'
+        enqueue_booking_event('cancelled', booking)
+        if not commit_versioned(lambda: booking_view.upsert(booking)):
+            return PRECONDITION_FAILED
+        jobs.worker.notify()
+        booking_committed('cancelled', booking)
+        return {"message": "Transport booking cancelled successfully"}, 200
     
 
 class AccommodationBookingResource(Resource):
     @jwt_required()
+    @rate_limit("booking")
     def post(self):
         # Get user identity and role from JWT
         claims = get_jwt()
         role = claims.get("role")
         current_user_id = get_jwt_identity()
         
-        # Parse data using your accommodation-specific parser
-        data = parser.parse_args()
+        # Validate data using the accommodation booking schema
+        data = accommodation_booking_schema.parse()
+        hold_id = data.pop('hold_id', None)
         
         # Set tourist_id to current user (from JWT)
         data['tourist_id'] = current_user_id
@@ -182,14 +406,17 @@ class AccommodationBookingResource(Resource):
         if data['check_out_date'] <= data['check_in_date']:
             return {"message": "check_out_date must be after check_in_date"}, 400
 
-        # Check for overlapping bookings
-        conflict = AccommodationBooking.query.filter(
-            AccommodationBooking.accommodation_id == data['accommodation_id'],
-            AccommodationBooking.check_in_date < data['check_out_date'],
-            AccommodationBooking.check_out_date > data['check_in_date']
-        ).first()
-
-        if conflict:
+        if hold_id is not None:
+            # The hold already reserved these dates
+            error = claim_hold(
+                hold_id, current_user_id, kind='accommodation',
+                accommodation_id=data['accommodation_id'],
+                check_in_date=data['check_in_date'], check_out_date=data['check_out_date']
+            )
+            if error:
+                return {"message": error}, 409
+        # Check for overlapping bookings and other tourists' holds
+        elif dates_taken(data['accommodation_id'], data['check_in_date'], data['check_out_date']):
             return {"message": "Dates already booked for this accommodation"}, 409
 
         
@@ -197,7 +424,12 @@ class AccommodationBookingResource(Resource):
         new_booking = AccommodationBooking(**data)
         
         db.session.add(new_booking)
+        db.session.flush()
+        enqueue_booking_event('created', new_booking)
+        booking_view.upsert(new_booking)
         db.session.commit()
+        jobs.worker.notify()
+        booking_committed('created', new_booking, data)
         
         return {
             "message": "Accommodation booking created successfully", 
@@ -210,31 +442,29 @@ class AccommodationBookingResource(Resource):
         claims = get_jwt()
         role = claims.get("role")
         current_user_id = get_jwt_identity()
+
+        fields, error = parse_fields(ACCOMMODATION_BOOKING_FIELDS)
+        if error:
+            return error
+        ids, error = parse_ids()
+        if error:
+            return error
+        if ids is not None:
+            return fetch_bookings_by_ids('accommodation', 'host', fields, ids), 200
         
         if role == 'tourist':
             # Tourists see only their own bookings
-            bookings = AccommodationBooking.query.filter_by(tourist_id=current_user_id).all()
+            bookings = fetch_accommodation_bookings(fields, tourist_id=current_user_id)
         elif role == 'host':
             # Hosts see bookings for their accommodations
-            bookings = AccommodationBooking.query.join(Accommodation).filter(
-                Accommodation.host_id == current_user_id
-            ).all()
+            bookings = fetch_accommodation_bookings(fields, host_id=current_user_id)
         elif role == 'driver':
             # Drivers can see all accommodation bookings
-            bookings = AccommodationBooking.query.all()
+            bookings = fetch_accommodation_bookings(fields)
         else:
             return {"message": "Invalid role"}, 403
 
-        return [{
-            'id': b.id,
-            'tourist_id': b.tourist_id,
-            'accommodation_id': b.accommodation_id,
-            'check_in_date': b.check_in_date.isoformat() if b.check_in_date else None,
-            'check_out_date': b.check_out_date.isoformat() if b.check_out_date else None,
-            'total_price': b.total_price,
-            'status': b.status,
-            'created_at': b.created_at.isoformat() if b.created_at else None
-        } for b in bookings], 200
+        return bookings, 200
     
 
 class AccommodationBookingByID(Resource):
@@ -259,16 +489,7 @@ class AccommodationBookingByID(Resource):
             if not accommodation or accommodation.host_id != current_user_id:
                 return {"message": "Access denied"}, 403
 
-        return {
-            'id': booking.id,
-            'tourist_id': booking.tourist_id,
-            'accommodation_id': booking.accommodation_id,
-            'check_in_date': booking.check_in_date.isoformat() if booking.check_in_date else None,
-            'check_out_date': booking.check_out_date.isoformat() if booking.check_out_date else None,
-            'total_price': booking.total_price,
-            'status': booking.status,
-            'created_at': booking.created_at.isoformat() if booking.created_at else None
-        }, 200
+        return accommodation_booking_to_dict(booking), 200, etag_header(booking)
 
     @jwt_required()
     def patch(self, id):
@@ -290,23 +511,24 @@ class AccommodationBookingByID(Resource):
             if not accommodation or accommodation.host_id != current_user_id:
                 return {"message": "Access denied"}, 403
         
-        data = parser.parse_args()
+        data = accommodation_booking_update_schema.parse()
+        if if_match_failed(booking):
+            return PRECONDITION_FAILED
+        error = accommodation_patch_error(booking, data)
+        if error:
+            return error
         # Update attributes dynamically
         for key, value in data.items():
             if value is not None:
                 setattr(booking, key, value)
 
-        db.session.commit()
-        return {
-            'id': booking.id,
-            'tourist_id': booking.tourist_id,
-            'accommodation_id': booking.accommodation_id,
-            'check_in_date': booking.check_in_date.isoformat() if booking.check_in_date else None,
-            'check_out_date': booking.check_out_date.isoformat() if booking.check_out_date else None,
-            'total_price': booking.total_price,
-            'status': booking.status,
-            'created_at': booking.created_at.isoformat() if booking.created_at else None
-        }, 200
+        enqueue_booking_event('updated', booking)
+        # 412 if someone else changed the booking since we read it
+        if not commit_versioned(lambda: booking_view.upsert(booking)):
+            return PRECONDITION_FAILED
+        jobs.worker.notify()
+        booking_committed('updated', booking, data)
+        return accommodation_booking_to_dict(booking), 200, etag_header(booking)
 
     @jwt_required()
     def delete(self, id):
@@ -319,7 +541,7 @@ class AccommodationBookingByID(Resource):
         if not booking:
             return {"message": "Accommodation booking not found"}, 404
         
-        # Role-based access control for deleting
+        # Role-based access control for cancelling
         if role == 'tourist' and booking.tourist_id != current_user_id:
             return {"message": "Access denied"}, 403
         elif role == 'host':
@@ -328,9 +550,18 @@ class AccommodationBookingByID(Resource):
             if not accommodation or accommodation.host_id != current_user_id:
                 return {"message": "Access denied"}, 403
         
-        db.session.delete(booking)
-        db.session.commit()
-        return {"message": "Accommodation booking deleted successfully"}, 200
+        if if_match_failed(booking):
+            return PRECONDITION_FAILED
+
+        # Cancelling keeps the row (for history and the changes feed) but frees
+        # the seats/dates, since capacity checks only count live bookings
+        booking.status = 'cancelled'
+        enqueue_booking_event('cancelled', booking)
+        if not commit_versioned(lambda: booking_view.upsert(booking)):
+            return PRECONDITION_FAILED
+        jobs.worker.notify()
+        booking_committed('cancelled', booking)
+        return {"message": "Accommodation booking cancelled successfully"}, 200
 
 class HostBookingsResource(Resource):
     @jwt_required()
@@ -342,22 +573,15 @@ class HostBookingsResource(Resource):
         
         if role != 'host':
             return {"message": "Access denied. Host access only."}, 403
+
+        fields, error = parse_fields(ACCOMMODATION_BOOKING_FIELDS)
+        if error:
+            return error
         
         # Get all bookings for accommodations owned by this host
-        bookings = AccommodationBooking.query.join(Accommodation).filter(
-            Accommodation.host_id == current_user_id
-        ).all()
-
-        return [{
-            'id': b.id,
-            'tourist_id': b.tourist_id,
-            'accommodation_id': b.accommodation_id,
-            'check_in_date': b.check_in_date.isoformat() if b.check_in_date else None,
-            'check_out_date': b.check_out_date.isoformat() if b.check_out_date else None,
-            'total_price': b.total_price,
-            'status': b.status,
-            'created_at': b.created_at.isoformat() if b.created_at else None
-        } for b in bookings], 200
+        bookings = fetch_accommodation_bookings(fields, host_id=current_user_id)
+
+        return bookings, 200
 
 class HostAccommodationBookingsResource(Resource):
     @jwt_required()
@@ -377,22 +601,15 @@ class HostAccommodationBookingsResource(Resource):
         
         if accommodation.host_id != current_user_id:
             return {"message": "Access denied. You don't own this accommodation."}, 403
+
+        fields, error = parse_fields(ACCOMMODATION_BOOKING_FIELDS)
+        if error:
+            return error
         
         # Get all bookings for this accommodation
-        bookings = AccommodationBooking.query.filter_by(
-            accommodation_id=accommodation_id
-        ).all()
-
-        return [{
-            'id': b.id,
-            'tourist_id': b.tourist_id,
-            'accommodation_id': b.accommodation_id,
-            'check_in_date': b.check_in_date.isoformat() if b.check_in_date else None,
-            'check_out_date': b.check_out_date.isoformat() if b.check_out_date else None,
-            'total_price': b.total_price,
-            'status': b.status,
-            'created_at': b.created_at.isoformat() if b.created_at else None
-        } for b in bookings], 200
+        bookings = fetch_accommodation_bookings(fields, accommodation_id=accommodation_id)
+
+        return bookings, 200
 
 class DriverBookingsResource(Resource):
     @jwt_required()
@@ -404,22 +621,15 @@ class DriverBookingsResource(Resource):
         
         if role != 'driver':
             return {"message": "Access denied. Driver access only."}, 403
+
+        fields, error = parse_fields(TRANSPORT_BOOKING_FIELDS)
+        if error:
+            return error
         
         # Get all bookings for transports owned by this driver
-        bookings = TransportBooking.query.join(Transport).filter(
-            Transport.driver_id == current_user_id
-        ).all()
-
-        return [{
-            'id': b.id,
-            'tourist_id': b.tourist_id,
-            'transport_id': b.transport_id,
-            'travel_date': b.travel_date.isoformat() if b.travel_date else None,
-            'seats_booked': b.seats_booked,
-            'total_price': b.total_price,
-            'status': b.status,
-            'created_at': b.created_at.isoformat() if b.created_at else None
-        } for b in bookings], 200
+        bookings = fetch_transport_bookings(fields, driver_id=current_user_id)
+
+        return bookings, 200
 
 class DriverTransportBookingsResource(Resource):
     @jwt_required()
@@ -439,21 +649,120 @@ class DriverTransportBookingsResource(Resource):
         
         if transport.driver_id != current_user_id:
             return {"message": "Access denied. You don't own this transport."}, 403
+
+        fields, error = parse_fields(TRANSPORT_BOOKING_FIELDS)
+        if error:
+            return error
         
         # Get all bookings for this transport
-        bookings = TransportBooking.query.filter_by(
-            transport_id=transport_id
-        ).all()
-
-        return [{
-            'id': b.id,
-            'tourist_id': b.tourist_id,
-            'transport_id': b.transport_id,
-            'travel_date': b.travel_date.isoformat() if b.travel_date else None,
-            'seats_booked': b.seats_booked,
-            'total_price': b.total_price,
-            'status': b.status,
-            'created_at': b.created_at.isoformat() if b.created_at else None
-        } for b in bookings], 200
+        bookings = fetch_transport_bookings(fields, transport_id=transport_id)
+
+        return bookings, 200
 
 #wip
+
+
+def parse_changes_cursor():
+    """Read ?since= from the query string; returns (datetime or None, error response)"""
+    since = request.args.get('since')
+    if not since:
+        return None, None
+    try:
+        return datetime.fromisoformat(since), None
+    except ValueError:
+        return None, ({"message": "since must be a cursor returned by a previous changes call"}, 400)
+
+
+def changes_response(changed, tombstones, to_dict, since):
+    """Build the sync payload and the cursor for the next call.
+
+    The cursor is the newest timestamp seen, but never later than
+    CHANGE_FEED_OVERLAP_SECONDS ago: a write that was stamped just before us
+    may not have committed yet, so the most recent few seconds are re-sent on
+    the next call. Clients upsert by id, so seeing a row twice is harmless.
+    """
+    stamps = [b.updated_at for b in changed if b.updated_at] + [t.deleted_at for t in tombstones]
+    cursor = since
+    if stamps:
+        overlap = current_app.config.get("CHANGE_FEED_OVERLAP_SECONDS", 2)
+        cursor = min(max(stamps), datetime.utcnow() - timedelta(seconds=overlap))
+        if since is not None and cursor < since:
+            cursor = since
+    return {
+        'changed': [to_dict(b) for b in changed],
+        'deleted': [t.booking_id for t in tombstones],
+        'cursor': cursor
+    }, 200
+
+
+class HostBookingChangesResource(Resource):
+    @jwt_required()
+    def get(self):
+        """Accommodation bookings changed or archived since the given cursor"""
+        claims = get_jwt()
+        role = claims.get("role")
+        current_user_id = get_jwt_identity()
+
+        if role != 'host':
+            return {"message": "Access denied. Host access only."}, 403
+
+        since, error = parse_changes_cursor()
+        if error:
+            return error
+
+        # A lagging replica could hand out a cursor past rows it hasn't seen yet
+        use_primary()
+
+        changed = AccommodationBooking.query.join(Accommodation).filter(
+            Accommodation.host_id == current_user_id
+        )
+        tombstones = BookingTombstone.query.filter_by(kind='accommodation', owner_id=current_user_id)
+        if since is not None:
+            changed = changed.filter(AccommodationBooking.updated_at > since)
+            tombstones = tombstones.filter(BookingTombstone.deleted_at > since)
+        else:
+            # First sync: the client has nothing to delete yet
+            tombstones = tombstones.filter(db.false())
+
+        return changes_response(
+            changed.order_by(AccommodationBooking.updated_at).all(),
+            tombstones.order_by(BookingTombstone.deleted_at).all(),
+            accommodation_booking_to_dict,
+            since
+        )
+
+
+class DriverBookingChangesResource(Resource):
+    @jwt_required()
+    def get(self):
+        """Transport bookings changed or archived since the given cursor"""
+        claims = get_jwt()
+        role = claims.get("role")
+        current_user_id = get_jwt_identity()
+
+        if role != 'driver':
+            return {"message": "Access denied. Driver access only."}, 403
+
+        since, error = parse_changes_cursor()
+        if error:
+            return error
+
+        # A lagging replica could hand out a cursor past rows it hasn't seen yet
+        use_primary()
+
+        changed = TransportBooking.query.join(Transport).filter(
+            Transport.driver_id == current_user_id
+        )
+        tombstones = BookingTombstone.query.filter_by(kind='transport', owner_id=current_user_id)
+        if since is not None:
+            changed = changed.filter(TransportBooking.updated_at > since)
+            tombstones = tombstones.filter(BookingTombstone.deleted_at > since)
+        else:
+            tombstones = tombstones.filter(db.false())
+
+        return changes_response(
+            changed.order_by(TransportBooking.updated_at).all(),
+            tombstones.order_by(BookingTombstone.deleted_at).all(),
+            transport_booking_to_dict,
+            since
+        )
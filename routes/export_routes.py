@@ -0,0 +1,134 @@
+from datetime import date
+from flask import request
+from flask_restful import Resource
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity
+from models import (
+    db, User, Accommodation, Transport, AccommodationBooking, TransportBooking,
+    AccommodationBookingArchive, TransportBookingArchive
+)
+from services import sharding
+from services.export import EXPORT_FORMATS, export_response, parquet_available
+
+ACCOMMODATION_EXPORT_COLUMNS = (
+    ('id', 'int'), ('accommodation_id', 'int'), ('accommodation_title', 'str'),
+    ('tourist_id', 'int'), ('tourist_name', 'str'), ('check_in_date', 'date'), ('check_out_date', 'date'),
+    ('total_price', 'float'), ('status', 'str'), ('created_at', 'datetime'), ('updated_at', 'datetime'),
+)
+TRANSPORT_EXPORT_COLUMNS = (
+    ('id', 'int'), ('transport_id', 'int'), ('vehicle_type', 'str'),
+    ('tourist_id', 'int'), ('tourist_name', 'str'), ('travel_date', 'date'), ('seats_booked', 'int'),
+    ('total_price', 'float'), ('status', 'str'), ('created_at', 'datetime'), ('updated_at', 'datetime'),
+)
+
+
+def parse_export_args():
+    """Returns (format, from, to, error response)"""
+    format = request.args.get('format', 'csv').lower()
+    if format not in EXPORT_FORMATS:
+        return None, None, None, ({"message": "format must be one of: csv, parquet"}, 400)
+    if format == 'parquet' and not parquet_available():
+        return None, None, None, ({"message": "Parquet export is not available on this server (pyarrow is not installed)"}, 501)
+    try:
+        start = date.fromisoformat(request.args['from']) if request.args.get('from') else None
+        end = date.fromisoformat(request.args['to']) if request.args.get('to') else None
+    except ValueError:
+        return None, None, None, ({"message": "from and to must be dates (format: YYYY-MM-DD)"}, 400)
+    return format, start, end, None
+
+
+def tourist_name_column(model):
+    """User.name, or NULL when the bookings are on a shard and fill_tourist_names() supplies it"""
+    return db.null() if sharding.users_on_other_database(model) else User.name
+
+
+def join_tourist(query, model):
+    if sharding.users_on_other_database(model):
+        return query
+    return query.join(User, User.id == model.tourist_id)
+
+
+def fill_tourist_names(rows):
+    """Put the tourist names (column 4) into a batch of shard rows, read from the primary in one query"""
+    names = sharding.tourist_names({row[3] for row in rows})
+    return [tuple(row[:4]) + (names.get(row[3]),) + tuple(row[5:]) for row in rows]
+
+
+def tourist_names_fill(model):
+    return fill_tourist_names if sharding.users_on_other_database(model) else None
+
+
+def accommodation_export_query(model, host_id, start, end):
+    query = join_tourist(db.select(
+        model.id, model.accommodation_id, Accommodation.title,
+        model.tourist_id, tourist_name_column(model), model.check_in_date, model.check_out_date,
+        model.total_price, model.status, model.created_at, model.updated_at
+    ).join(Accommodation, Accommodation.id == model.accommodation_id), model).where(Accommodation.host_id == host_id)
+    if start is not None:
+        query = query.where(model.check_in_date >= start)
+    if end is not None:
+        query = query.where(model.check_in_date <= end)
+    return query.order_by(model.check_in_date, model.id)
+
+
+def transport_export_query(model, driver_id, start, end):
+    query = join_tourist(db.select(
+        model.id, model.transport_id, Transport.vehicle_type,
+        model.tourist_id, tourist_name_column(model), model.travel_date, model.seats_booked,
+        model.total_price, model.status, model.created_at, model.updated_at
+    ).join(Transport, Transport.id == model.transport_id), model).where(Transport.driver_id == driver_id)
+    if start is not None:
+        query = query.where(model.travel_date >= start)
+    if end is not None:
+        query = query.where(model.travel_date <= end)
+    return query.order_by(model.travel_date, model.id)
+
+
+class HostBookingExportResource(Resource):
+    @jwt_required()
+    def get(self):
+        """All bookings (archived and live) for the host's accommodations as CSV or Parquet"""
+        claims = get_jwt()
+        role = claims.get("role")
+        current_user_id = get_jwt_identity()
+
+        if role != 'host':
+            return {"message": "Access denied. Host access only."}, 403
+
+        format, start, end, error = parse_export_args()
+        if error:
+            return error
+
+        # Archived rows are all older, so exporting them first keeps date order
+        queries = [
+            accommodation_export_query(model, current_user_id, start, end)
+            for model in (AccommodationBookingArchive, AccommodationBooking)
+        ]
+        return export_response(
+            'accommodation_bookings', ACCOMMODATION_EXPORT_COLUMNS, queries, format,
+            fill=tourist_names_fill(AccommodationBooking)
+        )
+
+
+class DriverBookingExportResource(Resource):
+    @jwt_required()
+    def get(self):
+        """All bookings (archived and live) for the driver's transports as CSV or Parquet"""
+        claims = get_jwt()
+        role = claims.get("role")
+        current_user_id = get_jwt_identity()
+
+        if role != 'driver':
+            return {"message": "Access denied. Driver access only."}, 403
+
+        format, start, end, error = parse_export_args()
+        if error:
+            return error
+
+        queries = [
+            transport_export_query(model, current_user_id, start, end)
+            for model in (TransportBookingArchive, TransportBooking)
+        ]
+        return export_response(
+            'transport_bookings', TRANSPORT_EXPORT_COLUMNS, queries, format,
+            fill=tourist_names_fill(TransportBooking)
+        )
@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta
+from flask import request, current_app
+from flask_restful import Resource
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity
+from schemas.hold_schema import accommodation_hold_schema, transport_hold_schema
+from models import db, InventoryHold, Accommodation
+from services.inventory import seats_taken, dates_taken, lock_transport
+from services.rate_limit import rate_limit
+
+
+def hold_to_dict(h):
+    return {
+        'id': h.id,
+        'tourist_id': h.tourist_id,
+        'kind': h.kind,
+        'accommodation_id': h.accommodation_id,
+        'check_in_date': h.check_in_date,
+        'check_out_date': h.check_out_date,
+        'transport_id': h.transport_id,
+        'travel_date': h.travel_date,
+        'seats': h.seats,
+        'status': h.status,
+        'expires_at': h.expires_at,
+        'created_at': h.created_at
+    }
+
+
+def hold_expiry(minutes):
+    # Clamp the requested lifetime so a client can't park inventory indefinitely
+    if minutes is None:
+        minutes = current_app.config.get("HOLD_TTL_MINUTES", 10)
+    minutes = max(1, min(minutes, current_app.config.get("HOLD_MAX_MINUTES", 30)))
+    return datetime.utcnow() + timedelta(minutes=minutes)
+
+
+class HoldResource(Resource):
+    @jwt_required()
+    @rate_limit("booking")
+    def post(self):
+        claims = get_jwt()
+        role = claims.get("role")
+        current_user_id = get_jwt_identity()
+
+        if role != 'tourist':
+            return {"message": "Only tourists can hold inventory"}, 403
+
+        body = request.get_json(silent=True) or {}
+        kind = body.get('kind')
+
+        if kind == 'transport':
+            data = transport_hold_schema.parse()
+            if data['seats'] < 1:
+                return {"message": "seats must be at least 1"}, 400
+
+            # Lock only for the count + insert; the booking later claims the hold without locking
+            transport = lock_transport(data['transport_id'])
+            if not transport:
+                return {"message": "Transport not found"}, 404
+            if seats_taken(data['transport_id'], data['travel_date']) + data['seats'] > transport.total_capacity:
+                return {"message": "Not enough seats available on this date"}, 409
+
+            hold = InventoryHold(
+                tourist_id=current_user_id,
+                kind='transport',
+                transport_id=data['transport_id'],
+                travel_date=data['travel_date'],
+                seats=data['seats'],
+                expires_at=hold_expiry(data.get('minutes'))
+            )
+        elif kind == 'accommodation':
+            data = accommodation_hold_schema.parse()
+            if data['check_out_date'] <= data['check_in_date']:
+                return {"message": "check_out_date must be after check_in_date"}, 400
+
+            accommodation = Accommodation.query.filter_by(id=data['accommodation_id']).with_for_update().first()
+            if not accommodation:
+                return {"message": "Accommodation not found"}, 404
+            if dates_taken(data['accommodation_id'], data['check_in_date'], data['check_out_date']):
+                return {"message": "Dates already booked for this accommodation"}, 409
+
+            hold = InventoryHold(
+                tourist_id=current_user_id,
+                kind='accommodation',
+                accommodation_id=data['accommodation_id'],
+                check_in_date=data['check_in_date'],
+                check_out_date=data['check_out_date'],
+                expires_at=hold_expiry(data.get('minutes'))
+            )
+        else:
+            return {"message": "kind must be one of: accommodation, transport"}, 400
+
+        db.session.add(hold)
+        db.session.commit()
+
+        return {"message": "Hold created", "hold": hold_to_dict(hold)}, 201
+
+    @jwt_required()
+    def get(self, id):
+        current_user_id = get_jwt_identity()
+
+        hold = db.session.get(InventoryHold, id)
+        if not hold or hold.tourist_id != current_user_id:
+            return {"message": "Hold not found"}, 404
+
+        return hold_to_dict(hold), 200
+
+    @jwt_required()
+    def delete(self, id):
+        current_user_id = get_jwt_identity()
+
+        hold = db.session.get(InventoryHold, id)
+        if not hold or hold.tourist_id != current_user_id:
+            return {"message": "Hold not found"}, 404
+
+        # Give the inventory back straight away instead of waiting for expiry
+        if hold.status == 'active':
+            hold.status = 'released'
+            db.session.commit()
+
+        return {"message": "Hold released", "hold": hold_to_dict(hold)}, 200
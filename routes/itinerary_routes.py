@@ -0,0 +1,189 @@
+from flask import request, current_app
+from flask_restful import Resource
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from schemas.booking_schema import accommodation_booking_schema, transport_booking_schema
+from models import db, Itinerary, AccommodationBooking, TransportBooking, Accommodation, Transport
+from routes.booking_routes import (
+    accommodation_booking_to_dict, transport_booking_to_dict,
+    enqueue_booking_event, booking_committed
+)
+from services import jobs, booking_view
+from services.rate_limit import rate_limit
+from services.inventory import seats_taken_many, stays_taken_many, claim_hold
+
+
+def itinerary_to_dict(itinerary):
+    return {
+        'id': itinerary.id,
+        'tourist_id': itinerary.tourist_id,
+        'created_at': itinerary.created_at,
+        'accommodation_bookings': [accommodation_booking_to_dict(b) for b in itinerary.accommodation_bookings],
+        'transport_bookings': [transport_booking_to_dict(b) for b in itinerary.transport_bookings]
+    }
+
+
+def validate_items(body):
+    """Parse both legs lists; returns (stays, rides, errors)"""
+    stays, stay_errors = accommodation_booking_schema.load_many(body.get('accommodations') or [])
+    rides, ride_errors = transport_booking_schema.load_many(body.get('transports') or [])
+    for index, stay in enumerate(stays):
+        if stay['check_out_date'] <= stay['check_in_date']:
+            stay_errors.append({"index": index, "errors": {"check_out_date": "check_out_date must be after check_in_date"}})
+    for index, ride in enumerate(rides):
+        if ride['seats_booked'] < 1:
+            ride_errors.append({"index": index, "errors": {"seats_booked": "seats_booked must be at least 1"}})
+    errors = {}
+    if stay_errors:
+        errors['accommodations'] = stay_errors
+    if ride_errors:
+        errors['transports'] = ride_errors
+    return stays, rides, errors
+
+
+def lock_listings(model, ids):
+    """SELECT ... FOR UPDATE the listings in id order.
+
+    Every itinerary locks accommodations before transports and each in
+    ascending id, so two overlapping itineraries can only wait on each other,
+    never deadlock.
+    """
+    if not ids:
+        return {}
+    rows = model.query.filter(model.id.in_(ids)).order_by(model.id).with_for_update().all()
+    return {row.id: row for row in rows}
+
+
+def capacity_conflicts(stays, rides, transports):
+    """Check every leg against current bookings/holds and each other, in one query per table"""
+    conflicts = []
+
+    if rides:
+        taken = seats_taken_many(
+            {r['transport_id'] for r in rides},
+            {r['travel_date'] for r in rides}
+        )
+        for index, ride in enumerate(rides):
+            key = (ride['transport_id'], ride['travel_date'])
+            taken[key] = taken.get(key, 0) + ride['seats_booked']
+            if taken[key] > transports[ride['transport_id']].total_capacity:
+                conflicts.append({"kind": "transport", "index": index, "message": "Not enough seats available on this date"})
+
+    if stays:
+        existing = stays_taken_many(
+            {s['accommodation_id'] for s in stays},
+            min(s['check_in_date'] for s in stays),
+            max(s['check_out_date'] for s in stays)
+        )
+        for index, stay in enumerate(stays):
+            # Earlier stays in this request count as taken too
+            for accommodation_id, check_in, check_out in existing:
+                if (accommodation_id == stay['accommodation_id']
+                        and check_in < stay['check_out_date'] and check_out > stay['check_in_date']):
+                    conflicts.append({"kind": "accommodation", "index": index, "message": "Dates already booked for this accommodation"})
+                    break
+            existing.append((stay['accommodation_id'], stay['check_in_date'], stay['check_out_date']))
+
+    return conflicts
+
+
+class ItineraryResource(Resource):
+    @jwt_required()
+    @rate_limit("booking")
+    def post(self):
+        """Book several stays and transport legs at once: all of them or none"""
+        current_user_id = get_jwt_identity()
+
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict):
+            return {"message": "Expected a JSON object with accommodations and/or transports"}, 400
+        if not isinstance(body.get('accommodations') or [], list) or not isinstance(body.get('transports') or [], list):
+            return {"message": "accommodations and transports must be lists"}, 400
+
+        count = len(body.get('accommodations') or []) + len(body.get('transports') or [])
+        if count == 0:
+            return {"message": "An itinerary needs at least one booking"}, 400
+        if count > current_app.config.get("ITINERARY_MAX_ITEMS", 20):
+            return {"message": "Too many bookings in one itinerary"}, 400
+
+        stays, rides, errors = validate_items(body)
+        if errors:
+            return {"message": errors}, 400
+
+        accommodations = lock_listings(Accommodation, {s['accommodation_id'] for s in stays})
+        transports = lock_listings(Transport, {r['transport_id'] for r in rides})
+        missing = [
+            {"kind": "accommodation", "index": i, "message": "Accommodation not found"}
+            for i, s in enumerate(stays) if s['accommodation_id'] not in accommodations
+        ] + [
+            {"kind": "transport", "index": i, "message": "Transport not found"}
+            for i, r in enumerate(rides) if r['transport_id'] not in transports
+        ]
+        if missing:
+            db.session.rollback()
+            return {"message": "Itinerary could not be booked", "conflicts": missing}, 404
+
+        # Claimed holds stop counting against capacity, so the check below sees each leg once
+        for kind, legs in (('accommodation', stays), ('transport', rides)):
+            for index, leg in enumerate(legs):
+                hold_id = leg.pop('hold_id', None)
+                if hold_id is None:
+                    continue
+                if kind == 'accommodation':
+                    error = claim_hold(
+                        hold_id, current_user_id, kind=kind, accommodation_id=leg['accommodation_id'],
+                        check_in_date=leg['check_in_date'], check_out_date=leg['check_out_date']
+                    )
+                else:
+                    error = claim_hold(
+                        hold_id, current_user_id, kind=kind, transport_id=leg['transport_id'],
+                        travel_date=leg['travel_date'], seats=leg['seats_booked']
+                    )
+                if error:
+                    db.session.rollback()
+                    return {"message": "Itinerary could not be booked", "conflicts": [
+                        {"kind": kind, "index": index, "message": error}
+                    ]}, 409
+
+        conflicts = capacity_conflicts(stays, rides, transports)
+        if conflicts:
+            db.session.rollback()
+            return {"message": "Itinerary could not be booked", "conflicts": conflicts}, 409
+
+        itinerary = Itinerary(tourist_id=current_user_id)
+        db.session.add(itinerary)
+        db.session.flush()
+
+        bookings = [
+            AccommodationBooking(tourist_id=current_user_id, itinerary_id=itinerary.id, **stay) for stay in stays
+        ] + [
+            TransportBooking(tourist_id=current_user_id, itinerary_id=itinerary.id, **ride) for ride in rides
+        ]
+        db.session.add_all(bookings)
+        db.session.flush()
+        for booking in bookings:
+            enqueue_booking_event('created', booking)
+            booking_view.upsert(booking)
+        db.session.commit()
+
+        jobs.worker.notify()
+        for booking, leg in zip(bookings, stays + rides):
+            booking_committed('created', booking, leg)
+
+        return {
+            "message": "Itinerary booked successfully",
+            "itinerary_id": itinerary.id,
+            "accommodation_booking_ids": [b.id for b in bookings if isinstance(b, AccommodationBooking)],
+            "transport_booking_ids": [b.id for b in bookings if isinstance(b, TransportBooking)]
+        }, 201
+
+    @jwt_required()
+    def get(self, id):
+        current_user_id = get_jwt_identity()
+
+        itinerary = db.session.get(Itinerary, id)
+        if not itinerary:
+            return {"message": "Itinerary not found"}, 404
+        if itinerary.tourist_id != current_user_id:
+            return {"message": "Access denied"}, 403
+
+        return itinerary_to_dict(itinerary), 200
@@ -0,0 +1,44 @@
+from flask import Response, current_app, stream_with_context
+from flask_restful import Resource
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity
+from services import events
+
+# EventSource can't set an Authorization header, so these endpoints also
+# accept the token as ?jwt=<access_token>
+
+
+def sse_response(channel):
+    heartbeat = current_app.config.get("SSE_HEARTBEAT_SECONDS", 15)
+    return Response(
+        stream_with_context(events.stream(channel, heartbeat)),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+class HostBookingStreamResource(Resource):
+    @jwt_required(locations=["headers", "query_string"])
+    def get(self):
+        """Push new, changed and cancelled bookings for the host's accommodations"""
+        claims = get_jwt()
+        role = claims.get("role")
+        current_user_id = get_jwt_identity()
+
+        if role != 'host':
+            return {"message": "Access denied. Host access only."}, 403
+
+        return sse_response("host:{}".format(current_user_id))
+
+
+class DriverBookingStreamResource(Resource):
+    @jwt_required(locations=["headers", "query_string"])
+    def get(self):
+        """Push new, changed and cancelled bookings for the driver's transports"""
+        claims = get_jwt()
+        role = claims.get("role")
+        current_user_id = get_jwt_identity()
+
+        if role != 'driver':
+            return {"message": "Access denied. Driver access only."}, 403
+
+        return sse_response("driver:{}".format(current_user_id))
@@ -1,39 +1,64 @@
-from flask_restful import Resource, reqparse
+import heapq
+from datetime import date, timedelta
+from flask import request, current_app
+from flask_restful import Resource
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models import Transport, User
+from services.bulk_import import request_rows, import_rows
+from services import booking_view, analytics, audit, sharding
+from services.rate_limit import rate_limit
+from services.inventory import available_transports
+from services.archive import upcoming_bookings_exist, tombstone_listing_bookings
 from extensions import db
+from services.projection import parse_fields, parse_ids, columns
+from services.versioning import etag_header, if_match_failed, commit_versioned, PRECONDITION_FAILED
+from schemas.validation import Schema, Field
 
 # Validation RULES
 
-parser = reqparse.RequestParser()
-parser.add_argument("vehicle_type", type=str, required=True, help="Vehicle type is required")
-parser.add_argument("price_per_day", type=float, required=True, help="Price per day is required")
-parser.add_argument("total_capacity", type=int, required=True, help="Total capacity is required")
-parser.add_argument("available", type=bool)  # Optional
+transport_schema = Schema(
+    vehicle_type=Field(str, required=True, help="Vehicle type is required"),
+    price_per_day=Field(float, required=True, help="Price per day is required"),
+    total_capacity=Field(int, required=True, help="Total capacity is required"),
+    available=Field(bool),  # Optional
+)
 
-# Parser for PATCH requests (updating transports)
-update_parser = reqparse.RequestParser()
-update_parser.add_argument("vehicle_type", type=str)
-update_parser.add_argument("price_per_day", type=float)
-update_parser.add_argument("total_capacity", type=int)
-update_parser.add_argument("available", type=bool)
+# Schema for PATCH requests (updating transports)
+transport_update_schema = transport_schema.partial()
+
+# Fields clients can ask for with ?fields=
+TRANSPORT_FIELDS = (
+    'id', 'vehicle_type', 'price_per_day', 'total_capacity',
+    'available', 'driver_id', 'region', 'created_at', 'version'
+)
 
 
 class TransportResource(Resource):
+  @rate_limit("catalog")
   def get(self, id = None):
 
     if id is None:
-      transports = Transport.query.all()
-
-      return [{
-          'id': t.id,
-          'vehicle_type': t.vehicle_type,
-          'price_per_day': t.price_per_day,
-          'total_capacity': t.total_capacity,
-          'available': t.available,
-          'driver_id': t.driver_id,
-          'created_at': t.created_at.isoformat() if t.created_at else None
-      } for t in transports]
+      fields, error = parse_fields(TRANSPORT_FIELDS)
+      if error:
+        return error
+      ids, error = parse_ids()
+      if error:
+        return error
+
+      region = sharding.requested_region()
+      # Ids repeat across regions, so rows from every region always carry theirs
+      if region is None and 'region' not in fields:
+        fields += ('region',)
+      # Only the requested columns are selected
+      query = db.select(*columns(Transport, fields)).order_by(Transport.region, Transport.id)
+      if ids is not None:
+        query = query.where(Transport.id.in_(ids))
+      if region is not None:
+        query = query.where(Transport.region == region)
+        return [dict(row) for row in db.session.execute(query).mappings()]
+      # Every region: each database in parallel, merged back into (region, id) order
+      results = sharding.fan_out(lambda: [dict(row) for row in db.session.execute(query).mappings()])
+      return list(heapq.merge(*results, key=lambda row: (row['region'], row['id'])))
 
     transport = Transport.query.filter(Transport.id == id).first()
 
@@ -47,8 +72,10 @@ class TransportResource(Resource):
         'total_capacity': transport.total_capacity,
         'available': transport.available,
         'driver_id': transport.driver_id,
-        'created_at': transport.created_at.isoformat() if transport.created_at else None
-    }
+        'region': transport.region,
+        'created_at': transport.created_at,
+        'version': transport.version
+    }, 200, etag_header(transport)
   
   @jwt_required()
   def post(self):
@@ -61,17 +88,21 @@ class TransportResource(Resource):
         return {"message": "Only drivers can create transports"}, 403
     
     # Validates incoming data
-    data = parser.parse_args()
+    data = transport_schema.parse()
 
     transport = Transport(
         driver_id=current_user_id,
         vehicle_type=data['vehicle_type'],
         price_per_day=data['price_per_day'],
         total_capacity=data['total_capacity'],
-        available=data.get('available', True)
+        available=data.get('available', True),
+        region=sharding.current_region()
     )
     db.session.add(transport)
     db.session.commit()
+    audit.record('created', 'transport', transport.id, data)
+    # New row in the driver's utilization matrix
+    analytics.invalidate('transport', current_user_id)
 
     return {"message": "Transport created successfully"}, 201
   
@@ -81,7 +112,7 @@ class TransportResource(Resource):
     # Get current user from JWT
     current_user_id = get_jwt_identity()
     
-    data = update_parser.parse_args()
+    data = transport_update_schema.parse()
 
     transport = Transport.query.filter(Transport.id == id).first()
 
@@ -91,14 +122,22 @@ class TransportResource(Resource):
     # Check if user owns this transport
     if transport.driver_id != current_user_id:
         return {"message": "You can only update your own transports"}, 403
+
+    # Client edited an older copy than the one stored now
+    if if_match_failed(transport):
+      return PRECONDITION_FAILED
     
     # updates only provided fields
     for key, value in data.items():
       if value is not None:
         setattr(transport, key, value)
 
-    db.session.commit()
-    return {"message": "transport updated successfully"}
+    if not commit_versioned(lambda: booking_view.refresh_listing('transport', transport)):
+      return PRECONDITION_FAILED
+    audit.record('updated', 'transport', id, data)
+    # Capacity changes move every fill rate
+    analytics.invalidate('transport', current_user_id)
+    return {"message": "transport updated successfully"}, 200, etag_header(transport)
   
   @jwt_required()
   # DELETE METHOD
@@ -115,7 +154,95 @@ class TransportResource(Resource):
       if transport.driver_id != current_user_id:
           return {"message": "You can only delete your own transports"}, 403
 
+      if if_match_failed(transport):
+          return PRECONDITION_FAILED
+
+      # Riders with upcoming trips must be cancelled first; the remaining
+      # (past or cancelled) bookings go with the transport, so sync clients get tombstones
+      if upcoming_bookings_exist('transport', id):
+          return {"message": "Cancel the upcoming bookings of this transport before deleting it"}, 409
+      tombstone_listing_bookings('transport', id)
       db.session.delete(transport)
-      db.session.commit()
+      if not commit_versioned(lambda: booking_view.remove_listing('transport', id)):
+          return PRECONDITION_FAILED
+      audit.record('deleted', 'transport', id)
+      analytics.invalidate('transport', current_user_id)
         
-      return {"message": "Transport deleted successfully"}
\ No newline at end of file
+      return {"message": "Transport deleted successfully"}
+
+
+class TransportAvailabilityResource(Resource):
+  @rate_limit("catalog")
+  def get(self):
+    """Vehicles with enough free seats on a date (?date=) or every day of a range (?from=&to=)"""
+    try:
+      if request.args.get('date'):
+        first_day = last_day = date.fromisoformat(request.args['date'])
+      else:
+        first_day = date.fromisoformat(request.args['from'])
+        last_day = date.fromisoformat(request.args.get('to') or request.args['from'])
+    except (KeyError, ValueError):
+      return {"message": "Give date, or from and to (format: YYYY-MM-DD)"}, 400
+
+    if last_day < first_day:
+      return {"message": "to must not be before from"}, 400
+    max_days = current_app.config.get("TRANSPORT_SEARCH_MAX_DAYS", 31)
+    if last_day - first_day >= timedelta(days=max_days):
+      return {"message": "Search at most {} days at a time".format(max_days)}, 400
+
+    try:
+      seats = int(request.args.get('seats', 1))
+    except ValueError:
+      return {"message": "seats must be an integer"}, 400
+    if seats < 1:
+      return {"message": "seats must be at least 1"}, 400
+
+    vehicle_type = request.args.get('vehicle_type')
+    region = sharding.requested_region()
+
+    def search():
+      return [{
+          'id': t.id,
+          'vehicle_type': t.vehicle_type,
+          'price_per_day': t.price_per_day,
+          'total_capacity': t.total_capacity,
+          'seats_remaining': seats_remaining,
+          'driver_id': t.driver_id,
+          'region': t.region
+      } for t, seats_remaining in available_transports(first_day, last_day, seats, vehicle_type, region)]
+
+    if region is not None:
+      return search()
+    # Cheapest first across every region's database; ids repeat across regions,
+    # so equal prices are ordered by (region, id)
+    return list(heapq.merge(*sharding.fan_out(search), key=lambda t: (t['price_per_day'], t['region'], t['id'])))
+
+
+class TransportBulkResource(Resource):
+  @jwt_required()
+  def post(self):
+    """Create many transports from a JSON array or a CSV upload"""
+    current_user_id = get_jwt_identity()
+    user = db.session.get(User, current_user_id)
+
+    # Role is checked once for the whole upload
+    if user is None or user.role != 'driver':
+      return {"message": "Only drivers can create transports"}, 403
+
+    rows = request_rows()
+    if rows is None:
+      return {"message": "Send a JSON array of transports or a CSV file"}, 400
+
+    result, error = import_rows(
+        Transport, transport_schema, rows, {'available': True},
+        driver_id=current_user_id, region=sharding.current_region()
+    )
+    if error:
+      return error
+    if not result['created'] and result['errors']:
+      return {"message": "No transports were created", **result}, 400
+    for transport_id in result['created']:
+      audit.record('created', 'transport', transport_id)
+    analytics.invalidate('transport', current_user_id)
+
+    return {"message": "{} transports created".format(len(result['created'])), **result}, 201
@@ -0,0 +1,111 @@
+from datetime import date
+from flask import request, current_app
+from flask_restful import Resource
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from models import db, AccommodationBooking, TransportBooking, Accommodation, Transport
+
+# The tourist's itinerary: stays and transport legs in one timeline, ordered
+# by (date, kind, id). Both tables are read in a single UNION ALL query; each
+# branch walks its (tourist_id, date, id) index and stops after one page, so
+# the database never sorts more than two pages however long the history is.
+
+TRIP_KINDS = ('accommodation', 'transport')
+
+
+def parse_trip_cursor(value):
+    """Cursor is '<date>,<kind>,<id>' of the last trip on the previous page"""
+    try:
+        day, kind, id = value.split(',')
+        if kind not in TRIP_KINDS:
+            raise ValueError(kind)
+        return date.fromisoformat(day), kind, int(id)
+    except ValueError:
+        return None
+
+
+def after_cursor(kind, date_col, id_col, cursor):
+    """Keyset predicate for one branch; `kind` is constant there, so it folds away"""
+    cursor_date, cursor_kind, cursor_id = cursor
+    if kind > cursor_kind:
+        return date_col >= cursor_date
+    if kind < cursor_kind:
+        return date_col > cursor_date
+    return db.or_(date_col > cursor_date, db.and_(date_col == cursor_date, id_col > cursor_id))
+
+
+def trip_branch(kind, model, listing, date_col, end_col, listing_col, seats_col, title_col,
+                tourist_id, start, end, cursor, limit):
+    query = db.select(
+        db.literal(kind).label('kind'),
+        model.id.label('id'),
+        date_col.label('date'),
+        end_col.label('end_date'),
+        listing_col.label('listing_id'),
+        title_col.label('title'),
+        seats_col.label('seats'),
+        model.total_price.label('total_price'),
+        model.status.label('status'),
+    ).join(listing, listing.id == listing_col).where(
+        model.tourist_id == tourist_id,
+        model.live()
+    )
+    if start is not None:
+        query = query.where(date_col >= start)
+    if end is not None:
+        query = query.where(date_col <= end)
+    if cursor is not None:
+        query = query.where(after_cursor(kind, date_col, model.id, cursor))
+    # Wrapped so each branch can stop early on its own index
+    return db.select(query.order_by(date_col, model.id).limit(limit).subquery())
+
+
+class MyTripsResource(Resource):
+    @jwt_required()
+    def get(self):
+        """Accommodation stays and transport legs for the current user, in date order"""
+        current_user_id = get_jwt_identity()
+
+        try:
+            start = date.fromisoformat(request.args['from']) if request.args.get('from') else None
+            end = date.fromisoformat(request.args['to']) if request.args.get('to') else None
+        except ValueError:
+            return {"message": "from and to must be dates (format: YYYY-MM-DD)"}, 400
+
+        cursor = None
+        if request.args.get('cursor'):
+            cursor = parse_trip_cursor(request.args['cursor'])
+            if cursor is None:
+                return {"message": "cursor must be the next_cursor of a previous page"}, 400
+
+        default_limit = current_app.config.get("TRIPS_PAGE_SIZE", 50)
+        try:
+            limit = int(request.args.get('limit', default_limit))
+        except ValueError:
+            return {"message": "limit must be an integer"}, 400
+        limit = max(1, min(limit, current_app.config.get("TRIPS_MAX_PAGE_SIZE", 200)))
+
+        # One extra row tells us whether there is another page
+        stays = trip_branch(
+            'accommodation', AccommodationBooking, Accommodation,
+            AccommodationBooking.check_in_date, AccommodationBooking.check_out_date,
+            AccommodationBooking.accommodation_id, db.null(), Accommodation.title,
+            current_user_id, start, end, cursor, limit + 1
+        )
+        legs = trip_branch(
+            'transport', TransportBooking, Transport,
+            TransportBooking.travel_date, TransportBooking.travel_date,
+            TransportBooking.transport_id, TransportBooking.seats_booked, Transport.vehicle_type,
+            current_user_id, start, end, cursor, limit + 1
+        )
+        trips = db.union_all(stays, legs).subquery('trips')
+        rows = db.session.execute(
+            db.select(trips).order_by(trips.c.date, trips.c.kind, trips.c.id).limit(limit + 1)
+        ).mappings().all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = '{},{},{}'.format(last['date'].isoformat(), last['kind'], last['id'])
+
+        return {'trips': [dict(row) for row in rows], 'next_cursor': next_cursor}, 200
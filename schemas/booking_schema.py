@@ -1,86 +1,77 @@
-from flask_restful import reqparse
-from datetime import datetime
-
-
-parser=reqparse.RequestParser()
-parser.add_argument(
-    'accommodation_id',
-    type=int,
-    required=True,
-    help='accommodation_id required'
-)
-
-
-parser.add_argument(  'check_in_date',
-    type=lambda s: datetime.strptime(s, '%Y-%m-%d').date(),
-    required=True,
-    help='check_in_date required (format: YYYY-MM-DD)'
-)
-
-parser.add_argument(  'check_out_date',
-    type=lambda s: datetime.strptime(s, '%Y-%m-%d').date(),
-    required=True,
-    help='check_out_date required (format: YYYY-MM-DD)'
+from datetime import date
+from schemas.validation import Schema, Field
+
+
+# Accommodation booking schema
+accommodation_booking_schema = Schema(
+    accommodation_id=Field(
+        int,
+        required=True,
+        help='accommodation_id required'
+    ),
+    check_in_date=Field(
+        date,
+        required=True,
+        help='check_in_date required (format: YYYY-MM-DD)'
+    ),
+    check_out_date=Field(
+        date,
+        required=True,
+        help='check_out_date required (format: YYYY-MM-DD)'
+    ),
+    total_price=Field(
+        float,
+        required=True,
+        help='total_price required and must be a float'
+    ),
+    status=Field(
+        str,
+        choices=('pending', 'confirmed', 'cancelled'),
+        default='pending',
+        help='status must be one of: pending, confirmed, cancelled'
+    ),
+    hold_id=Field(
+        int,
+        help='hold_id must be the id returned by POST /holds'
+    ),
 )
 
-parser.add_argument(
-    'total_price',
-    type=float,
-    required=True,
-    help='total_price required and must be a float'
+# PATCH: only the fields being changed, and no defaults (so status isn't reset)
+accommodation_booking_update_schema = accommodation_booking_schema.partial(exclude=('hold_id',))
+
+
+# Transport booking schema
+transport_booking_schema = Schema(
+    transport_id=Field(
+        int,
+        required=True,
+        help='transport_id required'
+    ),
+    travel_date=Field(
+        date,
+        required=True,
+        help='travel_date required (format: YYYY-MM-DD)'
+    ),
+    total_price=Field(
+        float,
+        required=True,
+        help='total_price required and must be a float'
+    ),
+    seats_booked=Field(
+        int,
+        required=True,
+        help='seats_booked required and must be an integer'
+    ),
+    status=Field(
+        str,
+        choices=('pending', 'confirmed', 'cancelled'),
+        default='pending',
+        help='status must be one of: pending, confirmed, cancelled'
+    ),
+    hold_id=Field(
+        int,
+        help='hold_id must be the id returned by POST /holds'
+    ),
 )
 
-parser.add_argument(
-    'status',
-    type=str,
-    choices=('pending', 'confirmed', 'cancelled'),
-    default='pending',
-    help='status must be one of: pending, confirmed, cancelled'
-)
-
-
-
-
-#Trnsport booking parser
-
-transport_parser=reqparse.RequestParser()
-
-transport_parser.add_argument(
-    'transport_id',
-    type=int,
-    required=True,
-    help='transport_id required'
-)
-
-transport_parser.add_argument(  'travel_date',
-    type=lambda s: datetime.strptime(s, '%Y-%m-%d').date(),
-    required=True,
-    help='travel_date required (format: YYYY-MM-DD)'
-)
-
-transport_parser.add_argument(
-    'total_price',
-    type=float,
-    required=True,
-    help='total_price required and must be a float'
-)
-
-transport_parser.add_argument(
-    'seats_booked',
-    type=int,
-    required=True,
-    help='seats_booked required and must be an integer'
-)   
-
-transport_parser.add_argument(
-    'status',
-    type=str,
-    choices=('pending', 'confirmed', 'cancelled'),
-    default='pending',
-    help='status must be one of: pending, confirmed, cancelled'
-)   
-
- 
-
-
-
+transport_booking_update_schema = transport_booking_schema.partial(exclude=('hold_id',))
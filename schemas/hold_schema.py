@@ -0,0 +1,49 @@
+from datetime import date
+from schemas.validation import Schema, Field
+
+
+# Accommodation hold: reserve the dates for a stay
+accommodation_hold_schema = Schema(
+    accommodation_id=Field(
+        int,
+        required=True,
+        help='accommodation_id required'
+    ),
+    check_in_date=Field(
+        date,
+        required=True,
+        help='check_in_date required (format: YYYY-MM-DD)'
+    ),
+    check_out_date=Field(
+        date,
+        required=True,
+        help='check_out_date required (format: YYYY-MM-DD)'
+    ),
+    minutes=Field(
+        int,
+        help='minutes must be an integer'
+    ),
+)
+
+# Transport hold: reserve seats on a travel date
+transport_hold_schema = Schema(
+    transport_id=Field(
+        int,
+        required=True,
+        help='transport_id required'
+    ),
+    travel_date=Field(
+        date,
+        required=True,
+        help='travel_date required (format: YYYY-MM-DD)'
+    ),
+    seats=Field(
+        int,
+        required=True,
+        help='seats required and must be an integer'
+    ),
+    minutes=Field(
+        int,
+        help='minutes must be an integer'
+    ),
+)
@@ -0,0 +1,193 @@
+import threading
+import time
+from datetime import timedelta
+
+from flask import current_app
+
+from extensions import db
+from services import sharding
+from models import (
+    Accommodation, Transport, AccommodationBooking, TransportBooking,
+    AccommodationBookingArchive, TransportBookingArchive
+)
+
+try:
+    import numpy
+except ImportError:  # in the Pipfile; without it the occupancy/utilization endpoints return 501
+    numpy = None
+
+# Owner dashboards: listing x day occupancy for hosts, vehicle x day seat
+# fill for drivers.
+#
+# The booking intervals overlapping the window are read in one query (live
+# and archived tables) and turned into the matrix with NumPy: each stay adds
+# +1 at its first night and -1 after its last one in a difference array, and
+# a cumulative sum along the days gives the nights booked. Seats are
+# scatter-added per (vehicle, day) the same way.
+#
+# Results are cached per owner, region and window until the owner's next booking
+# write in this process (invalidate(), called from booking_committed in
+# routes/booking_routes.py and the listing edits), and for at most ANALYTICS_CACHE_SECONDS, which bounds
+# how stale other worker processes can be.
+
+_lock = threading.Lock()
+# (kind, owner_id, region) -> generation, bumped by every write for that owner
+_generations = {}
+# (kind, owner_id, region) -> {(first_day, last_day): (generation, expires, result)}
+_cache = {}
+# Windows kept per owner; an owner's dashboard usually asks for one or two
+MAX_WINDOWS = 8
+
+
+def available():
+    return numpy is not None
+
+
+def invalidate(kind, owner_id):
+    """Drop cached matrices for an owner; call on every write that changes their bookings or listings"""
+    key = (kind, owner_id, sharding.current_region())
+    with _lock:
+        _generations[key] = _generations.get(key, 0) + 1
+        _cache.pop(key, None)
+
+
+def _cached(kind, owner_id, first_day, last_day, build):
+    key = (kind, owner_id, sharding.current_region())
+    window = (first_day, last_day)
+    now = time.monotonic()
+    with _lock:
+        generation = _generations.get(key, 0)
+        hit = _cache.get(key, {}).get(window)
+        if hit is not None and hit[0] == generation and hit[1] > now:
+            return hit[2]
+
+    result = build(owner_id, first_day, last_day)
+
+    ttl = current_app.config.get("ANALYTICS_CACHE_SECONDS", 300)
+    with _lock:
+        # A write that landed while we were building may not be in the result
+        if _generations.get(key, 0) == generation:
+            windows = _cache.setdefault(key, {})
+            if len(windows) >= MAX_WINDOWS:
+                windows.clear()
+            windows[window] = (generation, now + ttl, result)
+    return result
+
+
+def _day_offsets(dates, first_day):
+    """Days since first_day for a sequence of dates, as an int array"""
+    return (numpy.array(dates, dtype='datetime64[D]') - numpy.datetime64(first_day, 'D')).astype(numpy.int64)
+
+
+def _days(first_day, last_day):
+    return [first_day + timedelta(days=i) for i in range((last_day - first_day).days + 1)]
+
+
+def _rates(numerator, denominator):
+    """numerator / denominator rounded to 4 places, 0 where the denominator is 0"""
+    out = numpy.zeros(numpy.shape(numerator), dtype=float)
+    numpy.divide(numerator, denominator, out=out, where=numpy.asarray(denominator) > 0)
+    return numpy.round(out, 4).tolist()
+
+
+def _build_occupancy(host_id, first_day, last_day):
+    listings = db.session.execute(
+        db.select(Accommodation.id, Accommodation.title).where(Accommodation.host_id == host_id).order_by(Accommodation.id)
+    ).all()
+    day_count = (last_day - first_day).days + 1
+    end = last_day + timedelta(days=1)
+
+    stays = []
+    for model in (AccommodationBookingArchive, AccommodationBooking):
+        stays.extend(db.session.execute(
+            db.select(model.accommodation_id, model.check_in_date, model.check_out_date)
+            .join(Accommodation, Accommodation.id == model.accommodation_id)
+            .where(
+                Accommodation.host_id == host_id,
+                model.check_in_date < end,
+                model.check_out_date > first_day,
+                model.status != db.literal_column("'cancelled'")
+            )
+        ).all())
+
+    nights = numpy.zeros((len(listings), day_count), dtype=numpy.int64)
+    if stays and listings:
+        ids, check_ins, check_outs = zip(*stays)
+        row_of = {listing.id: row for row, listing in enumerate(listings)}
+        rows = numpy.array([row_of[i] for i in ids], dtype=numpy.int64)
+        # Clip to the window; check-out day is not a night
+        starts = numpy.clip(_day_offsets(check_ins, first_day), 0, day_count)
+        stops = numpy.clip(_day_offsets(check_outs, first_day), 0, day_count)
+        # Difference array, one spare column for stays running past the window
+        width = day_count + 1
+        diff = numpy.bincount(rows * width + starts, minlength=len(listings) * width) \
+            - numpy.bincount(rows * width + stops, minlength=len(listings) * width)
+        nights = numpy.cumsum(diff.reshape(len(listings), width), axis=1)[:, :day_count]
+        # Overlapping stays shouldn't exist, but a day is occupied or not
+        nights = numpy.minimum(nights, 1)
+
+    return {
+        'from': first_day,
+        'to': last_day,
+        'days': _days(first_day, last_day),
+        'accommodations': [{'id': listing.id, 'title': listing.title} for listing in listings],
+        'occupied': nights.tolist(),
+        'listing_occupancy': _rates(nights.sum(axis=1), day_count),
+        'daily_occupancy': _rates(nights.sum(axis=0), len(listings)),
+        'occupancy': _rates(nights.sum(), nights.size),
+    }
+
+
+def _build_utilization(driver_id, first_day, last_day):
+    vehicles = db.session.execute(
+        db.select(Transport.id, Transport.vehicle_type, Transport.total_capacity)
+        .where(Transport.driver_id == driver_id).order_by(Transport.id)
+    ).all()
+    day_count = (last_day - first_day).days + 1
+
+    rides = []
+    for model in (TransportBookingArchive, TransportBooking):
+        rides.extend(db.session.execute(
+            db.select(model.transport_id, model.travel_date, model.seats_booked)
+            .join(Transport, Transport.id == model.transport_id)
+            .where(
+                Transport.driver_id == driver_id,
+                model.travel_date.between(first_day, last_day),
+                model.status != db.literal_column("'cancelled'")
+            )
+        ).all())
+
+    seats = numpy.zeros((len(vehicles), day_count), dtype=numpy.int64)
+    if rides and vehicles:
+        ids, travel_dates, counts = zip(*rides)
+        row_of = {vehicle.id: row for row, vehicle in enumerate(vehicles)}
+        rows = numpy.array([row_of[i] for i in ids], dtype=numpy.int64)
+        cells = rows * day_count + _day_offsets(travel_dates, first_day)
+        # Rides are single days, so a weighted bincount is the whole scatter-add
+        seats = numpy.bincount(
+            cells, weights=numpy.array(counts, dtype=float), minlength=seats.size
+        ).astype(numpy.int64).reshape(seats.shape)
+
+    capacity = numpy.array([vehicle.total_capacity for vehicle in vehicles], dtype=numpy.int64)
+    return {
+        'from': first_day,
+        'to': last_day,
+        'days': _days(first_day, last_day),
+        'transports': [
+            {'id': vehicle.id, 'vehicle_type': vehicle.vehicle_type, 'total_capacity': vehicle.total_capacity}
+            for vehicle in vehicles
+        ],
+        'seats_booked': seats.tolist(),
+        'fill': _rates(seats, capacity[:, None]),
+        'vehicle_fill': _rates(seats.sum(axis=1), capacity * day_count),
+        'daily_fill': _rates(seats.sum(axis=0), capacity.sum()),
+        'fill_overall': _rates(seats.sum(), capacity.sum() * day_count),
+    }
+
+
+def occupancy(host_id, first_day, last_day):
+    return _cached('accommodation', host_id, first_day, last_day, _build_occupancy)
+
+
+def utilization(driver_id, first_day, last_day):
+    return _cached('transport', driver_id, first_day, last_day, _build_utilization)
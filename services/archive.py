@@ -0,0 +1,127 @@
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import insert, delete, select, literal, func, or_, and_
+from extensions import db
+from services.partitions import ensure_month_partitions
+from models import (
+    Accommodation, Transport, AccommodationBooking, TransportBooking,
+    AccommodationBookingArchive, TransportBookingArchive, BookingTombstone
+)
+
+ACCOMMODATION_COLUMNS = (
+    'id', 'tourist_id', 'accommodation_id', 'itinerary_id', 'check_in_date', 'check_out_date',
+    'total_price', 'status', 'created_at', 'updated_at'
+)
+TRANSPORT_COLUMNS = (
+    'id', 'tourist_id', 'transport_id', 'itinerary_id', 'travel_date', 'seats_booked',
+    'total_price', 'status', 'created_at', 'updated_at'
+)
+
+
+def _move(live, archive, columns, partition_column, kind, listing, owner_column, listing_fk, where, batch_size, now):
+    """Copy matching rows into the archive table, tombstone them and delete them from the live table.
+
+    Works in batches, each in its own transaction, so the live table is never
+    locked for long. Returns the number of rows moved.
+    """
+    moved = 0
+    while True:
+        ids = [row[0] for row in db.session.execute(
+            select(live.id).where(where).order_by(live.id).limit(batch_size)
+        )]
+        if not ids:
+            return moved
+
+        first_day, last_day = db.session.execute(
+            select(func.min(partition_column), func.max(partition_column)).where(live.id.in_(ids))
+        ).one()
+        ensure_month_partitions(archive.__tablename__, first_day, last_day)
+
+        live_columns = [getattr(live, c) for c in columns]
+        db.session.execute(
+            insert(archive).from_select(
+                list(columns) + ['archived_at'],
+                select(*live_columns, literal(now)).where(live.id.in_(ids))
+            )
+        )
+        # Synced clients drop archived rows from their live view
+        db.session.execute(
+            insert(BookingTombstone).from_select(
+                ['kind', 'booking_id', 'owner_id', 'tourist_id', 'deleted_at'],
+                select(literal(kind), live.id, owner_column, live.tourist_id, literal(now))
+                .join(listing, listing.id == listing_fk)
+                .where(live.id.in_(ids))
+            )
+        )
+        db.session.execute(delete(live).where(live.id.in_(ids)))
+        db.session.commit()
+        moved += len(ids)
+
+
+def _listing_bookings(kind):
+    """(live booking model, listing fk column, end date column, listing model, owner column)"""
+    if kind == 'accommodation':
+        return (AccommodationBooking, AccommodationBooking.accommodation_id, AccommodationBooking.check_out_date,
+                Accommodation, Accommodation.host_id)
+    return TransportBooking, TransportBooking.transport_id, TransportBooking.travel_date, Transport, Transport.driver_id
+
+
+def upcoming_bookings_exist(kind, listing_id):
+    """Whether the listing still has bookings that are not cancelled and not over yet"""
+    live, listing_fk, end_date, _, _ = _listing_bookings(kind)
+    return db.session.query(
+        select(live.id).where(
+            listing_fk == listing_id,
+            live.status != 'cancelled',
+            end_date >= date.today()
+        ).exists()
+    ).scalar()
+
+
+def tombstone_listing_bookings(kind, listing_id):
+    """Tombstone the live-table bookings of a listing about to be deleted (they are deleted with it).
+
+    Call before deleting the listing, in the same transaction. Archived
+    bookings already got their tombstone when they were moved.
+    """
+    live, listing_fk, _, listing, owner_column = _listing_bookings(kind)
+    db.session.execute(
+        insert(BookingTombstone).from_select(
+            ['kind', 'booking_id', 'owner_id', 'tourist_id', 'deleted_at'],
+            select(literal(kind), live.id, owner_column, live.tourist_id, literal(datetime.utcnow()))
+            .join(listing, listing.id == listing_fk)
+            .where(listing_fk == listing_id)
+        )
+    )
+
+
+def archive_bookings(older_than_days=90, batch_size=1000):
+    """Move finished and long-cancelled bookings out of the live tables.
+
+    A booking is archived once its stay/travel date is more than
+    `older_than_days` in the past, or once it has been cancelled for that
+    long. Returns (accommodation_count, transport_count).
+    """
+    cutoff_date = date.today() - timedelta(days=older_than_days)
+    cutoff_time = datetime.utcnow() - timedelta(days=older_than_days)
+    now = datetime.utcnow()
+
+    accommodation_count = _move(
+        AccommodationBooking, AccommodationBookingArchive, ACCOMMODATION_COLUMNS, AccommodationBooking.check_in_date,
+        'accommodation', Accommodation, Accommodation.host_id, AccommodationBooking.accommodation_id,
+        or_(
+            AccommodationBooking.check_out_date < cutoff_date,
+            and_(AccommodationBooking.status == 'cancelled', AccommodationBooking.updated_at < cutoff_time)
+        ),
+        batch_size, now
+    )
+    transport_count = _move(
+        TransportBooking, TransportBookingArchive, TRANSPORT_COLUMNS, TransportBooking.travel_date,
+        'transport', Transport, Transport.driver_id, TransportBooking.transport_id,
+        or_(
+            TransportBooking.travel_date < cutoff_date,
+            and_(TransportBooking.status == 'cancelled', TransportBooking.updated_at < cutoff_time)
+        ),
+        batch_size, now
+    )
+    return accommodation_count, transport_count
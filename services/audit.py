@@ -0,0 +1,199 @@
+import atexit
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+from flask import has_request_context, request
+from flask_jwt_extended import get_jwt_identity
+from werkzeug.utils import import_string
+
+from extensions import db
+from models import AuditEvent
+from services import sharding
+
+logger = logging.getLogger(__name__)
+
+# Audit trail of booking and listing writes.
+#
+# Routes call record() once their write has committed. The event goes into
+# an in-memory buffer and the request moves on; a background thread writes
+# the buffer out in batches, when AUDIT_BATCH_SIZE events are waiting or
+# every AUDIT_FLUSH_SECONDS, and once more at shutdown. The trade-off is that
+# a process killed outright loses up to one flush interval of events.
+#
+# Events go to the audit_events table by default. Point AUDIT_SINK at another
+# Sink (e.g. "services.audit:JsonlSink") to append them to a rotating
+# JSON-lines file instead.
+
+
+class Sink:
+    """Where flushed batches go"""
+
+    def __init__(self, app=None):
+        pass
+
+    def write(self, events):
+        """Persist a list of event dicts (AuditEvent columns)"""
+        raise NotImplementedError
+
+
+class DatabaseSink(Sink):
+    def __init__(self, app=None):
+        super().__init__(app)
+        self.app = app
+
+    def write(self, events):
+        # Own connection and transaction, never a request's session
+        with self.app.app_context():
+            with db.engine.begin() as connection:
+                connection.execute(db.insert(AuditEvent), events)
+
+
+class JsonlSink(Sink):
+    """One JSON object per line in AUDIT_LOG_PATH (default instance/audit.log), rotated by size"""
+
+    def __init__(self, app=None):
+        super().__init__(app)
+        path = app.config.get("AUDIT_LOG_PATH")
+        if not path:
+            os.makedirs(app.instance_path, exist_ok=True)
+            path = os.path.join(app.instance_path, "audit.log")
+        self._handler = RotatingFileHandler(
+            path,
+            maxBytes=app.config.get("AUDIT_LOG_MAX_BYTES", 50 * 1024 * 1024),
+            backupCount=app.config.get("AUDIT_LOG_BACKUPS", 10)
+        )
+
+    def write(self, events):
+        for event in events:
+            self._handler.handle(logging.makeLogRecord({"msg": json.dumps(event, default=lambda value: value.isoformat())}))
+
+
+class AuditLog:
+    """Buffers audit events and writes them to the sink in batches from one thread"""
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.sink = None
+        self._buffer = []
+        self._lock = threading.Lock()
+        # Held while writing, so batches reach the sink in order
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get("AUDIT_ENABLED", True)
+        self.batch_size = app.config.get("AUDIT_BATCH_SIZE", 200)
+        self.flush_interval = app.config.get("AUDIT_FLUSH_SECONDS", 2)
+        self.max_buffer = app.config.get("AUDIT_MAX_BUFFER", 10000)
+        path = app.config.get("AUDIT_SINK")
+        self.sink = import_string(path)(app) if path else DatabaseSink(app)
+        atexit.register(self.shutdown)
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="audit-flusher", daemon=True)
+            self._thread.start()
+
+    def record(self, action, entity_type, entity_id, changes=None):
+        if not self.enabled:
+            return
+        event = {
+            "occurred_at": datetime.utcnow(),
+            "actor_id": _actor_id(),
+            "action": action,
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+            "region": sharding.current_region(),
+            "route": "{} {}".format(request.method, request.path) if has_request_context() else None,
+            "changes": _plain(changes),
+        }
+        with self._lock:
+            self._buffer.append(event)
+            full = len(self._buffer) >= self.batch_size
+        self._ensure_started()
+        if full:
+            self._wake.set()
+
+    def flush(self):
+        """Write out everything buffered so far; returns the number of events written"""
+        with self._flush_lock:
+            with self._lock:
+                events, self._buffer = self._buffer, []
+            written = 0
+            for start in range(0, len(events), self.batch_size):
+                batch = events[start:start + self.batch_size]
+                try:
+                    self.sink.write(batch)
+                except Exception:
+                    logger.exception("Could not write %s audit events; keeping them for the next flush", len(batch))
+                    self._requeue(events[start:])
+                    break
+                written += len(batch)
+            return written
+
+    def _requeue(self, events):
+        with self._lock:
+            self._buffer[:0] = events
+            # The sink has been down for a while; don't grow without bound
+            overflow = len(self._buffer) - self.max_buffer
+            if overflow > 0:
+                del self._buffer[:overflow]
+                logger.error("Audit buffer full, dropped the %s oldest events", overflow)
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def shutdown(self, timeout=10):
+        """Stop the flusher and write whatever is still buffered"""
+        if self._thread is not None:
+            self._stopping.set()
+            self._wake.set()
+            self._thread.join(timeout)
+            self._thread = None
+        if self.sink is not None:
+            self.flush()
+
+
+def _actor_id():
+    try:
+        return get_jwt_identity()
+    except RuntimeError:
+        # Outside a request or a JWT-protected view
+        return None
+
+
+def _plain(changes):
+    """Request fields as JSON-friendly values (dates as ISO strings)"""
+    if not changes:
+        return None
+    return {
+        key: value.isoformat() if hasattr(value, 'isoformat') else value
+        for key, value in changes.items() if value is not None
+    } or None
+
+
+log = AuditLog()
+
+
+def init_app(app):
+    log.init_app(app)
+
+
+def record(action, entity_type, entity_id, changes=None):
+    """Queue an audit event for a committed write; the actor and route come from the current request"""
+    log.record(action, entity_type, entity_id, changes)
@@ -0,0 +1,183 @@
+from datetime import date
+
+from extensions import db
+from services import statements, sharding
+from models import (
+    BookingView, User, Accommodation, Transport, AccommodationBooking, TransportBooking,
+    AccommodationBookingArchive, TransportBookingArchive
+)
+
+# Write and read side of the booking_view read model.
+#
+# Every route that writes a booking calls upsert() before committing, and
+# listing PATCH/DELETE call refresh_listing()/remove_listing(), so the view
+# changes in the same transaction as the data it copies. Archiving leaves
+# view rows in place: the view keeps the whole history, and the lists only
+# filter on dates. rebuild() regenerates it from scratch.
+
+# Response field -> view column, for each kind of booking. Lists return these
+# keys, and ?fields= / ?ids= select the matching columns directly.
+ACCOMMODATION_COLUMNS = {
+    'id': BookingView.booking_id,
+    'tourist_id': BookingView.tourist_id,
+    'accommodation_id': BookingView.listing_id,
+    'itinerary_id': BookingView.itinerary_id,
+    'check_in_date': BookingView.start_date,
+    'check_out_date': BookingView.end_date,
+    'total_price': BookingView.total_price,
+    'status': BookingView.status,
+    'created_at': BookingView.created_at,
+    'updated_at': BookingView.updated_at,
+    'version': BookingView.version,
+    'accommodation_title': BookingView.title,
+    'price_per_night': BookingView.unit_price,
+    'tourist_name': BookingView.tourist_name,
+}
+TRANSPORT_COLUMNS = {
+    'id': BookingView.booking_id,
+    'tourist_id': BookingView.tourist_id,
+    'transport_id': BookingView.listing_id,
+    'itinerary_id': BookingView.itinerary_id,
+    'travel_date': BookingView.start_date,
+    'seats_booked': BookingView.seats,
+    'total_price': BookingView.total_price,
+    'status': BookingView.status,
+    'created_at': BookingView.created_at,
+    'updated_at': BookingView.updated_at,
+    'version': BookingView.version,
+    'vehicle_type': BookingView.vehicle_type,
+    'price_per_day': BookingView.unit_price,
+    'tourist_name': BookingView.tourist_name,
+}
+COLUMNS = {'accommodation': ACCOMMODATION_COLUMNS, 'transport': TRANSPORT_COLUMNS}
+
+
+def fetch(kind, fields=None, owner_id=None, tourist_id=None, listing_id=None, include_past=False):
+    """A booking list as dicts of the requested fields (all of them by default), in
+    (start_date, booking_id) order. Only those columns are selected."""
+    view_columns = COLUMNS[kind]
+    selected = tuple((name, view_columns[name]) for name in (fields or view_columns))
+    params = {'kind': kind}
+    for name, value in (('owner_id', owner_id), ('tourist_id', tourist_id), ('listing_id', listing_id)):
+        if value is not None:
+            params[name] = value
+    filters = tuple(name for name in statements.VIEW_FILTERS if name in params)
+    if not include_past:
+        params['today'] = date.today()
+    statement = statements.view_statement(kind, selected, filters, upcoming=not include_past)
+    return [dict(row) for row in db.session.execute(statement, params).mappings()]
+
+
+def upsert(booking):
+    """Copy a new or changed booking into the view; call before the commit"""
+    # Flush first so the booking has its id, version and updated_at
+    db.session.flush()
+    kind = 'accommodation' if isinstance(booking, AccommodationBooking) else 'transport'
+    # Looked up by id rather than through the relationships, which may be
+    # stale if this write moved the booking to another listing. All reads
+    # happen before the view row is touched, so autoflush never sees it half filled.
+    if kind == 'accommodation':
+        listing = db.session.get(Accommodation, booking.accommodation_id)
+    else:
+        listing = db.session.get(Transport, booking.transport_id)
+    tourist = db.session.get(User, booking.tourist_id)
+    row = db.session.get(BookingView, (kind, booking.id)) or BookingView(kind=kind, booking_id=booking.id)
+
+    if kind == 'accommodation':
+        row.owner_id = listing.host_id
+        row.title = listing.title
+        row.unit_price = listing.price_per_night
+        row.start_date = booking.check_in_date
+        row.end_date = booking.check_out_date
+    else:
+        row.owner_id = listing.driver_id
+        row.vehicle_type = listing.vehicle_type
+        row.unit_price = listing.price_per_day
+        row.start_date = booking.travel_date
+        row.end_date = booking.travel_date
+        row.seats = booking.seats_booked
+
+    row.listing_id = listing.id
+    row.tourist_id = booking.tourist_id
+    row.tourist_name = tourist.name
+    row.itinerary_id = booking.itinerary_id
+    row.total_price = booking.total_price
+    row.status = booking.status
+    row.version = booking.version
+    row.created_at = booking.created_at
+    row.updated_at = booking.updated_at
+    db.session.add(row)
+
+
+def refresh_listing(kind, listing):
+    """Push a listing's edited title/price into its bookings' view rows"""
+    if kind == 'accommodation':
+        values = {'title': listing.title, 'unit_price': listing.price_per_night}
+    else:
+        values = {'vehicle_type': listing.vehicle_type, 'unit_price': listing.price_per_day}
+    db.session.execute(
+        db.update(BookingView)
+        .where(BookingView.kind == kind, BookingView.listing_id == listing.id)
+        .values(**values)
+    )
+
+
+def remove_listing(kind, listing_id):
+    """Drop the view rows of a deleted listing's bookings"""
+    db.session.execute(
+        db.delete(BookingView).where(BookingView.kind == kind, BookingView.listing_id == listing_id)
+    )
+
+
+def _with_tourist_name(model, source):
+    """Join users for the tourist name, unless the bookings are on a shard (names are filled in after)"""
+    if sharding.users_on_other_database(model):
+        return source(db.null())
+    return source(User.name).join(User, User.id == model.tourist_id)
+
+
+def _accommodation_source(model, version):
+    return _with_tourist_name(model, lambda tourist_name: db.select(
+        db.literal('accommodation'), model.id, Accommodation.host_id, model.accommodation_id,
+        model.tourist_id, model.itinerary_id, Accommodation.title, db.null(), Accommodation.price_per_night,
+        tourist_name, model.check_in_date, model.check_out_date, db.null(),
+        model.total_price, model.status, version, model.created_at, model.updated_at
+    ).join(Accommodation, Accommodation.id == model.accommodation_id))
+
+
+def _transport_source(model, version):
+    return _with_tourist_name(model, lambda tourist_name: db.select(
+        db.literal('transport'), model.id, Transport.driver_id, model.transport_id,
+        model.tourist_id, model.itinerary_id, db.null(), Transport.vehicle_type, Transport.price_per_day,
+        tourist_name, model.travel_date, model.travel_date, model.seats_booked,
+        model.total_price, model.status, version, model.created_at, model.updated_at
+    ).join(Transport, Transport.id == model.transport_id))
+
+
+def rebuild():
+    """Regenerate the whole view from the live and archived bookings; returns the row count"""
+    columns = [
+        'kind', 'booking_id', 'owner_id', 'listing_id', 'tourist_id', 'itinerary_id', 'title',
+        'vehicle_type', 'unit_price', 'tourist_name', 'start_date', 'end_date', 'seats',
+        'total_price', 'status', 'version', 'created_at', 'updated_at'
+    ]
+    db.session.execute(db.delete(BookingView))
+    for source in (
+        _accommodation_source(AccommodationBookingArchive, db.null()),
+        _accommodation_source(AccommodationBooking, AccommodationBooking.version),
+        _transport_source(TransportBookingArchive, db.null()),
+        _transport_source(TransportBooking, TransportBooking.version),
+    ):
+        db.session.execute(db.insert(BookingView).from_select(columns, source))
+    if sharding.users_on_other_database(BookingView):
+        tourist_ids = db.session.execute(db.select(BookingView.tourist_id).distinct()).scalars().all()
+        names = sharding.tourist_names(tourist_ids)
+        if names:
+            db.session.execute(
+                db.update(BookingView.__table__)
+                .where(BookingView.__table__.c.tourist_id == db.bindparam('tourist'))
+                .values(tourist_name=db.bindparam('name')),
+                [{'tourist': tourist_id, 'name': name} for tourist_id, name in names.items()]
+            )
+    db.session.commit()
+    return db.session.query(db.func.count()).select_from(BookingView).scalar()
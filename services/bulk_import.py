@@ -0,0 +1,83 @@
+import codecs
+import csv
+
+from flask import request, current_app
+
+from extensions import db
+from schemas.validation import ValidationError
+
+# Bulk listing import.
+#
+# Rows come from a JSON array body or a CSV upload (multipart field "file",
+# or a text/csv body) and are validated one at a time as they are read.
+# Valid rows are inserted in chunks of BULK_INSERT_CHUNK_SIZE with a single
+# executemany each, and everything is committed once at the end; invalid
+# rows are skipped and reported by index.
+
+
+def request_rows():
+    """Iterator of row dicts from the request, or None if the body is neither JSON array nor CSV"""
+    if request.mimetype == 'application/json':
+        data = request.get_json(silent=True)
+        return iter(data) if isinstance(data, list) else None
+
+    if 'file' in request.files:
+        stream = request.files['file'].stream
+    elif request.mimetype == 'text/csv':
+        stream = request.stream
+    else:
+        return None
+    # iterdecode rather than TextIOWrapper: upload spools aren't full io objects on Python 3.8
+    reader = csv.DictReader(codecs.iterdecode(stream, 'utf-8-sig'))
+    # Empty cells mean "not given", like a missing JSON key
+    return ({key: value if value != '' else None for key, value in row.items()} for row in reader)
+
+
+def _insert(model, chunk):
+    result = db.session.execute(
+        db.insert(model).returning(model.id, sort_by_parameter_order=True),
+        chunk
+    )
+    return [row[0] for row in result]
+
+
+def import_rows(model, schema, rows, defaults, before_commit=None, **owner):
+    """Validate and insert rows for `model`.
+
+    `defaults` fills optional fields a row left out, so every row in a chunk
+    has the same keys and goes into the same executemany; `owner`
+    (e.g. host_id=...) is set on every row. `before_commit(created_ids)`, if
+    given, runs before the commit when anything was inserted.
+
+    Returns ({"created": [...ids], "errors": [...]}, None) or (None, error response).
+    """
+    limit = current_app.config.get("BULK_IMPORT_MAX_ROWS", 5000)
+    chunk_size = current_app.config.get("BULK_INSERT_CHUNK_SIZE", 500)
+    created = []
+    errors = []
+    chunk = []
+
+    try:
+        for index, item in enumerate(rows):
+            if index >= limit:
+                db.session.rollback()
+                return None, ({"message": "At most {} rows can be imported at once".format(limit)}, 413)
+            try:
+                values = schema.load(item)
+            except ValidationError as e:
+                errors.append({"index": index, "errors": e.errors})
+                continue
+            chunk.append(dict(defaults, **values, **owner))
+            if len(chunk) >= chunk_size:
+                created.extend(_insert(model, chunk))
+                chunk = []
+    except (csv.Error, UnicodeDecodeError) as e:
+        db.session.rollback()
+        return None, ({"message": "Could not read CSV: {}".format(e)}, 400)
+
+    if chunk:
+        created.extend(_insert(model, chunk))
+    if created and before_commit is not None:
+        before_commit(created)
+    db.session.commit()
+    return {"created": created, "errors": errors}, None
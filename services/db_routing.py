@@ -0,0 +1,145 @@
+import logging
+import random
+import threading
+import time
+
+from flask import current_app, g, has_request_context, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql import Select
+
+from services import sharding
+
+logger = logging.getLogger(__name__)
+
+# Read-replica routing.
+#
+# Set REPLICA_DATABASE_URLS (comma separated) and every plain SELECT issued
+# while handling a GET request goes to one of the replicas. Everything else
+# stays on the primary: non-GET requests, flushes, SELECT ... FOR UPDATE,
+# background jobs, CLI commands, and any GET from a user who wrote something
+# in the last REPLICA_STICKY_SECONDS (so they always read their own writes).
+
+REPLICA_BIND_PREFIX = "replica_"
+READ_METHODS = ("GET", "HEAD")
+
+_sticky_lock = threading.Lock()
+# user id -> time until which that user's reads stay on the primary.
+# Per process; with several workers a user may briefly hit a replica from
+# a worker that did not see the write, so keep the window above replica lag.
+_sticky_until = {}
+
+
+def init_app(app):
+    """Register replica binds. Must run before db.init_app(app)."""
+    urls = [u.strip() for u in app.config.get("REPLICA_DATABASE_URLS", "").split(",") if u.strip()]
+    binds = dict(app.config.get("SQLALCHEMY_BINDS") or {})
+    for i, url in enumerate(urls):
+        binds[REPLICA_BIND_PREFIX + str(i)] = url
+    app.config["SQLALCHEMY_BINDS"] = binds
+
+    if urls:
+        app.after_request(_mark_writer_sticky)
+
+
+def use_primary():
+    """Force the rest of this request onto the primary (e.g. for consistency-sensitive reads)"""
+    g.use_primary = True
+
+
+def _current_identity():
+    try:
+        return get_jwt_identity()
+    except RuntimeError:
+        pass
+    # Public endpoints (catalog GETs) don't verify the token themselves, but a
+    # logged-in host reading back a listing they just edited still needs it
+    try:
+        verify_jwt_in_request(optional=True)
+        return get_jwt_identity()
+    except Exception:
+        return None
+
+
+def _mark_writer_sticky(response):
+    if request.method not in READ_METHODS and response.status_code < 400:
+        identity = _current_identity()
+        if identity is not None:
+            window = current_app.config.get("REPLICA_STICKY_SECONDS", 5)
+            with _sticky_lock:
+                _sticky_until[identity] = time.monotonic() + window
+    return response
+
+
+def _is_sticky():
+    if not _sticky_until:
+        return False
+    identity = _current_identity()
+    if identity is None:
+        return False
+    with _sticky_lock:
+        until = _sticky_until.get(identity)
+        if until is None:
+            return False
+        if until < time.monotonic():
+            del _sticky_until[identity]
+            return False
+        return True
+
+
+def _replica_engines():
+    engines = current_app.extensions["sqlalchemy"].engines
+    return [engine for key, engine in engines.items() if key and key.startswith(REPLICA_BIND_PREFIX)]
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            # Region shard for marketplace tables (services/sharding.py); replicas are primary-only
+            shard = sharding.engine_for(mapper, clause)
+            if shard is not None:
+                return shard
+        if bind is None and self._can_use_replica(clause):
+            replicas = _replica_engines()
+            if replicas:
+                return random.choice(replicas)
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _can_use_replica(self, clause):
+        if not reads_may_use_replica():
+            return False
+        # Only plain SELECTs; locking reads and anything inside a flush need the primary
+        if not isinstance(clause, Select) or clause._for_update_arg is not None:
+            return False
+        return not (self._flushing or self.new or self.dirty or self.deleted)
+
+
+def reads_may_use_replica():
+    """Whether this context's plain SELECTs may go to a replica: a GET that isn't
+    pinned to the primary, or a fan-out thread of one (services/sharding.py)"""
+    if g.get("replica_reads") is not None:
+        return g.replica_reads
+    if not has_request_context() or request.method not in READ_METHODS:
+        return False
+    return not g.get("use_primary") and not _is_sticky()
+
+
+def copy_sqlite_primary_to_replicas():
+    """Local development stand-in for replication: snapshot the SQLite primary into each replica file"""
+    engines = current_app.extensions["sqlalchemy"].engines
+    primary = engines[None]
+    copied = []
+    for key, engine in engines.items():
+        if not key or not key.startswith(REPLICA_BIND_PREFIX):
+            continue
+        if primary.dialect.name != "sqlite" or engine.dialect.name != "sqlite":
+            raise RuntimeError("Replica snapshots are only supported between SQLite files")
+        source = primary.raw_connection()
+        target = engine.raw_connection()
+        try:
+            source.driver_connection.backup(target.driver_connection)
+        finally:
+            source.close()
+            target.close()
+        copied.append(str(engine.url))
+    return copied
@@ -0,0 +1,149 @@
+import json
+import logging
+import queue
+import threading
+
+from werkzeug.utils import import_string
+from services.representation import dumps
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """One connected client. Events wait in a bounded queue until the stream sends them."""
+
+    def __init__(self, channel, maxsize):
+        self.channel = channel
+        self.queue = queue.Queue(maxsize=maxsize)
+        # Set when the client falls too far behind; the stream then tells it to resync
+        self.overflowed = False
+
+    def get(self, timeout):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class Broker:
+    """Fan-out interface used by the booking routes and the SSE endpoints.
+
+    The default InMemoryBroker only reaches clients connected to the same
+    process. Point EVENT_BROKER at another implementation (e.g.
+    "services.events:RedisBroker") to share events between workers.
+    """
+
+    def __init__(self, app=None):
+        self.queue_size = app.config.get("SSE_QUEUE_SIZE", 100) if app else 100
+
+    def publish(self, channel, event):
+        raise NotImplementedError
+
+    def subscribe(self, channel):
+        raise NotImplementedError
+
+    def unsubscribe(self, subscription):
+        raise NotImplementedError
+
+
+class InMemoryBroker(Broker):
+    def __init__(self, app=None):
+        super().__init__(app)
+        self._lock = threading.Lock()
+        self._channels = {}
+
+    def subscribe(self, channel):
+        subscription = Subscription(channel, self.queue_size)
+        with self._lock:
+            self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._channels.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._channels[subscription.channel]
+
+    def publish(self, channel, event):
+        self._deliver(channel, event)
+
+    def _deliver(self, channel, event):
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait(event)
+            except queue.Full:
+                # Never block the publisher on a slow client: cut it loose
+                # and let it catch up through the changes feed instead
+                subscription.overflowed = True
+                self.unsubscribe(subscription)
+
+
+class RedisBroker(InMemoryBroker):
+    """Shares events between processes through Redis pub/sub.
+
+    Each process keeps its own in-memory fan-out; a single listener thread
+    per process forwards messages from Redis into it. Requires the `redis`
+    package and EVENT_BROKER_URL.
+    """
+
+    prefix = "safariconnect:"
+
+    def __init__(self, app=None):
+        super().__init__(app)
+        import redis
+
+        self._redis = redis.Redis.from_url(app.config["EVENT_BROKER_URL"])
+        self._pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.psubscribe(self.prefix + "*")
+        self._listener = threading.Thread(target=self._listen, name="event-listener", daemon=True)
+        self._listener.start()
+
+    def publish(self, channel, event):
+        self._redis.publish(self.prefix + channel, dumps(event))
+
+    def _listen(self):
+        for message in self._pubsub.listen():
+            try:
+                channel = message["channel"].decode()[len(self.prefix):]
+                self._deliver(channel, json.loads(message["data"]))
+            except Exception:
+                logger.exception("Dropped malformed broker message")
+
+
+broker = InMemoryBroker()
+
+
+def init_app(app):
+    global broker
+    path = app.config.get("EVENT_BROKER")
+    broker = import_string(path)(app) if path else InMemoryBroker(app)
+
+
+def publish(channel, event):
+    try:
+        broker.publish(channel, event)
+    except Exception:
+        # Live push is best effort; the booking itself is already committed
+        logger.exception("Failed to publish %s to %s", event.get("type"), channel)
+
+
+def stream(channel, heartbeat):
+    """Generator of Server-Sent Events for one channel, with keep-alive comments"""
+    subscription = broker.subscribe(channel)
+    try:
+        yield "retry: 5000\n\n"
+        while True:
+            if subscription.overflowed:
+                yield "event: reset\ndata: {}\n\n"
+                return
+            event = subscription.get(timeout=heartbeat)
+            if event is None:
+                yield ": heartbeat\n\n"
+                continue
+            yield "event: {}\ndata: {}\n\n".format(event["type"], dumps(event).decode())
+    finally:
+        broker.unsubscribe(subscription)
@@ -0,0 +1,124 @@
+import csv
+import io
+
+from flask import Response, current_app, stream_with_context
+
+from extensions import db
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # in the Pipfile; a bare pip install without it still serves CSV
+    pyarrow = None
+
+# Streaming CSV / Parquet exports.
+#
+# Rows are read with yield_per, which uses a server-side cursor on Postgres
+# (and fetchmany elsewhere), and each batch is encoded and sent before the
+# next one is fetched. Memory stays at one batch however many rows match.
+#
+# An export is described by a list of (name, type) columns, where type is
+# one of int, float, str, date, datetime, and the SELECTs producing them in
+# that order. Several queries (e.g. archive then live table) are written out
+# back to back.
+
+EXPORT_FORMATS = ('csv', 'parquet')
+
+
+def _batches(queries, batch_size, fill=None):
+    for query in queries:
+        result = db.session.execute(query.execution_options(yield_per=batch_size))
+        for partition in result.partitions():
+            yield fill(partition) if fill is not None else partition
+
+
+def _csv_chunks(columns, batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _ in columns])
+    for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    # Header only, when nothing matched
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+class _ChunkSink:
+    """Write-only file object for ParquetWriter; hands back what was written since the last drain"""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _arrow_schema(columns):
+    types = {
+        'int': pyarrow.int64(),
+        'float': pyarrow.float64(),
+        'str': pyarrow.string(),
+        'date': pyarrow.date32(),
+        'datetime': pyarrow.timestamp('us'),
+    }
+    return pyarrow.schema([(name, types[kind]) for name, kind in columns])
+
+
+def _parquet_chunks(columns, batches):
+    schema = _arrow_schema(columns)
+    sink = _ChunkSink()
+    writer = pyarrow.parquet.ParquetWriter(sink, schema, compression='snappy')
+    try:
+        # Each fetched batch becomes one row group, sent as soon as it's written
+        for rows in batches:
+            arrays = [pyarrow.array(values, type=field.type) for values, field in zip(zip(*rows), schema)]
+            writer.write_table(pyarrow.Table.from_arrays(arrays, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def export_response(filename, columns, queries, format, fill=None):
+    """Streaming attachment response for the given queries; fill(rows) may complete each batch before it's written"""
+    batch_size = current_app.config.get("EXPORT_BATCH_SIZE", 10000)
+    batches = _batches(queries, batch_size, fill)
+    if format == 'parquet':
+        chunks = _parquet_chunks(columns, batches)
+        mimetype = 'application/vnd.apache.parquet'
+    else:
+        chunks = _csv_chunks(columns, batches)
+        mimetype = 'text/csv'
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={
+            'Content-Disposition': 'attachment; filename="{}.{}"'.format(filename, format),
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+
+def parquet_available():
+    return pyarrow is not None
@@ -0,0 +1,155 @@
+from datetime import datetime
+
+from extensions import db
+from models import AccommodationBooking, TransportBooking, InventoryHold, Transport
+from services import statements
+from services.jobs import every
+
+# Capacity accounting shared by bookings and holds. Both count live
+# (non-cancelled) bookings plus holds that are still active and unexpired.
+
+
+def seats_taken(transport_id, travel_date, now=None, except_booking_id=0):
+    """Seats booked or held; except_booking_id leaves out a booking that is being edited"""
+    now = now or datetime.utcnow()
+    return db.session.execute(statements.SEATS_TAKEN, {
+        'transport_id': transport_id, 'travel_date': travel_date, 'now': now,
+        'except_booking_id': except_booking_id
+    }).scalar()
+
+
+def dates_taken(accommodation_id, check_in_date, check_out_date, now=None, except_booking_id=0):
+    """True if any live booking (other than except_booking_id) or active hold overlaps the stay"""
+    now = now or datetime.utcnow()
+    return bool(db.session.execute(statements.DATES_TAKEN, {
+        'accommodation_id': accommodation_id, 'check_in_date': check_in_date,
+        'check_out_date': check_out_date, 'now': now, 'except_booking_id': except_booking_id
+    }).scalar())
+
+
+def lock_transport(transport_id):
+    """The transport, row-locked for the rest of the transaction (None if it doesn't exist)"""
+    return db.session.execute(statements.LOCK_TRANSPORT, {'transport_id': transport_id}).scalars().first()
+
+
+def lock_accommodation(accommodation_id):
+    """The accommodation, row-locked for the rest of the transaction (None if it doesn't exist)"""
+    return db.session.execute(
+        statements.LOCK_ACCOMMODATION, {'accommodation_id': accommodation_id}
+    ).scalars().first()
+
+
+def seats_taken_many(transport_ids, travel_dates, now=None):
+    """Seats booked or held per (transport_id, travel_date), in one query per table"""
+    now = now or datetime.utcnow()
+    taken = {}
+    for model, seats, date_col, live in (
+        (TransportBooking, TransportBooking.seats_booked, TransportBooking.travel_date, TransportBooking.live()),
+        (InventoryHold, InventoryHold.seats, InventoryHold.travel_date, InventoryHold.active(now)),
+    ):
+        rows = db.session.query(model.transport_id, date_col, db.func.sum(seats)).filter(
+            model.transport_id.in_(transport_ids),
+            date_col.in_(travel_dates),
+            live
+        ).group_by(model.transport_id, date_col)
+        for transport_id, travel_date, count in rows:
+            key = (transport_id, travel_date)
+            taken[key] = taken.get(key, 0) + (count or 0)
+    return taken
+
+
+def stays_taken_many(accommodation_ids, first_day, last_day, now=None):
+    """(accommodation_id, check_in_date, check_out_date) of live bookings and active
+    holds on these accommodations that overlap first_day..last_day"""
+    now = now or datetime.utcnow()
+    stays = []
+    for model, live in (
+        (AccommodationBooking, AccommodationBooking.live()),
+        (InventoryHold, InventoryHold.active(now)),
+    ):
+        stays.extend(db.session.query(model.accommodation_id, model.check_in_date, model.check_out_date).filter(
+            model.accommodation_id.in_(accommodation_ids),
+            model.check_in_date < last_day,
+            model.check_out_date > first_day,
+            live
+        ).all())
+    return stays
+
+
+def available_transports(first_day, last_day, seats, vehicle_type=None, region=None, now=None):
+    """Vehicles with at least `seats` free on every day from first_day to last_day.
+
+    Bookings and active holds in the range are summed per vehicle and day,
+    and the busiest day decides what is left, all in one grouped query.
+    Returns (Transport, seats_remaining) pairs, cheapest first.
+    """
+    now = now or datetime.utcnow()
+    taken = db.union_all(
+        db.select(
+            TransportBooking.transport_id, TransportBooking.travel_date.label('day'),
+            TransportBooking.seats_booked.label('seats')
+        ).where(TransportBooking.travel_date.between(first_day, last_day), TransportBooking.live()),
+        db.select(
+            InventoryHold.transport_id, InventoryHold.travel_date.label('day'), InventoryHold.seats
+        ).where(InventoryHold.travel_date.between(first_day, last_day), InventoryHold.active(now))
+    ).subquery('taken')
+    per_day = db.select(
+        taken.c.transport_id, db.func.sum(taken.c.seats).label('seats')
+    ).group_by(taken.c.transport_id, taken.c.day).subquery('per_day')
+    busiest = db.select(
+        per_day.c.transport_id, db.func.max(per_day.c.seats).label('seats')
+    ).group_by(per_day.c.transport_id).subquery('busiest')
+
+    remaining = Transport.total_capacity - db.func.coalesce(busiest.c.seats, 0)
+    query = db.session.query(Transport, remaining.label('seats_remaining')).outerjoin(
+        busiest, busiest.c.transport_id == Transport.id
+    ).filter(
+        Transport.available.is_(True),
+        remaining >= seats
+    )
+    if vehicle_type:
+        query = query.filter(db.func.lower(Transport.vehicle_type) == vehicle_type.lower())
+    if region is not None:
+        query = query.filter(Transport.region == region)
+    return query.order_by(Transport.price_per_day, Transport.region, Transport.id).all()
+
+
+def claim_hold(hold_id, tourist_id, **expected):
+    """Convert an active hold into a booking.
+
+    `expected` holds the booking's values that must match the hold
+    (e.g. transport_id=..., travel_date=...). Returns an error message, or
+    None once the hold has been marked converted in the current transaction.
+    """
+    hold = db.session.get(InventoryHold, hold_id)
+    if hold is None or hold.tourist_id != tourist_id:
+        return "Hold not found"
+    for key, value in expected.items():
+        if getattr(hold, key) != value:
+            return "Hold does not match this booking"
+
+    # Conditional update so the same hold can't be converted twice
+    now = datetime.utcnow()
+    claimed = InventoryHold.query.filter(
+        InventoryHold.id == hold_id,
+        InventoryHold.active(now)
+    ).update({"status": "converted"}, synchronize_session=False)
+    if claimed != 1:
+        return "Hold has expired or was already used"
+    return None
+
+
+@every(60)
+def expire_holds():
+    """Mark holds past their expiry as expired.
+
+    Capacity checks already ignore expired holds, so this is housekeeping:
+    it keeps the partial indexes on active holds small.
+    """
+    now = datetime.utcnow()
+    expired = InventoryHold.query.filter(
+        InventoryHold.status == 'active',
+        InventoryHold.expires_at <= now
+    ).update({"status": "expired"}, synchronize_session=False)
+    db.session.commit()
+    return expired
@@ -0,0 +1,237 @@
+import atexit
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from flask import g
+
+from extensions import db
+from models import OutboxEvent
+from services import sharding
+
+logger = logging.getLogger(__name__)
+
+# event_type -> [function(payload), ...]
+_handlers = {}
+# "module.function" -> function, as stored in OutboxEvent.handler
+_handlers_by_name = {}
+# [function, interval_seconds, next_run] for housekeeping tasks
+_periodic = []
+
+
+def handler(event_type):
+    """Register a function to run in the background for every event of this type"""
+    def decorator(func):
+        _handlers.setdefault(event_type, []).append(func)
+        _handlers_by_name[handler_name(func)] = func
+        return func
+    return decorator
+
+
+def handler_name(func):
+    return "{}.{}".format(func.__module__, func.__name__)
+
+
+def every(seconds):
+    """Register a function to run on the worker roughly every `seconds` (checked at each poll)"""
+    def decorator(func):
+        _periodic.append([func, seconds, time.monotonic() + seconds])
+        return func
+    return decorator
+
+
+def enqueue(event_type, payload):
+    """Stage an event in the current session, one outbox row per handler.
+
+    The rows are committed together with the caller's own changes, so they
+    are only ever processed if the booking write they describe actually
+    happened. Each handler succeeds or is retried on its own, so one that
+    failed never makes the others (e.g. an email already sent) run twice.
+    Call `worker.notify()` after the commit to pick them up straight away.
+    The rows go to the current region's database, like the write itself, and
+    the handlers run in that region (services/sharding.py).
+    """
+    payload = dict(payload, region=sharding.current_region())
+    events = [
+        OutboxEvent(event_type=event_type, handler=handler_name(func), payload=payload)
+        for func in _handlers.get(event_type, [])
+    ]
+    db.session.add_all(events)
+    return events
+
+
+class JobWorker:
+    """Thread pool that drains the outbox_events table.
+
+    A dispatcher thread claims due events from each database's outbox (the
+    primary and every region shard) and hands them to the pool. Failed
+    events are retried with exponential backoff until JOB_MAX_ATTEMPTS, after
+    which they are left as "failed" for someone to look at.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pool = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get("JOBS_ENABLED", True)
+        self.max_workers = app.config.get("JOB_WORKERS", 4)
+        self.max_attempts = app.config.get("JOB_MAX_ATTEMPTS", 5)
+        self.backoff = app.config.get("JOB_RETRY_BACKOFF_SECONDS", 2)
+        self.poll_interval = app.config.get("JOB_POLL_INTERVAL_SECONDS", 5)
+        self.lease = app.config.get("JOB_LEASE_SECONDS", 60)
+        self.batch_size = app.config.get("JOB_BATCH_SIZE", 50)
+
+        # Start lazily on the first request so CLI commands (flask db ...) and
+        # the debug reloader's parent process don't spin up threads
+        app.before_request(self._ensure_started)
+        atexit.register(self.shutdown)
+
+    def _ensure_started(self):
+        if not self.enabled or self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+            self._thread = threading.Thread(target=self._run, name="job-dispatcher", daemon=True)
+            self._thread.start()
+
+    def notify(self):
+        """Wake the dispatcher after committing new events"""
+        self._ensure_started()
+        self._wake.set()
+
+    def shutdown(self, timeout=30):
+        """Stop claiming new work, run whatever is already due and wait for it.
+
+        The drain runs on the dispatcher thread itself, not the pool.
+        """
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        self._pool.shutdown(wait=True)
+        self._thread = None
+
+    # ---------- dispatcher ----------
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            self._run_periodic()
+            self._dispatch_due()
+        # Drain: keep going until nothing due is left
+        while self._dispatch_due():
+            pass
+
+    def _run_periodic(self):
+        now = time.monotonic()
+        for task in _periodic:
+            func, interval, next_run = task
+            if now < next_run:
+                continue
+            task[2] = now + interval
+            try:
+                with self.app.app_context():
+                    # Housekeeping covers every region shard
+                    sharding.each_database(func)
+            except Exception:
+                logger.exception("Periodic task %s failed", func.__name__)
+
+    def _dispatch_due(self):
+        try:
+            with self.app.app_context():
+                claimed = sharding.each_database(self._claim)
+        except Exception:
+            logger.exception("Failed to claim outbox events")
+            return []
+        jobs = [(region, event_id) for region, ids in claimed for event_id in ids]
+        futures = []
+        try:
+            # Once shutdown has started the pool may already be gone: Python
+            # stops executors at exit before atexit hooks such as ours run
+            if self._stopping.is_set():
+                raise RuntimeError("job worker is shutting down")
+            for region, event_id in jobs:
+                futures.append(self._pool.submit(self._process, region, event_id))
+        except RuntimeError:
+            # Already claimed, so run the rest here rather than leave them
+            # "processing" until their lease runs out
+            for region, event_id in jobs[len(futures):]:
+                self._process(region, event_id)
+        # Wait for the batch so a drain pass doesn't race its own retries
+        for future in futures:
+            future.result()
+        return [event_id for _, event_id in jobs]
+
+    def _claim(self):
+        now = datetime.utcnow()
+        candidates = db.session.query(OutboxEvent.id).filter(
+            OutboxEvent.status.in_(("pending", "processing")),
+            OutboxEvent.next_attempt_at <= now
+        ).order_by(OutboxEvent.id).limit(self.batch_size).all()
+
+        claimed = []
+        for (event_id,) in candidates:
+            # Conditional update so two processes never claim the same event.
+            # An expired "processing" lease means the previous worker died.
+            result = db.session.query(OutboxEvent).filter(
+                OutboxEvent.id == event_id,
+                OutboxEvent.status.in_(("pending", "processing")),
+                OutboxEvent.next_attempt_at <= now
+            ).update({
+                "status": "processing",
+                "next_attempt_at": now + timedelta(seconds=self.lease)
+            }, synchronize_session=False)
+            if result == 1:
+                claimed.append(event_id)
+        db.session.commit()
+        return claimed
+
+    def _process(self, region, event_id):
+        """Run one event from the outbox of `region`'s database"""
+        with self.app.app_context():
+            g.shard_region = region
+            event = db.session.get(OutboxEvent, event_id)
+            if event is None:
+                return
+            # The region that queued it; differs from `region` for regions sharing the primary
+            g.shard_region = event.payload.get("region") or region
+            try:
+                if event.handler is None:
+                    funcs = _handlers.get(event.event_type, [])
+                elif event.handler in _handlers_by_name:
+                    funcs = [_handlers_by_name[event.handler]]
+                else:
+                    raise LookupError("No job handler named {}".format(event.handler))
+                for func in funcs:
+                    func(event.payload)
+            except Exception as e:
+                db.session.rollback()
+                event = db.session.get(OutboxEvent, event_id)
+                event.attempts += 1
+                event.last_error = repr(e)
+                if event.attempts >= self.max_attempts:
+                    event.status = "failed"
+                    logger.error("Outbox event %s (%s) failed permanently: %r", event.id, event.event_type, e)
+                else:
+                    event.status = "pending"
+                    delay = self.backoff * (2 ** (event.attempts - 1))
+                    event.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+            else:
+                event.status = "done"
+            db.session.commit()
+
+
+worker = JobWorker()
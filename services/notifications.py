@@ -0,0 +1,82 @@
+import logging
+import smtplib
+from email.message import EmailMessage
+
+from flask import current_app
+
+from models import AccommodationBooking, TransportBooking
+from services.jobs import handler
+
+logger = logging.getLogger(__name__)
+
+# Post-booking side effects. These run on the job worker, never inside the
+# request, so adding more of them does not slow down booking endpoints.
+# Every handler gets its own outbox row (services/jobs.py), so a retry only
+# repeats the handler that failed. A handler can still run twice if the
+# worker dies between finishing it and marking the row done, so it must be
+# safe to run more than once for the same event.
+
+
+def _load_booking(payload):
+    model = AccommodationBooking if payload["kind"] == "accommodation" else TransportBooking
+    return model.query.get(payload["booking_id"])
+
+
+def send_email(to, subject, body):
+    """Send a plain-text email through MAIL_SERVER, or just log it when no server is configured"""
+    config = current_app.config
+    if not config.get("MAIL_SERVER"):
+        logger.info("Email to %s (MAIL_SERVER not set, not sent): %s", to, subject)
+        return
+    message = EmailMessage()
+    message["From"] = config["MAIL_SENDER"]
+    message["To"] = to
+    message["Subject"] = subject
+    message.set_content(body)
+    with smtplib.SMTP(config["MAIL_SERVER"], config.get("MAIL_PORT", 587), timeout=30) as smtp:
+        if config.get("MAIL_USE_TLS", True):
+            smtp.starttls()
+        if config.get("MAIL_USERNAME"):
+            smtp.login(config["MAIL_USERNAME"], config.get("MAIL_PASSWORD") or "")
+        smtp.send_message(message)
+
+
+def _confirmation_text(kind, booking):
+    if kind == "accommodation":
+        return "Your stay at {} from {} to {} is booked (booking #{}, total {:.2f}).".format(
+            booking.accommodation.title, booking.check_in_date, booking.check_out_date,
+            booking.id, booking.total_price
+        )
+    return "Your {} ride on {} for {} seat(s) is booked (booking #{}, total {:.2f}).".format(
+        booking.transport.vehicle_type, booking.travel_date, booking.seats_booked,
+        booking.id, booking.total_price
+    )
+
+
+@handler("booking.created")
+def send_booking_confirmation(payload):
+    booking = _load_booking(payload)
+    if booking is None:
+        return
+    send_email(
+        booking.tourist.email,
+        "Booking confirmation #{}".format(booking.id),
+        "Hi {},\n\n{}\n".format(booking.tourist.name, _confirmation_text(payload["kind"], booking))
+    )
+
+
+@handler("booking.created")
+@handler("booking.updated")
+@handler("booking.cancelled")
+def notify_listing_owner(payload):
+    # Host for accommodation bookings, driver for transport bookings
+    logger.info("Notify owner %s: %s booking %s %s",
+                payload.get("owner_id"), payload["kind"], payload["booking_id"], payload["action"])
+
+
+@handler("booking.created")
+@handler("booking.updated")
+@handler("booking.cancelled")
+def record_booking_analytics(payload):
+    logger.info("analytics booking_event kind=%s action=%s booking_id=%s",
+                payload["kind"], payload["action"], payload["booking_id"])
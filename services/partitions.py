@@ -0,0 +1,76 @@
+import os
+from datetime import date
+
+from sqlalchemy import event, text
+from extensions import db
+from services.sharding import SHARD_BIND_PREFIX
+
+# Archived bookings live in a separate "archive" schema so the live booking
+# tables only hold current and upcoming trips.
+#   SQLite:   a second database file ATTACHed to every connection as "archive"
+#   Postgres: a real schema whose tables are range-partitioned by month
+
+PARTITIONED_TABLES = {
+    # table -> partition key column
+    'accommodation_bookings_archive': 'check_in_date',
+    'transport_bookings_archive': 'travel_date',
+}
+
+
+def init_app(app):
+    with app.app_context():
+        # Primary plus any read replicas (services/db_routing.py) and region shards
+        engines = {key: e for key, e in db.engines.items() if e.dialect.name == 'sqlite'}
+    if not engines:
+        return
+
+    path = app.config.get("ARCHIVE_DATABASE_PATH")
+    if not path:
+        os.makedirs(app.instance_path, exist_ok=True)
+        path = os.path.join(app.instance_path, "safariconnect_archive.db")
+
+    def attach(path):
+        def attach_archive(dbapi_connection, connection_record):
+            dbapi_connection.execute("ATTACH DATABASE ? AS archive", (path,))
+        return attach_archive
+
+    base, extension = os.path.splitext(path)
+    for key, engine in engines.items():
+        # Replicas share the primary's archive; each shard archives its own bookings
+        if key and key.startswith(SHARD_BIND_PREFIX):
+            event.listen(engine, "connect", attach("{}_{}{}".format(base, key[len(SHARD_BIND_PREFIX):], extension)))
+        else:
+            event.listen(engine, "connect", attach(path))
+
+
+def _month_start(d):
+    return date(d.year, d.month, 1)
+
+
+def _next_month(d):
+    return date(d.year + 1, 1, 1) if d.month == 12 else date(d.year, d.month + 1, 1)
+
+
+def ensure_month_partitions(table, first_day, last_day):
+    """Create the monthly partitions of an archive table covering first_day..last_day.
+
+    No-op outside Postgres. Partitions must exist before rows are moved in,
+    otherwise they land in the default partition and block creating the
+    month's own partition later.
+    """
+    # The primary's or the current region's shard
+    archive_table = db.metadata.tables['archive.' + table]
+    if db.session.get_bind(clause=archive_table).dialect.name != 'postgresql':
+        return
+    connection = db.session.connection(bind_arguments={'clause': archive_table})
+    month = _month_start(first_day)
+    while month <= last_day:
+        following = _next_month(month)
+        connection.execute(text(
+            "CREATE TABLE IF NOT EXISTS archive.{table}_{year}_{month:02d} "
+            "PARTITION OF archive.{table} FOR VALUES FROM ('{start}') TO ('{end}')".format(
+                table=table, year=month.year, month=month.month,
+                start=month.isoformat(), end=following.isoformat()
+            )
+        ))
+        month = following
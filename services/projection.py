@@ -0,0 +1,40 @@
+from flask import request, current_app
+
+# ?fields= and ?ids= handling shared by the catalog and booking endpoints.
+#
+# ?fields=id,title,price_per_night limits the response to those keys; where
+# the endpoint builds its own SELECT, only those columns are loaded. ?ids=1,2,3
+# fetches several rows in one IN query instead of one request per id. Both
+# come back as (value, error response) so handlers can return the error as is.
+
+
+def parse_fields(allowed):
+    """Requested field names in `allowed` order (all of them if ?fields= is absent); id is always kept"""
+    raw = request.args.get('fields')
+    if not raw:
+        return allowed, None
+    names = {name.strip() for name in raw.split(',') if name.strip()}
+    unknown = sorted(names.difference(allowed))
+    if unknown:
+        return None, ({"message": "Unknown fields: {}".format(", ".join(unknown))}, 400)
+    return tuple(name for name in allowed if name in names or name == 'id'), None
+
+
+def parse_ids():
+    """?ids=1,2,3 as a sorted list of ints, or None when not given"""
+    raw = request.args.get('ids')
+    if raw is None:
+        return None, None
+    try:
+        ids = sorted({int(part) for part in raw.split(',') if part.strip()})
+    except ValueError:
+        return None, ({"message": "ids must be a comma separated list of integers"}, 400)
+    limit = current_app.config.get("BATCH_MAX_IDS", 100)
+    if not ids or len(ids) > limit:
+        return None, ({"message": "ids must list between 1 and {} ids".format(limit)}, 400)
+    return ids, None
+
+
+def columns(model, fields):
+    return [getattr(model, name) for name in fields]
+
@@ -0,0 +1,150 @@
+import math
+import threading
+import time
+from functools import wraps
+
+from flask import request
+from flask_jwt_extended import get_jwt_identity
+from werkzeug.utils import import_string
+
+# Per-client token buckets, configured per route group.
+#
+# RATE_LIMITS maps a group name to (requests, seconds): a client may make
+# that many requests in a burst, and gets them back at requests/seconds per
+# second. Views opt in with @rate_limit("group"); on JWT-protected views put
+# it under @jwt_required() so clients are told apart by user id rather than
+# by IP. When the bucket is empty the view isn't called and the client gets
+# 429 with Retry-After.
+#
+# The default InMemoryStore counts per process. Point RATE_LIMIT_STORE at
+# another implementation (e.g. "services.rate_limit:RedisStore") to share
+# the buckets between workers.
+
+TOO_MANY_REQUESTS = {"message": "Too many requests. Slow down and try again later."}
+
+
+class Store:
+    """Token bucket storage interface"""
+
+    def __init__(self, app=None):
+        pass
+
+    def take(self, key, capacity, rate):
+        """Take one token from the bucket; returns 0 if allowed, else seconds until one is available"""
+        raise NotImplementedError
+
+
+class InMemoryStore(Store):
+    # Above this many buckets, the ones that have refilled completely are dropped
+    # (a full bucket is the same as no bucket)
+    max_keys = 100000
+
+    def __init__(self, app=None):
+        super().__init__(app)
+        self._lock = threading.Lock()
+        # key -> [tokens, last update]
+        self._buckets = {}
+
+    def take(self, key, capacity, rate):
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.max_keys:
+                    self._prune(now, capacity, rate)
+                bucket = self._buckets[key] = [capacity, now]
+            else:
+                bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0
+            return (1 - bucket[0]) / rate
+
+    def _prune(self, now, capacity, rate):
+        # Buckets of other groups may fill at other rates; using this group's
+        # refill time is close enough to keep the table bounded
+        idle = capacity / rate
+        for key in [key for key, (_, stamp) in self._buckets.items() if now - stamp >= idle]:
+            del self._buckets[key]
+
+
+class RedisStore(Store):
+    """Buckets in Redis, shared by every worker. Requires the `redis` package
+    and RATE_LIMIT_STORE_URL."""
+
+    prefix = "safariconnect:ratelimit:"
+
+    # Refill, take and save in one round trip, atomically. Redis's own clock
+    # is used so workers on different hosts agree on the time.
+    script = """
+    local capacity = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local clock = redis.call('TIME')
+    local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'stamp')
+    local tokens = tonumber(bucket[1]) or capacity
+    local stamp = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + (now - stamp) * rate)
+    local wait = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+    else
+        wait = (1 - tokens) / rate
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'stamp', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate))
+    return tostring(wait)
+    """
+
+    def __init__(self, app=None):
+        super().__init__(app)
+        import redis
+
+        self._redis = redis.Redis.from_url(app.config["RATE_LIMIT_STORE_URL"])
+        self._take = self._redis.register_script(self.script)
+
+    def take(self, key, capacity, rate):
+        return float(self._take(keys=[self.prefix + key], args=[capacity, rate]))
+
+
+# group -> (capacity, tokens per second); empty while rate limiting is off
+_limits = {}
+store = InMemoryStore()
+
+
+def init_app(app):
+    global store
+    _limits.clear()
+    if not app.config.get("RATE_LIMIT_ENABLED", True):
+        return
+    for group, (requests, seconds) in app.config.get("RATE_LIMITS", {}).items():
+        _limits[group] = (requests, requests / seconds)
+    path = app.config.get("RATE_LIMIT_STORE")
+    store = import_string(path)(app) if path else InMemoryStore(app)
+
+
+def _client_key():
+    try:
+        identity = get_jwt_identity()
+    except RuntimeError:
+        # Not a JWT-protected view (or the decorator sits above @jwt_required)
+        identity = None
+    if identity is not None:
+        return "user:{}".format(identity)
+    return "ip:{}".format(request.remote_addr)
+
+
+def rate_limit(group):
+    """Limit the decorated view to the RATE_LIMITS[group] budget per client"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            limit = _limits.get(group)
+            if limit is not None:
+                wait = store.take("{}:{}".format(group, _client_key()), *limit)
+                if wait:
+                    return TOO_MANY_REQUESTS, 429, {"Retry-After": str(math.ceil(wait))}
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
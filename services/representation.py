@@ -0,0 +1,40 @@
+import gzip
+
+import orjson
+from flask import current_app, make_response, request
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is used when it isn't installed
+    brotli = None
+
+# JSON output for every Flask-RESTful resource (registered in app.py).
+# orjson encodes date/datetime natively, so resources can return model
+# values as-is instead of calling .isoformat() on each one.
+
+
+def dumps(data):
+    return orjson.dumps(data)
+
+
+def compress(body):
+    """Brotli or gzip the body if it's large enough and the client accepts it"""
+    if len(body) < current_app.config.get("JSON_COMPRESS_MIN_BYTES", 1024):
+        return body, None
+    accepted = request.accept_encodings
+    if brotli is not None and "br" in accepted:
+        return brotli.compress(body, quality=4), "br"
+    if "gzip" in accepted:
+        return gzip.compress(body, compresslevel=5), "gzip"
+    return body, None
+
+
+def output_json(data, code, headers=None):
+    body, encoding = compress(dumps(data))
+    response = make_response(body, code)
+    response.headers.extend(headers or {})
+    response.headers["Content-Type"] = "application/json"
+    response.vary.add("Accept-Encoding")
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    return response
@@ -0,0 +1,202 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app, g, has_app_context, request
+from sqlalchemy import MetaData
+from sqlalchemy.schema import CreateSchema
+from sqlalchemy.sql.util import find_tables
+
+# Region sharding.
+#
+# Every listing has a region. SHARD_DATABASE_URLS ("tz=sqlite:///tz.db,
+# ug=postgresql://...") gives a region its own database: the marketplace
+# tables (everything except SHARED_TABLES) of that region live there, i.e.
+# its listings with their bookings, holds, itineraries, archive, read
+# models and job outbox (so outbox rows commit with the write they
+# describe). Users and the audit trail stay on the primary, as does the data
+# of every region without its own URL.
+#
+# A request works in one region: ?region= or the X-Region header, else
+# DEFAULT_REGION. New listings get that region, and RoutingSession sends
+# every statement that reads or writes a sharded table (anywhere in it,
+# subqueries included) to its database, so the booking code runs unchanged
+# inside a region. Ids are per database, so a listing, booking or audit
+# entity is addressed by region + id; listings and audit events report
+# their `region`.
+#
+# Catalog lists without a region run on every database in parallel
+# (fan_out) and are merged in (region, id) order. The job worker drains each
+# database's outbox in that database's region; periodic tasks and the
+# maintenance commands run once per database (each_database).
+
+SHARD_BIND_PREFIX = "shard_"
+# Global tables, always on the primary
+SHARED_TABLES = frozenset(('users', 'audit_events'))
+
+_executor = None
+
+
+def init_app(app):
+    """Register shard binds. Must run before db.init_app(app)."""
+    binds = dict(app.config.get("SQLALCHEMY_BINDS") or {})
+    for region, url in parse_shard_urls(app.config.get("SHARD_DATABASE_URLS", "")).items():
+        binds[SHARD_BIND_PREFIX + region] = url
+    app.config["SQLALCHEMY_BINDS"] = binds
+    app.before_request(_select_region)
+
+
+def parse_shard_urls(value):
+    """"tz=url,ug=url" -> {"tz": url, "ug": url}"""
+    shards = {}
+    for part in value.split(","):
+        if not part.strip():
+            continue
+        region, _, url = part.partition("=")
+        if not url.strip():
+            raise ValueError("SHARD_DATABASE_URLS entries must look like region=url, got {!r}".format(part))
+        shards[region.strip()] = url.strip()
+    return shards
+
+
+def regions():
+    """Every region listings may be created in"""
+    configured = [r.strip() for r in current_app.config.get("REGIONS", "").split(",") if r.strip()]
+    default = current_app.config.get("DEFAULT_REGION", "ke")
+    return [default] + [r for r in dict.fromkeys(configured + list(shard_engines())) if r != default]
+
+
+def shard_engines():
+    """{region: engine} for the regions with their own database"""
+    engines = current_app.extensions["sqlalchemy"].engines
+    return {
+        key[len(SHARD_BIND_PREFIX):]: engine
+        for key, engine in engines.items() if key and key.startswith(SHARD_BIND_PREFIX)
+    }
+
+
+def enabled():
+    return bool(shard_engines())
+
+
+def _select_region():
+    region = request.args.get('region') or request.headers.get('X-Region')
+    if region is not None and region not in regions():
+        return {"message": "region must be one of: {}".format(", ".join(regions()))}, 400
+    g.shard_region = region or current_app.config.get("DEFAULT_REGION", "ke")
+    g.region_requested = region is not None
+
+
+def current_region():
+    if has_app_context() and g.get("shard_region"):
+        return g.shard_region
+    return current_app.config.get("DEFAULT_REGION", "ke")
+
+
+def requested_region():
+    """The region the client asked for, or None (catalog lists then cover every region)"""
+    return g.shard_region if g.get("region_requested") else None
+
+
+def _sharded(mapper, clause):
+    """Whether the statement touches a sharded table: the mapper's, else any table in
+    the clause (e.g. a bare select(exists() | exists()) on bookings and holds)"""
+    if mapper is not None:
+        return mapper.local_table.name not in SHARED_TABLES
+    if clause is None:
+        return False
+    return any(table.name not in SHARED_TABLES for table in find_tables(clause, include_crud=True))
+
+
+def engine_for(mapper=None, clause=None):
+    """Shard engine of the current region if the statement is on a sharded table, else None (primary)"""
+    if not has_app_context():
+        return None
+    engine = shard_engines().get(current_region())
+    if engine is None or not _sharded(mapper, clause):
+        return None
+    return engine
+
+
+def database_regions():
+    """One region per database: DEFAULT_REGION for the primary, then each shard's"""
+    return [current_app.config.get("DEFAULT_REGION", "ke")] + sorted(shard_engines())
+
+
+def _run_in(region, func):
+    previous = g.get("shard_region")
+    g.shard_region = region
+    try:
+        return func()
+    finally:
+        # Ids repeat across databases; don't let one region's objects answer for another's
+        current_app.extensions["sqlalchemy"].session.close()
+        g.shard_region = previous
+
+
+def each_database(func):
+    """Run func() once per database, one after the other; returns [(region, result), ...]"""
+    if not enabled():
+        return [(current_region(), func())]
+    return [(region, _run_in(region, func)) for region in database_regions()]
+
+
+def fan_out(func):
+    """Run func() once per database in parallel, each in its own app context; returns the results.
+
+    func must not touch the request: read arguments first and close over them.
+    The threads read from the primary's replicas whenever the request could.
+    """
+    if not enabled():
+        return [func()]
+    from services import db_routing
+    replica_reads = db_routing.reads_may_use_replica()
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=current_app.config.get("SHARD_FAN_OUT_WORKERS", 8), thread_name_prefix="shard"
+        )
+    app = current_app._get_current_object()
+
+    def run(region):
+        with app.app_context():
+            g.shard_region = region
+            g.replica_reads = replica_reads
+            return func()
+
+    return list(_executor.map(run, database_regions()))
+
+
+def create_shard_tables(engine):
+    """Create the sharded tables on a new shard database.
+
+    The copies leave out foreign keys to SHARED_TABLES: those rows live on
+    the primary, so the shard has nothing to point them at.
+    """
+    metadata = MetaData(naming_convention=current_app.extensions["sqlalchemy"].metadata.naming_convention)
+    for table in current_app.extensions["sqlalchemy"].metadata.sorted_tables:
+        if table.name in SHARED_TABLES:
+            continue
+        copy = table.to_metadata(metadata)
+        for constraint in list(copy.foreign_key_constraints):
+            if constraint.elements[0].target_fullname.split(".")[-2] in SHARED_TABLES:
+                copy.constraints.discard(constraint)
+                for element in constraint.elements:
+                    element.parent.foreign_keys.discard(element)
+                    copy.foreign_keys.discard(element)
+    with engine.begin() as connection:
+        if engine.dialect.name == 'postgresql':
+            connection.execute(CreateSchema("archive", if_not_exists=True))
+        metadata.create_all(connection)
+
+
+def tourist_names(ids):
+    """{user id: name} read from the primary, for rows on a shard that can't join users"""
+    if not ids:
+        return {}
+    db = current_app.extensions["sqlalchemy"]
+    from models import User
+    return dict(db.session.execute(db.select(User.id, User.name).where(User.id.in_(list(ids)))).all())
+
+
+def users_on_other_database(model):
+    """Whether `model`'s rows for the current region are on a shard, where a join with users won't work"""
+    return engine_for(clause=model.__table__) is not None
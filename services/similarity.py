@@ -0,0 +1,216 @@
+import logging
+
+from flask import current_app
+
+from extensions import db
+from models import (
+    Accommodation, AccommodationBooking, AccommodationBookingArchive, AccommodationSimilarity
+)
+from services import jobs
+from services.projection import columns
+
+try:
+    import numpy
+except ImportError:  # in the Pipfile; without it the lists aren't computed (reading them still works)
+    numpy = None
+
+logger = logging.getLogger(__name__)
+
+# "Similar accommodations", precomputed.
+#
+# Each listing becomes a feature vector: log price per night, log capacity
+# and log booking count (popularity), each standardised over all listings
+# and weighted by FEATURE_WEIGHTS. The distance between two listings is the
+# Euclidean distance between their vectors, plus LOCATION_PENALTY (in the
+# same squared units) when they are in different locations. The k closest
+# available listings are stored per listing in accommodation_similar, which
+# GET /accommodations/<id>/similar reads by primary key.
+#
+# Listing writes enqueue an "accommodation.changed" job (listing_changed());
+# refresh() then recomputes only the lists that the change can affect. New
+# bookings aren't tracked one by one, and the scaling of the features drifts
+# a little as listings come and go, so run `flask rebuild-similar` (e.g.
+# nightly) to recompute every list.
+
+FEATURE_WEIGHTS = {'price': 1.0, 'capacity': 1.0, 'popularity': 0.5}
+# About two standard deviations of price apart
+LOCATION_PENALTY = 4.0
+# Accommodation columns that feed the vectors; other edits leave the lists alone
+FEATURE_FIELDS = ('price_per_night', 'capacity', 'location', 'available')
+# Rows of the distance matrix computed at a time, to bound memory on big catalogs
+CHUNK_SIZE = 512
+
+
+def available():
+    return numpy is not None
+
+
+def listing_changed(ids):
+    """Stage a refresh for these accommodation ids; commits with the caller's write"""
+    jobs.enqueue("accommodation.changed", {"ids": list(ids)})
+
+
+def _top_k():
+    return current_app.config.get("SIMILAR_TOP_K", 10)
+
+
+def _load():
+    """ids, weighted feature matrix, location codes and availability mask for every listing"""
+    popularity = {}
+    for model in (AccommodationBookingArchive, AccommodationBooking):
+        counts = db.session.execute(
+            db.select(model.accommodation_id, db.func.count())
+            .where(model.status != db.literal_column("'cancelled'"))
+            .group_by(model.accommodation_id)
+        )
+        for accommodation_id, count in counts:
+            popularity[accommodation_id] = popularity.get(accommodation_id, 0) + count
+
+    rows = db.session.execute(
+        db.select(
+            Accommodation.id, Accommodation.price_per_night, Accommodation.capacity,
+            Accommodation.location, Accommodation.available
+        ).order_by(Accommodation.id)
+    ).all()
+    if not rows:
+        return numpy.zeros(0, dtype=numpy.int64), numpy.zeros((0, 3)), numpy.zeros(0, dtype=numpy.int64), \
+            numpy.zeros(0, dtype=bool)
+
+    ids, prices, capacities, locations, flags = zip(*rows)
+    ids = numpy.array(ids, dtype=numpy.int64)
+    features = numpy.log1p(numpy.column_stack([
+        numpy.maximum(numpy.array(prices, dtype=float), 0),
+        numpy.maximum(numpy.array(capacities, dtype=float), 0),
+        numpy.array([popularity.get(i, 0) for i in ids.tolist()], dtype=float),
+    ]))
+    spread = features.std(axis=0)
+    features = (features - features.mean(axis=0)) / numpy.where(spread > 0, spread, 1)
+    features *= numpy.array([FEATURE_WEIGHTS['price'], FEATURE_WEIGHTS['capacity'], FEATURE_WEIGHTS['popularity']])
+    # "Nairobi " and "nairobi" are the same place
+    _, codes = numpy.unique([location.strip().lower() for location in locations], return_inverse=True)
+    return ids, features, codes.reshape(-1), numpy.array(flags, dtype=bool)
+
+
+def _distances(rows, features, codes, candidates):
+    """Squared distances from each listing in `rows` (indices) to every listing; inf where not a candidate"""
+    norms = (features ** 2).sum(axis=1)
+    distances = norms[rows, None] + norms[None, :] - 2 * features[rows] @ features.T
+    distances += LOCATION_PENALTY * (codes[rows, None] != codes[None, :])
+    numpy.maximum(distances, 0, out=distances)
+    distances[:, ~candidates] = numpy.inf
+    distances[numpy.arange(len(rows)), rows] = numpy.inf  # never similar to itself
+    return distances
+
+
+def _neighbours(rows, ids, features, codes, candidates, k):
+    """{listing id: [(similar id, score), ...]} for the listings at `rows`"""
+    result = {}
+    if k <= 0 or len(ids) < 2:
+        return {int(ids[row]): [] for row in rows}
+    take = min(k, len(ids) - 1)
+    for start in range(0, len(rows), CHUNK_SIZE):
+        chunk = rows[start:start + CHUNK_SIZE]
+        distances = _distances(chunk, features, codes, candidates)
+        # k smallest per row without sorting the whole row, then order those k
+        nearest = numpy.argpartition(distances, take - 1, axis=1)[:, :take]
+        nearest_distances = numpy.take_along_axis(distances, nearest, axis=1)
+        order = numpy.argsort(nearest_distances, axis=1, kind='stable')
+        nearest = numpy.take_along_axis(nearest, order, axis=1)
+        nearest_distances = numpy.take_along_axis(nearest_distances, order, axis=1)
+        scores = numpy.round(1 / (1 + numpy.sqrt(nearest_distances)), 4)
+        for row, row_nearest, row_scores in zip(chunk.tolist(), nearest.tolist(), scores.tolist()):
+            result[int(ids[row])] = [
+                (int(ids[other]), score) for other, score in zip(row_nearest, row_scores) if score > 0
+            ]
+    return result
+
+
+def _store(neighbours):
+    """Insert the lists in `neighbours`; the caller has deleted the old ones"""
+    values = [
+        {'accommodation_id': accommodation_id, 'rank': rank, 'similar_id': similar_id, 'score': score}
+        for accommodation_id, similar in neighbours.items()
+        for rank, (similar_id, score) in enumerate(similar, start=1)
+    ]
+    if values:
+        db.session.execute(db.insert(AccommodationSimilarity), values)
+
+
+def rebuild():
+    """Recompute every listing's neighbours; returns the number of listings"""
+    ids, features, codes, candidates = _load()
+    db.session.execute(db.delete(AccommodationSimilarity))
+    _store(_neighbours(numpy.arange(len(ids)), ids, features, codes, candidates, _top_k()))
+    db.session.commit()
+    return len(ids)
+
+
+def refresh(changed_ids):
+    """Recompute the lists a change to `changed_ids` can affect (caller commits)"""
+    changed_ids = set(changed_ids)
+    ids, features, codes, candidates = _load()
+    k = _top_k()
+    row_of = {listing_id: row for row, listing_id in enumerate(ids.tolist())}
+
+    # Deleted listings: drop their own lists; the lists they appear in are redone below
+    deleted = [listing_id for listing_id in changed_ids if listing_id not in row_of]
+    if deleted:
+        db.session.execute(db.delete(AccommodationSimilarity).where(
+            AccommodationSimilarity.accommodation_id.in_(deleted)
+        ))
+
+    # Lists that contain a changed listing: it may have moved away or become unavailable
+    affected = set(db.session.execute(
+        db.select(AccommodationSimilarity.accommodation_id)
+        .where(AccommodationSimilarity.similar_id.in_(list(changed_ids)))
+    ).scalars())
+
+    changed_rows = numpy.array([row_of[i] for i in changed_ids if i in row_of], dtype=numpy.int64)
+    if len(changed_rows):
+        affected.update(ids[changed_rows].tolist())
+        # Lists a changed listing now belongs in: closer than their current k-th entry
+        worst = dict(db.session.execute(
+            db.select(AccommodationSimilarity.accommodation_id, db.func.min(AccommodationSimilarity.score))
+            .group_by(AccommodationSimilarity.accommodation_id)
+            .having(db.func.count() >= k)
+        ).all())
+        threshold = numpy.array([worst.get(i, 0.0) for i in ids.tolist()])
+        # Distances are symmetric, so one (changed x all) block answers this
+        # for every list; unavailable listings don't enter any list
+        entering = changed_rows[candidates[changed_rows]]
+        if len(entering):
+            scores = 1 / (1 + numpy.sqrt(_distances(entering, features, codes, numpy.ones(len(ids), dtype=bool))))
+            affected.update(ids[(scores > threshold[None, :]).any(axis=0)].tolist())
+
+    rows = numpy.array(sorted(row_of[i] for i in affected if i in row_of), dtype=numpy.int64)
+    if len(rows):
+        db.session.execute(db.delete(AccommodationSimilarity).where(
+            AccommodationSimilarity.accommodation_id.in_(ids[rows].tolist())
+        ))
+    _store(_neighbours(rows, ids, features, codes, candidates, k))
+    return len(rows)
+
+
+def fetch(accommodation_id, fields, limit):
+    """Stored neighbours of a listing, closest first, with the requested Accommodation columns and score"""
+    return [
+        dict(row) for row in db.session.execute(
+            db.select(*columns(Accommodation, fields), AccommodationSimilarity.score)
+            .join(Accommodation, Accommodation.id == AccommodationSimilarity.similar_id)
+            .where(
+                AccommodationSimilarity.accommodation_id == accommodation_id,
+                # Changed since the list was computed and the refresh hasn't run yet
+                Accommodation.available.is_(True)
+            )
+            .order_by(AccommodationSimilarity.rank)
+            .limit(limit)
+        ).mappings()
+    ]
+
+
+@jobs.handler("accommodation.changed")
+def refresh_similar(payload):
+    if numpy is None:
+        logger.warning("numpy is not installed; similar accommodations are not refreshed")
+        return
+    refresh(payload["ids"])
@@ -0,0 +1,128 @@
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+from flask import has_request_context, request
+from sqlalchemy import event
+
+from extensions import db
+
+logger = logging.getLogger(__name__)
+
+# Slow-query log.
+#
+# With SLOW_QUERY_MS set, every statement that takes at least that long is
+# written to a rotating JSON-lines file (SLOW_QUERY_LOG_PATH) together with
+# its parameters, the request that issued it and the database's plan for it:
+# EXPLAIN QUERY PLAN on SQLite, EXPLAIN on Postgres (EXPLAIN ANALYZE with
+# SLOW_QUERY_EXPLAIN_ANALYZE, SELECTs only, since ANALYZE runs the query
+# again). The plan is taken right after the slow run, on the same connection,
+# so it sees the same data and indexes.
+
+EXPLAINABLE = ('SELECT', 'WITH', 'UPDATE', 'DELETE')
+
+slow_log = logging.getLogger("safariconnect.slow_queries")
+
+
+def init_app(app):
+    threshold = app.config.get("SLOW_QUERY_MS")
+    if not threshold:
+        return
+
+    path = app.config.get("SLOW_QUERY_LOG_PATH")
+    if not path:
+        os.makedirs(app.instance_path, exist_ok=True)
+        path = os.path.join(app.instance_path, "slow_queries.log")
+    handler = RotatingFileHandler(
+        path,
+        maxBytes=app.config.get("SLOW_QUERY_LOG_MAX_BYTES", 10 * 1024 * 1024),
+        backupCount=app.config.get("SLOW_QUERY_LOG_BACKUPS", 5)
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    slow_log.addHandler(handler)
+    slow_log.setLevel(logging.INFO)
+    # Only the file; keep these out of the app's console logging
+    slow_log.propagate = False
+
+    analyze = app.config.get("SLOW_QUERY_EXPLAIN_ANALYZE", False)
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_start"] = time.perf_counter()
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.pop("query_start", None)
+        if started is None:
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms < threshold:
+            return
+        # executemany runs one statement per parameter set; there's no single plan to show
+        plan = None if executemany else _explain(conn, statement, parameters, analyze)
+        _log(statement, parameters, elapsed_ms, plan)
+
+    with app.app_context():
+        # Primary plus any read replicas (services/db_routing.py)
+        for engine in db.engines.values():
+            event.listen(engine, "before_cursor_execute", before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", after_cursor_execute)
+
+
+def _route():
+    if not has_request_context():
+        return None
+    return "{} {}".format(request.method, request.path)
+
+
+def _explain(conn, statement, parameters, analyze):
+    """Plan lines for `statement`, or None if it can't be explained"""
+    if not statement.lstrip().upper().startswith(EXPLAINABLE):
+        return None
+    dialect = conn.dialect.name
+    if dialect == 'sqlite':
+        prefix = "EXPLAIN QUERY PLAN "
+    elif dialect == 'postgresql':
+        select = statement.lstrip().upper().startswith(('SELECT', 'WITH'))
+        prefix = "EXPLAIN (ANALYZE, BUFFERS) " if analyze and select else "EXPLAIN "
+    else:
+        return None
+
+    # Straight on the DBAPI connection: going through `conn` would fire these
+    # hooks again and could log the EXPLAIN itself
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        if dialect == 'postgresql':
+            # A failed EXPLAIN must not abort the request's transaction
+            cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            cursor.execute(prefix + statement, parameters)
+            rows = cursor.fetchall()
+        except Exception as e:
+            if dialect == 'postgresql':
+                cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            return ["EXPLAIN failed: {!r}".format(e)]
+        if dialect == 'postgresql':
+            cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+    except Exception:
+        logger.exception("Could not capture a plan for a slow query")
+        return None
+    finally:
+        cursor.close()
+
+    if dialect == 'sqlite':
+        # (id, parent, notused, detail)
+        return [row[3] for row in rows]
+    return [row[0] for row in rows]
+
+
+def _log(statement, parameters, elapsed_ms, plan):
+    slow_log.info(json.dumps({
+        "time": datetime.utcnow().isoformat(),
+        "duration_ms": round(elapsed_ms, 1),
+        "route": _route(),
+        "statement": statement,
+        "parameters": parameters,
+        "plan": plan,
+    }, default=str))
@@ -0,0 +1,88 @@
+from sqlalchemy import bindparam
+
+from extensions import db
+from models import AccommodationBooking, TransportBooking, InventoryHold, Accommodation, Transport, BookingView
+
+# Prebuilt statements for the booking hot paths.
+#
+# These are built once at import with bindparam() placeholders and executed
+# with a dict of values, e.g.
+#     db.session.execute(statements.SEATS_TAKEN, {'transport_id': ..., ...})
+# A statement object memoizes its cache key, so reusing the same one skips
+# both building the Select and walking it to look up the compiled SQL; only
+# the parameter values change per request (see benchmarks/booking_statements.py).
+#
+# lambda_stmt() would avoid the rebuild too, but under the ORM it re-clones
+# the statement on every execution to swap in new values, which measured
+# slower than building the Query each time.
+
+# SELECT ... FOR UPDATE of one transport, serialising seat checks on it
+LOCK_TRANSPORT = db.select(Transport).where(Transport.id == bindparam('transport_id')).with_for_update()
+# Same for an accommodation, for booking edits that move dates
+LOCK_ACCOMMODATION = db.select(Accommodation).where(
+    Accommodation.id == bindparam('accommodation_id')
+).with_for_update()
+
+# Seats of live bookings plus active holds on one vehicle and day, as one
+# scalar. :except_booking_id leaves out a booking being edited (0 for none).
+SEATS_TAKEN = db.select(
+    db.select(db.func.coalesce(db.func.sum(TransportBooking.seats_booked), 0)).where(
+        TransportBooking.transport_id == bindparam('transport_id'),
+        TransportBooking.travel_date == bindparam('travel_date'),
+        TransportBooking.live(),
+        TransportBooking.id != bindparam('except_booking_id')
+    ).scalar_subquery()
+    + db.select(db.func.coalesce(db.func.sum(InventoryHold.seats), 0)).where(
+        InventoryHold.transport_id == bindparam('transport_id'),
+        InventoryHold.travel_date == bindparam('travel_date'),
+        InventoryHold.active(bindparam('now'))
+    ).scalar_subquery()
+)
+
+# Whether a live booking (other than :except_booking_id) or active hold overlaps the stay
+DATES_TAKEN = db.select(
+    db.exists().where(
+        AccommodationBooking.accommodation_id == bindparam('accommodation_id'),
+        AccommodationBooking.check_in_date < bindparam('check_out_date'),
+        AccommodationBooking.check_out_date > bindparam('check_in_date'),
+        AccommodationBooking.live(),
+        AccommodationBooking.id != bindparam('except_booking_id')
+    )
+    | db.exists().where(
+        InventoryHold.accommodation_id == bindparam('accommodation_id'),
+        InventoryHold.check_in_date < bindparam('check_out_date'),
+        InventoryHold.check_out_date > bindparam('check_in_date'),
+        InventoryHold.active(bindparam('now'))
+    )
+)
+
+# booking_view list statements, one per kind, ?fields= selection and
+# combination of filters; built on first use since each list endpoint only
+# ever needs a few of them. Past VIEW_STATEMENT_CACHE_SIZE odd field
+# combinations are built per call instead of cached.
+VIEW_FILTERS = {
+    'owner_id': BookingView.owner_id,
+    'tourist_id': BookingView.tourist_id,
+    'listing_id': BookingView.listing_id,
+}
+VIEW_STATEMENT_CACHE_SIZE = 256
+_view_statements = {}
+
+
+def view_statement(kind, selected, filters, upcoming):
+    """booking_view SELECT of `selected` ((name, column) pairs, labelled by name) for one kind,
+    narrowed by the named VIEW_FILTERS (and end_date >= :today if upcoming)"""
+    key = (kind, tuple(name for name, _ in selected), filters, upcoming)
+    statement = _view_statements.get(key)
+    if statement is None:
+        statement = db.select(*[column.label(name) for name, column in selected]).where(
+            BookingView.kind == bindparam('kind')
+        )
+        for name in filters:
+            statement = statement.where(VIEW_FILTERS[name] == bindparam(name))
+        if upcoming:
+            statement = statement.where(BookingView.end_date >= bindparam('today'))
+        statement = statement.order_by(BookingView.start_date, BookingView.booking_id)
+        if len(_view_statements) < VIEW_STATEMENT_CACHE_SIZE:
+            _view_statements[key] = statement
+    return statement
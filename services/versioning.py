@@ -0,0 +1,46 @@
+from flask import request
+from sqlalchemy.orm.exc import StaleDataError
+
+from extensions import db
+
+# Optimistic concurrency for edits.
+#
+# Versioned models carry a `version` column registered as the mapper's
+# version_id_col: SQLAlchemy bumps it on every UPDATE/DELETE and adds
+# "AND version = <version read>" to the WHERE clause, so a write based on a
+# stale read fails instead of silently overwriting someone else's change.
+# The version is exposed as the ETag; clients send it back in If-Match.
+
+PRECONDITION_FAILED = {"message": "This resource was changed by someone else. Reload it and try again."}, 412
+
+
+def etag(obj):
+    return '"{}"'.format(obj.version)
+
+
+def etag_header(obj):
+    return {'ETag': etag(obj)}
+
+
+def if_match_failed(obj):
+    """True if the request has an If-Match header that doesn't name obj's current version"""
+    if_match = request.if_match
+    if not if_match or if_match.star_tag:
+        return False
+    return not if_match.contains(str(obj.version))
+
+
+def commit_versioned(before_commit=None):
+    """Commit; returns False (after rolling back) if a versioned row changed since it was read.
+
+    before_commit, if given, runs first inside the same check; it's for writes
+    that flush to pick up the new version (e.g. the booking view).
+    """
+    try:
+        if before_commit is not None:
+            before_commit()
+        db.session.commit()
+        return True
+    except StaleDataError:
+        db.session.rollback()
+        return False
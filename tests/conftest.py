@@ -0,0 +1,97 @@
+import os
+import sys
+import tempfile
+
+import pytest
+from sqlalchemy import MetaData
+
+# Run from anywhere: the app's modules are imported from the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The app reads its configuration at import, so the test databases are set
+# up before anything imports it: a primary SQLite file, a replica file
+# (services/db_routing.py) and a shard file for the "tz" region
+# (services/sharding.py), all in a scratch directory.
+DATA_DIR = tempfile.mkdtemp(prefix="safariconnect-tests-")
+os.environ.update({
+    "DATABASE_URL": "sqlite:///" + os.path.join(DATA_DIR, "primary.db"),
+    "ARCHIVE_DATABASE_PATH": os.path.join(DATA_DIR, "archive.db"),
+    "REPLICA_DATABASE_URLS": "sqlite:///" + os.path.join(DATA_DIR, "replica.db"),
+    "SHARD_DATABASE_URLS": "tz=sqlite:///" + os.path.join(DATA_DIR, "tz.db"),
+    "SQLALCHEMY_ECHO": "false",
+    "JOBS_ENABLED": "false",
+    "AUDIT_ENABLED": "false",
+    "RATE_LIMIT_ENABLED": "false",
+    # As behind nginx: one proxy's X-Forwarded-For is trusted
+    "PROXY_COUNT": "1",
+})
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "replicas: send GET reads to the replica file (off by default)")
+
+
+@pytest.fixture
+def app(request, monkeypatch):
+    from app import app
+    from extensions import db
+    from services import analytics, db_routing, sharding
+
+    # Identities are integer user ids; newer PyJWT releases only accept string subjects
+    app.config["JWT_VERIFY_SUB"] = False
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        for engine in sharding.shard_engines().values():
+            drop_shard_tables(engine)
+            sharding.create_shard_tables(engine)
+        db_routing.copy_sqlite_primary_to_replicas()
+    db_routing._sticky_until.clear()
+    # The replica is only a snapshot, so other tests read and write the primary
+    if request.node.get_closest_marker("replicas") is None:
+        monkeypatch.setattr(db_routing, "_replica_engines", lambda: [])
+    # Per-process caches keyed by ids, which every test starts over from 1
+    analytics._cache.clear()
+    analytics._generations.clear()
+    yield app
+    db_routing._sticky_until.clear()
+
+
+def drop_shard_tables(engine):
+    # Shard tables aren't in the app's metadata for that bind; find them in the file
+    for schema in (None, "archive"):
+        metadata = MetaData()
+        metadata.reflect(engine, schema=schema)
+        metadata.drop_all(engine)
+
+
+@pytest.fixture
+def run_jobs(app):
+    """run_jobs() does one pass of the background worker over every database's outbox"""
+    from services import sharding
+    from services.jobs import worker
+
+    def run_jobs():
+        with app.app_context():
+            claimed = sharding.each_database(worker._claim)
+        for region, ids in claimed:
+            for event_id in ids:
+                worker._process(region, event_id)
+    return run_jobs
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def register(client):
+    """register(name, role) -> Authorization headers for a new user"""
+    def register(name, role):
+        response = client.post("/auth/register", json={
+            "name": name, "email": name + "@example.com", "password": "secret", "role": role
+        })
+        assert response.status_code == 201, response.get_json()
+        return {"Authorization": "Bearer " + response.get_json()["access_token"]}
+    return register
@@ -0,0 +1,49 @@
+def create(client, headers, path, **fields):
+    response = client.post(path, json=fields, headers=headers)
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()
+
+
+def test_host_occupancy_matrix(client, register):
+    host = register("host", "host")
+    tourist = register("tourist", "tourist")
+    for title in ("Cottage", "Tent"):
+        create(client, host, "/accommodations", title=title, description="-", location="Naivasha",
+               price_per_night=80, capacity=2)
+    # Runs past the window on both sides; the check-out day is not a night
+    create(client, tourist, "/accommodation_bookings", accommodation_id=1,
+           check_in_date="2099-05-30", check_out_date="2099-06-03", total_price=1)
+    create(client, tourist, "/accommodation_bookings", accommodation_id=2,
+           check_in_date="2099-06-04", check_out_date="2099-06-08", total_price=1)
+    cancelled = create(client, tourist, "/accommodation_bookings", accommodation_id=2,
+                       check_in_date="2099-06-01", check_out_date="2099-06-03", total_price=1)
+    client.delete("/accommodation_bookings/{}".format(cancelled["booking_id"]), headers=tourist)
+
+    response = client.get("/host/occupancy?from=2099-06-01&to=2099-06-05", headers=host)
+
+    assert response.status_code == 200, response.get_json()
+    body = response.get_json()
+    assert [a["title"] for a in body["accommodations"]] == ["Cottage", "Tent"]
+    assert body["occupied"] == [[1, 1, 0, 0, 0], [0, 0, 0, 1, 1]]
+    assert body["listing_occupancy"] == [0.4, 0.4]
+    assert body["daily_occupancy"] == [0.5, 0.5, 0.0, 0.5, 0.5]
+    assert body["occupancy"] == 0.4
+
+
+def test_driver_utilization_follows_new_bookings(client, register):
+    driver = register("driver", "driver")
+    tourist = register("tourist", "tourist")
+    create(client, driver, "/transports", vehicle_type="van", price_per_day=50, total_capacity=4)
+    create(client, tourist, "/transport_bookings", transport_id=1, travel_date="2099-06-02",
+           seats_booked=3, total_price=1)
+
+    url = "/driver/utilization?from=2099-06-01&to=2099-06-03"
+    assert client.get(url, headers=driver).get_json()["seats_booked"] == [[0, 3, 0]]
+
+    # The cached result is dropped by the next booking
+    create(client, tourist, "/transport_bookings", transport_id=1, travel_date="2099-06-03",
+           seats_booked=2, total_price=1)
+    body = client.get(url, headers=driver).get_json()
+    assert body["seats_booked"] == [[0, 3, 2]]
+    assert body["fill"] == [[0.0, 0.75, 0.5]]
+    assert body["fill_overall"] == round(5 / 12, 4)
@@ -0,0 +1,27 @@
+from extensions import db
+from services import statements
+from models import BookingView
+
+
+def query_plan(statement, params):
+    compiled = statement.compile(db.engine)
+    values = compiled.construct_params(params)
+    rows = db.session.connection().exec_driver_sql(
+        "EXPLAIN QUERY PLAN " + str(compiled), tuple(values[name] for name in compiled.positiontup)
+    )
+    return " ".join(row[3] for row in rows)
+
+
+def test_upcoming_lists_range_scan_end_date(app):
+    selected = (('id', BookingView.booking_id),)
+    with app.app_context():
+        for name, index in (('owner_id', 'ix_booking_view_owner_upcoming'),
+                            ('tourist_id', 'ix_booking_view_tourist_upcoming'),
+                            ('listing_id', 'ix_booking_view_listing_upcoming')):
+            statement = statements.view_statement('accommodation', selected, (name,), upcoming=True)
+            plan = query_plan(statement, {'kind': 'accommodation', name: 1, 'today': '2026-01-01'})
+            assert index in plan and 'end_date>' in plan
+
+            statement = statements.view_statement('accommodation', selected, (name,), upcoming=False)
+            plan = query_plan(statement, {'kind': 'accommodation', name: 1})
+            assert 'TEMP B-TREE' not in plan
@@ -0,0 +1,88 @@
+import threading
+
+import pytest
+
+from services import events
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    broker = events.InMemoryBroker()
+    monkeypatch.setattr(events, "broker", broker)
+    return broker
+
+
+def test_one_event_reaches_every_subscriber(broker):
+    subscriptions = [broker.subscribe("host:1") for _ in range(5)]
+    other = broker.subscribe("host:2")
+
+    events.publish("host:1", {"type": "booking.created", "booking_id": 7})
+
+    for subscription in subscriptions:
+        assert subscription.get(timeout=1) == {"type": "booking.created", "booking_id": 7}
+    assert other.get(timeout=0.01) is None
+
+
+def test_streams_receive_events_concurrently(broker):
+    count = 8
+    received = [[] for _ in range(count)]
+    subscribed = threading.Barrier(count + 1)
+
+    def listen(index):
+        lines = events.stream("driver:3", heartbeat=5)
+        next(lines)  # "retry:" preamble; subscribed from here on
+        subscribed.wait()
+        received[index].append(next(lines))
+        lines.close()
+
+    threads = [threading.Thread(target=listen, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    subscribed.wait()
+    events.publish("driver:3", {"type": "booking.cancelled", "booking_id": 4})
+    for thread in threads:
+        thread.join(5)
+
+    expected = 'event: booking.cancelled\ndata: {"type":"booking.cancelled","booking_id":4}\n\n'
+    assert received == [[expected]] * count
+    # Closing the streams unsubscribed them
+    assert "driver:3" not in broker._channels
+
+
+def test_slow_subscriber_is_dropped_without_blocking_others(broker):
+    broker.queue_size = 2
+    slow = broker.subscribe("host:1")
+    fast = broker.subscribe("host:1")
+
+    for booking_id in range(3):
+        events.publish("host:1", {"type": "booking.created", "booking_id": booking_id})
+        assert fast.get(timeout=1)["booking_id"] == booking_id
+
+    assert slow.overflowed
+    assert not fast.overflowed
+    assert broker._channels["host:1"] == {fast}
+    # Later events only go to the subscribers that kept up
+    events.publish("host:1", {"type": "booking.updated", "booking_id": 9})
+    assert fast.get(timeout=1)["booking_id"] == 9
+    assert slow.queue.qsize() == 2
+
+
+def test_overflowed_stream_tells_the_client_to_resync(broker):
+    broker.queue_size = 1
+    lines = events.stream("host:1", heartbeat=5)
+    assert next(lines) == "retry: 5000\n\n"
+
+    events.publish("host:1", {"type": "booking.created", "booking_id": 1})
+    events.publish("host:1", {"type": "booking.created", "booking_id": 2})
+
+    assert next(lines) == "event: reset\ndata: {}\n\n"
+    with pytest.raises(StopIteration):
+        next(lines)
+    assert "host:1" not in broker._channels
+
+
+def test_idle_stream_sends_heartbeats(broker):
+    lines = events.stream("host:1", heartbeat=0.01)
+    next(lines)
+    assert next(lines) == ": heartbeat\n\n"
+    lines.close()
@@ -0,0 +1,46 @@
+import csv
+import io
+
+import pyarrow.parquet
+
+
+def book_two_stays(client, register):
+    host = register("host", "host")
+    tourist = register("tourist", "tourist")
+    response = client.post("/accommodations", json={
+        "title": "Lakeside cottage", "description": "Two rooms", "location": "Naivasha",
+        "price_per_night": 80, "capacity": 2
+    }, headers=host)
+    assert response.status_code == 201, response.get_json()
+    for check_in, check_out in (("2099-03-01", "2099-03-04"), ("2099-01-10", "2099-01-12")):
+        response = client.post("/accommodation_bookings", json={
+            "accommodation_id": 1, "check_in_date": check_in, "check_out_date": check_out, "total_price": 240
+        }, headers=tourist)
+        assert response.status_code == 201, response.get_json()
+    return host
+
+
+def test_parquet_export(client, register):
+    host = book_two_stays(client, register)
+
+    response = client.get("/host/bookings/export?format=parquet", headers=host)
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/vnd.apache.parquet"
+    table = pyarrow.parquet.read_table(io.BytesIO(response.data))
+    assert table.column_names[:5] == ["id", "accommodation_id", "accommodation_title", "tourist_id", "tourist_name"]
+    rows = table.to_pylist()
+    # Ordered by check-in date
+    assert [row["id"] for row in rows] == [2, 1]
+    assert rows[0]["tourist_name"] == "tourist"
+    assert str(rows[0]["check_in_date"]) == "2099-01-10"
+
+
+def test_csv_export_filters_on_dates(client, register):
+    host = book_two_stays(client, register)
+
+    response = client.get("/host/bookings/export?from=2099-02-01", headers=host)
+
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.data.decode())))
+    assert [(row["id"], row["check_in_date"]) for row in rows] == [("1", "2099-03-01")]
@@ -0,0 +1,126 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from extensions import db
+from models import InventoryHold
+from services.inventory import expire_holds, seats_taken
+
+
+@pytest.fixture
+def people(client, register):
+    """Headers for a driver with a 3-seat vehicle (transport 1), a host with a
+    cottage (accommodation 1) and two tourists"""
+    driver = register("driver", "driver")
+    host = register("host", "host")
+    response = client.post("/transports", json={
+        "vehicle_type": "Land Cruiser", "price_per_day": 150, "total_capacity": 3
+    }, headers=driver)
+    assert response.status_code == 201, response.get_json()
+    response = client.post("/accommodations", json={
+        "title": "Lakeside cottage", "description": "Two rooms", "location": "Naivasha",
+        "price_per_night": 80, "capacity": 2
+    }, headers=host)
+    assert response.status_code == 201, response.get_json()
+    return {"alice": register("alice", "tourist"), "bob": register("bob", "tourist")}
+
+
+def hold_seats(client, headers, seats, **extra):
+    return client.post("/holds", json=dict(
+        kind="transport", transport_id=1, travel_date="2099-05-01", seats=seats, **extra
+    ), headers=headers)
+
+
+def book_seats(client, headers, seats, **extra):
+    return client.post("/transport_bookings", json=dict(
+        transport_id=1, travel_date="2099-05-01", seats_booked=seats, total_price=150.0 * seats, **extra
+    ), headers=headers)
+
+
+def hold_stay(client, headers):
+    return client.post("/holds", json={
+        "kind": "accommodation", "accommodation_id": 1, "check_in_date": "2099-05-01", "check_out_date": "2099-05-04"
+    }, headers=headers)
+
+
+def book_stay(client, headers, check_in="2099-05-03", check_out="2099-05-06"):
+    return client.post("/accommodation_bookings", json={
+        "accommodation_id": 1, "check_in_date": check_in, "check_out_date": check_out, "total_price": 240
+    }, headers=headers)
+
+
+def minutes_left(hold):
+    return round((datetime.fromisoformat(hold["expires_at"]) - datetime.fromisoformat(hold["created_at"])).total_seconds() / 60)
+
+
+def test_active_holds_count_against_seats_and_dates(app, client, people):
+    assert hold_seats(client, people["alice"], 2).status_code == 201
+    with app.app_context():
+        assert seats_taken(1, date(2099, 5, 1)) == 2
+
+    assert book_seats(client, people["bob"], 2).status_code == 400
+    assert hold_seats(client, people["bob"], 2).status_code == 409
+    assert book_seats(client, people["bob"], 1).status_code == 201
+
+    assert hold_stay(client, people["alice"]).status_code == 201
+    assert book_stay(client, people["bob"]).status_code == 409
+    assert hold_stay(client, people["bob"]).status_code == 409
+    assert book_stay(client, people["bob"], "2099-05-04", "2099-05-06").status_code == 201
+
+
+def test_expired_holds_stop_blocking(app, client, people):
+    assert hold_seats(client, people["alice"], 3).status_code == 201
+    assert hold_stay(client, people["alice"]).status_code == 201
+    with app.app_context():
+        db.session.execute(db.update(InventoryHold).values(expires_at=datetime.utcnow() - timedelta(seconds=1)))
+        db.session.commit()
+
+    # Capacity checks ignore them before the housekeeping task has run
+    assert book_seats(client, people["bob"], 3).status_code == 201
+    assert book_stay(client, people["bob"]).status_code == 201
+    with app.app_context():
+        assert expire_holds() == 2
+        assert set(db.session.execute(db.select(InventoryHold.status)).scalars()) == {"expired"}
+    assert client.get("/holds/1", headers=people["alice"]).get_json()["status"] == "expired"
+
+
+def test_hold_lifetime_is_clamped(client, people):
+    default = hold_seats(client, people["alice"], 1).get_json()["hold"]
+    too_long = hold_seats(client, people["alice"], 1, minutes=24 * 60).get_json()["hold"]
+    too_short = hold_seats(client, people["alice"], 1, minutes=0).get_json()["hold"]
+
+    assert (minutes_left(default), minutes_left(too_long), minutes_left(too_short)) == (10, 30, 1)
+
+
+def test_only_the_holder_can_see_or_release_a_hold(client, people):
+    assert hold_seats(client, people["alice"], 3).status_code == 201
+
+    assert client.get("/holds/1", headers=people["bob"]).status_code == 404
+    assert client.delete("/holds/1", headers=people["bob"]).status_code == 404
+    assert book_seats(client, people["bob"], 1).status_code == 400
+
+    response = client.delete("/holds/1", headers=people["alice"])
+    assert response.status_code == 200
+    assert response.get_json()["hold"]["status"] == "released"
+    assert book_seats(client, people["bob"], 3).status_code == 201
+
+
+def test_a_hold_becomes_a_booking_exactly_once(app, client, people):
+    assert hold_seats(client, people["alice"], 2).status_code == 201
+
+    # Only the holder, and only for what was held
+    assert book_seats(client, people["bob"], 2, hold_id=1).status_code == 409
+    response = book_seats(client, people["alice"], 1, hold_id=1)
+    assert response.status_code == 409
+    assert response.get_json()["message"] == "Hold does not match this booking"
+
+    assert book_seats(client, people["alice"], 2, hold_id=1).status_code == 201
+    response = book_seats(client, people["alice"], 2, hold_id=1)
+    assert response.status_code == 409
+    assert response.get_json()["message"] == "Hold has expired or was already used"
+
+    # The seats are counted once, as the booking
+    with app.app_context():
+        assert db.session.get(InventoryHold, 1).status == "converted"
+        assert seats_taken(1, date(2099, 5, 1)) == 2
+    assert book_seats(client, people["bob"], 1).status_code == 201
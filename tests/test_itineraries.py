@@ -0,0 +1,67 @@
+from extensions import db
+from models import (
+    AccommodationBooking, BookingView, InventoryHold, Itinerary, OutboxEvent, TransportBooking
+)
+
+
+def setup_trip(client, register):
+    """A 3-seat vehicle, a cottage, and a tourist holding the cottage; returns the tourist's headers"""
+    driver = register("driver", "driver")
+    host = register("host", "host")
+    tourist = register("tourist", "tourist")
+    assert client.post("/transports", json={
+        "vehicle_type": "Land Cruiser", "price_per_day": 150, "total_capacity": 3
+    }, headers=driver).status_code == 201
+    assert client.post("/accommodations", json={
+        "title": "Lakeside cottage", "description": "Two rooms", "location": "Naivasha",
+        "price_per_night": 80, "capacity": 2
+    }, headers=host).status_code == 201
+    assert client.post("/holds", json={
+        "kind": "accommodation", "accommodation_id": 1, "check_in_date": "2099-05-01", "check_out_date": "2099-05-04"
+    }, headers=tourist).status_code == 201
+    return tourist
+
+
+def ride(travel_date, seats):
+    return {"transport_id": 1, "travel_date": travel_date, "seats_booked": seats, "total_price": 150.0 * seats}
+
+
+ITINERARY = {
+    "accommodations": [{
+        "accommodation_id": 1, "check_in_date": "2099-05-01", "check_out_date": "2099-05-04",
+        "total_price": 240, "hold_id": 1
+    }],
+    "transports": [ride("2099-05-01", 2), ride("2099-05-04", 2), ride("2099-05-04", 2)],
+}
+
+
+def row_counts(app):
+    with app.app_context():
+        return {
+            model.__tablename__: db.session.execute(db.select(db.func.count()).select_from(model)).scalar()
+            for model in (Itinerary, AccommodationBooking, TransportBooking, BookingView, OutboxEvent)
+        }
+
+
+def test_a_conflict_in_the_last_leg_books_nothing(app, client, register):
+    tourist = setup_trip(client, register)
+    before = row_counts(app)
+
+    # The two rides home together need 4 of the 3 seats
+    response = client.post("/itineraries", json=ITINERARY, headers=tourist)
+
+    assert response.status_code == 409, response.get_json()
+    assert response.get_json()["conflicts"] == [
+        {"kind": "transport", "index": 2, "message": "Not enough seats available on this date"}
+    ]
+    assert row_counts(app) == before
+    with app.app_context():
+        # Claiming the hold was rolled back with the rest
+        assert db.session.get(InventoryHold, 1).status == "active"
+
+    # Without the last leg the same itinerary goes through
+    response = client.post("/itineraries", json=dict(ITINERARY, transports=ITINERARY["transports"][:2]), headers=tourist)
+    assert response.status_code == 201, response.get_json()
+    assert response.get_json()["transport_booking_ids"] == [1, 2]
+    with app.app_context():
+        assert db.session.get(InventoryHold, 1).status == "converted"
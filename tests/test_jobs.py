@@ -0,0 +1,97 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+
+from extensions import db
+from models import OutboxEvent
+from services import jobs
+from services.jobs import worker
+
+
+@pytest.fixture
+def handled(app, monkeypatch):
+    """{"seen": payload numbers handled, "fail": make the "test.ping" handler raise}"""
+    state = {"seen": [], "fail": False}
+
+    def ping(payload):
+        if state["fail"]:
+            raise ValueError("mail server down")
+        state["seen"].append(payload["n"])
+
+    monkeypatch.setitem(jobs._handlers, "test.ping", [ping])
+    monkeypatch.setitem(jobs._handlers_by_name, jobs.handler_name(ping), ping)
+    monkeypatch.setattr(worker, "_pool", ThreadPoolExecutor(max_workers=2))
+    yield state
+    worker._pool.shutdown()
+    worker._stopping.clear()
+
+
+def enqueue(app, *numbers):
+    with app.app_context():
+        for n in numbers:
+            jobs.enqueue("test.ping", {"n": n})
+        db.session.commit()
+
+
+def events(app):
+    with app.app_context():
+        return db.session.execute(
+            db.select(OutboxEvent.status, OutboxEvent.attempts, OutboxEvent.next_attempt_at).order_by(OutboxEvent.id)
+        ).all()
+
+
+def make_due(app):
+    with app.app_context():
+        db.session.execute(db.update(OutboxEvent).values(next_attempt_at=datetime.utcnow() - timedelta(seconds=1)))
+        db.session.commit()
+
+
+def test_shutdown_drains_claimed_events_after_the_pool_is_gone(app, handled, monkeypatch):
+    enqueue(app, 1, 2)
+    # At interpreter exit the executor has already been shut down when our hook runs
+    worker._pool.shutdown()
+    monkeypatch.setattr(worker, "_thread", threading.Thread(target=worker._run, daemon=True))
+    worker._thread.start()
+
+    worker.shutdown(timeout=10)
+
+    assert sorted(handled["seen"]) == [1, 2]
+    assert [status for status, _, _ in events(app)] == ["done", "done"]
+
+
+def test_events_claimed_while_the_pool_refuses_work_still_run(app, handled):
+    enqueue(app, 1)
+    worker._pool.shutdown()
+
+    assert len(worker._dispatch_due()) == 1
+
+    assert handled["seen"] == [1]
+    assert events(app)[0][:2] == ("done", 0)
+
+
+def test_failed_events_back_off_then_fail(app, handled, monkeypatch):
+    monkeypatch.setattr(worker, "max_attempts", 3)
+    handled["fail"] = True
+    enqueue(app, 1)
+
+    started = datetime.utcnow()
+    worker._dispatch_due()
+    status, attempts, next_attempt_at = events(app)[0]
+    assert (status, attempts) == ("pending", 1)
+    assert next_attempt_at >= started + timedelta(seconds=worker.backoff)
+    # Not due again until the backoff has passed
+    assert worker._dispatch_due() == []
+
+    make_due(app)
+    started = datetime.utcnow()
+    worker._dispatch_due()
+    status, attempts, next_attempt_at = events(app)[0]
+    assert (status, attempts) == ("pending", 2)
+    assert next_attempt_at >= started + timedelta(seconds=worker.backoff * 2)
+
+    make_due(app)
+    worker._dispatch_due()
+    assert events(app)[0][:2] == ("failed", 3)
+
@@ -0,0 +1,29 @@
+import pytest
+
+from services import rate_limit
+
+
+@pytest.fixture
+def auth_limit(app, monkeypatch):
+    """Two /auth requests per client per minute"""
+    monkeypatch.setitem(rate_limit._limits, "auth", (2, 2 / 60))
+    monkeypatch.setattr(rate_limit, "store", rate_limit.InMemoryStore(app))
+
+
+def login(client, address):
+    # The proxy in front of the app (PROXY_COUNT=1) names the client
+    return client.post("/auth/login", json={"email": "nobody@example.com", "password": "x"},
+                       headers={"X-Forwarded-For": address})
+
+
+def test_anonymous_clients_behind_the_proxy_get_their_own_budget(client, auth_limit):
+    assert login(client, "198.51.100.7").status_code != 429
+    assert login(client, "198.51.100.7").status_code != 429
+
+    response = login(client, "198.51.100.7")
+    assert response.status_code == 429
+    assert response.get_json() == rate_limit.TOO_MANY_REQUESTS
+    assert 1 <= int(response.headers["Retry-After"]) <= 30
+
+    # Another client coming through the same proxy isn't affected
+    assert login(client, "203.0.113.9").status_code != 429
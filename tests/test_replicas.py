@@ -0,0 +1,76 @@
+import sqlite3
+
+import pytest
+
+from services import db_routing
+
+pytestmark = pytest.mark.replicas
+
+
+@pytest.fixture
+def paths(app):
+    """(primary, replica) SQLite file paths"""
+    with app.app_context():
+        engines = app.extensions["sqlalchemy"].engines
+    return engines[None].url.database, engines[db_routing.REPLICA_BIND_PREFIX + "0"].url.database
+
+
+def title_in(path, accommodation_id):
+    with sqlite3.connect(path) as connection:
+        return connection.execute(
+            "SELECT title FROM accommodations WHERE id = ?", (accommodation_id,)
+        ).fetchone()[0]
+
+
+def create_listing(client, headers, title):
+    response = client.post("/accommodations", json={
+        "title": title, "description": "Two rooms", "location": "Naivasha",
+        "price_per_night": 80, "capacity": 2
+    }, headers=headers)
+    assert response.status_code == 201, response.get_json()
+
+
+def replicate(app):
+    with app.app_context():
+        db_routing.copy_sqlite_primary_to_replicas()
+
+
+def test_gets_read_from_the_replica(app, client, register, paths):
+    host = register("host", "host")
+    create_listing(client, host, "Lakeside cottage")
+    replicate(app)
+    # Replication "lags": only the primary has the new title
+    with sqlite3.connect(paths[0]) as connection:
+        connection.execute("UPDATE accommodations SET title = 'Renamed on primary' WHERE id = 1")
+
+    assert client.get("/accommodations/1").get_json()["title"] == "Lakeside cottage"
+    assert [a["title"] for a in client.get("/accommodations").get_json()] == ["Lakeside cottage"]
+
+
+def test_writes_go_to_the_primary(app, client, register, paths):
+    host = register("host", "host")
+    create_listing(client, host, "Lakeside cottage")
+    replicate(app)
+
+    response = client.patch("/accommodations/1", json={"title": "Hilltop cottage"}, headers=host)
+
+    assert response.status_code == 200, response.get_json()
+    primary, replica = paths
+    assert title_in(primary, 1) == "Hilltop cottage"
+    assert title_in(replica, 1) == "Lakeside cottage"
+
+
+def test_writer_reads_the_primary_until_the_sticky_window_ends(app, client, register, monkeypatch):
+    host = register("host", "host")
+    create_listing(client, host, "Lakeside cottage")
+    replicate(app)
+    client.patch("/accommodations/1", json={"title": "Hilltop cottage"}, headers=host)
+
+    # The writer sees their own change; everyone else still reads the replica
+    assert client.get("/accommodations/1", headers=host).get_json()["title"] == "Hilltop cottage"
+    assert client.get("/accommodations/1").get_json()["title"] == "Lakeside cottage"
+
+    # Once the window has passed, the writer is back on the replica too
+    now = db_routing.time.monotonic()
+    monkeypatch.setattr(db_routing.time, "monotonic", lambda: now + app.config["REPLICA_STICKY_SECONDS"] + 1)
+    assert client.get("/accommodations/1", headers=host).get_json()["title"] == "Lakeside cottage"
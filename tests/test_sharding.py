@@ -0,0 +1,104 @@
+import sqlite3
+
+import pytest
+
+from services import audit, sharding
+
+TZ = {"X-Region": "tz"}
+
+
+@pytest.fixture
+def paths(app):
+    """(primary, tz shard) SQLite file paths"""
+    with app.app_context():
+        engines = app.extensions["sqlalchemy"].engines
+    return engines[None].url.database, engines[sharding.SHARD_BIND_PREFIX + "tz"].url.database
+
+
+def rows_in(path, sql):
+    with sqlite3.connect(path) as connection:
+        return connection.execute(sql).fetchall()
+
+
+def create_listing(client, headers, title, region_headers=None):
+    response = client.post("/accommodations", json={
+        "title": title, "description": "Two rooms", "location": "Arusha",
+        "price_per_night": 80, "capacity": 2
+    }, headers=dict(headers, **(region_headers or {})))
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()
+
+
+def book(client, headers, check_in, check_out, region_headers=None):
+    return client.post("/accommodation_bookings", json={
+        "accommodation_id": 1, "check_in_date": check_in, "check_out_date": check_out, "total_price": 240
+    }, headers=dict(headers, **(region_headers or {})))
+
+
+def test_overlapping_stay_on_a_shard_is_refused(client, register, paths):
+    host = register("host", "host")
+    tourist = register("tourist", "tourist")
+    create_listing(client, host, "Kilimanjaro lodge", TZ)
+
+    assert book(client, tourist, "2099-03-01", "2099-03-04", TZ).status_code == 201
+    # The overlap check reads the shard's bookings, not the primary's
+    response = book(client, tourist, "2099-03-02", "2099-03-05", TZ)
+    assert response.status_code == 409, response.get_json()
+    assert rows_in(paths[1], "SELECT id FROM accommodation_bookings") == [(1,)]
+    assert rows_in(paths[0], "SELECT id FROM accommodation_bookings") == []
+
+
+def test_same_ids_in_two_regions_stay_apart(client, register):
+    host = register("host", "host")
+    tourist = register("tourist", "tourist")
+    create_listing(client, host, "Naivasha cottage")
+    create_listing(client, host, "Kilimanjaro lodge", TZ)
+
+    # Accommodation 1 exists in both regions; each has its own calendar
+    assert book(client, tourist, "2099-03-01", "2099-03-04").status_code == 201
+    assert book(client, tourist, "2099-03-01", "2099-03-04", TZ).status_code == 201
+
+    # Merged lists always say which region a row is from, even with ?fields=
+    response = client.get("/accommodations?fields=title")
+    assert response.get_json() == [
+        {"id": 1, "title": "Naivasha cottage", "region": "ke"},
+        {"id": 1, "title": "Kilimanjaro lodge", "region": "tz"},
+    ]
+    assert client.get("/accommodations?region=tz&fields=title").get_json() == [
+        {"id": 1, "title": "Kilimanjaro lodge"}
+    ]
+
+
+def test_outbox_rows_commit_with_the_booking_on_the_shard(client, register, paths, run_jobs):
+    host = register("host", "host")
+    tourist = register("tourist", "tourist")
+    create_listing(client, host, "Kilimanjaro lodge", TZ)
+    primary_jobs = rows_in(paths[0], "SELECT id FROM outbox_events")
+
+    assert book(client, tourist, "2099-03-01", "2099-03-04", TZ).status_code == 201
+
+    assert rows_in(paths[0], "SELECT id FROM outbox_events") == primary_jobs
+    shard_jobs = rows_in(paths[1], "SELECT status, payload FROM outbox_events WHERE event_type = 'booking.created'")
+    assert shard_jobs and all(status == "pending" for status, _ in shard_jobs)
+
+    run_jobs()
+
+    assert {status for (status,) in rows_in(paths[1], "SELECT status FROM outbox_events")} == {"done"}
+
+
+def test_audit_events_of_an_entity_stay_in_its_region(app, client, register, monkeypatch):
+    monkeypatch.setattr(audit.log, "enabled", True)
+    kenya_host = register("kenya", "host")
+    tanzania_host = register("tanzania", "host")
+    create_listing(client, kenya_host, "Naivasha cottage")
+    create_listing(client, tanzania_host, "Kilimanjaro lodge", TZ)
+    client.patch("/accommodations/1", json={"price_per_night": 90}, headers=dict(tanzania_host, **TZ))
+    audit.log.flush()
+
+    # Accommodation 1 in Kenya: only its own events, not those of Tanzania's accommodation 1
+    response = client.get("/audit/events?entity_type=accommodation&entity_id=1", headers=kenya_host)
+    assert response.status_code == 200, response.get_json()
+    assert [(e["action"], e["region"]) for e in response.get_json()["events"]] == [("created", "ke")]
+
+    response = client.get("/audit/events?entity_type=accommodation&entity_id=1", headers=dict(tanzania_host, **TZ))
+    assert [(e["action"], e["region"]) for e in response.get_json()["events"]] == [("updated", "tz"), ("created", "tz")]
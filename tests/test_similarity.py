@@ -0,0 +1,43 @@
+def create_listing(client, headers, title, price, capacity, location="Naivasha"):
+    response = client.post("/accommodations", json={
+        "title": title, "description": "-", "location": location,
+        "price_per_night": price, "capacity": capacity
+    }, headers=headers)
+    assert response.status_code == 201, response.get_json()
+
+
+def similar_titles(client, accommodation_id):
+    response = client.get("/accommodations/{}/similar?fields=title".format(accommodation_id))
+    assert response.status_code == 200, response.get_json()
+    return [row["title"] for row in response.get_json()]
+
+
+def test_rebuild_ranks_by_price_capacity_and_location(app, client, register):
+    host = register("host", "host")
+    create_listing(client, host, "Cottage", 80, 2)
+    create_listing(client, host, "Cabin", 90, 2)
+    create_listing(client, host, "Villa", 900, 10)
+    create_listing(client, host, "Cottage in Diani", 80, 2, location="Diani")
+
+    result = app.test_cli_runner().invoke(args=["rebuild-similar"])
+
+    assert result.exit_code == 0, result.output
+    # Same town beats an identical listing elsewhere, which beats a very different one
+    assert similar_titles(client, 1) == ["Cabin", "Cottage in Diani", "Villa"]
+
+
+def test_listing_changes_refresh_the_lists(client, register, run_jobs):
+    host = register("host", "host")
+    create_listing(client, host, "Cottage", 80, 2)
+    create_listing(client, host, "Cabin", 90, 2)
+    create_listing(client, host, "Villa", 900, 10)
+    run_jobs()
+    assert similar_titles(client, 1) == ["Cabin", "Villa"]
+
+    client.patch("/accommodations/3", json={"price_per_night": 81, "capacity": 2}, headers=host)
+    run_jobs()
+    assert similar_titles(client, 1) == ["Villa", "Cabin"]
+
+    client.patch("/accommodations/3", json={"available": False}, headers=host)
+    run_jobs()
+    assert similar_titles(client, 1) == ["Cabin"]
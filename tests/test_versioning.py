@@ -0,0 +1,61 @@
+import pytest
+
+from extensions import db
+from routes import accommodation_routes
+
+
+@pytest.fixture
+def host(client, register):
+    """Headers of a host owning accommodation 1"""
+    headers = register("host", "host")
+    response = client.post("/accommodations", json={
+        "title": "Lakeside cottage", "description": "Two rooms", "location": "Naivasha",
+        "price_per_night": 80, "capacity": 2
+    }, headers=headers)
+    assert response.status_code == 201, response.get_json()
+    return headers
+
+
+def title(client):
+    return client.get("/accommodations/1").get_json()["title"]
+
+
+def test_etag_changes_after_each_write(client, host):
+    first = client.get("/accommodations/1").headers["ETag"]
+
+    response = client.patch("/accommodations/1", json={"title": "Cottage"}, headers=dict(host, **{"If-Match": first}))
+    assert response.status_code == 200, response.get_json()
+
+    second = client.get("/accommodations/1").headers["ETag"]
+    assert second != first
+    assert response.headers["ETag"] == second
+
+
+def test_stale_if_match_is_refused(client, host):
+    stale = client.get("/accommodations/1").headers["ETag"]
+    assert client.patch("/accommodations/1", json={"title": "Cottage"}, headers=host).status_code == 200
+
+    response = client.patch("/accommodations/1", json={"title": "Villa"}, headers=dict(host, **{"If-Match": stale}))
+    assert response.status_code == 412
+    assert client.delete("/accommodations/1", headers=dict(host, **{"If-Match": stale})).status_code == 412
+    assert title(client) == "Cottage"
+
+    current = client.get("/accommodations/1").headers["ETag"]
+    assert client.delete("/accommodations/1", headers=dict(host, **{"If-Match": current})).status_code == 200
+
+
+def test_concurrent_write_between_read_and_commit_is_refused(client, host, monkeypatch):
+    def someone_else_writes(accommodation):
+        # Another request commits after this one has read the row
+        with db.engine.begin() as connection:
+            connection.execute(db.text(
+                "UPDATE accommodations SET title = 'Theirs', version = version + 1 WHERE id = :id"
+            ), {"id": accommodation.id})
+        return False
+
+    monkeypatch.setattr(accommodation_routes, "if_match_failed", someone_else_writes)
+
+    assert client.patch("/accommodations/1", json={"title": "Mine"}, headers=host).status_code == 412
+    assert title(client) == "Theirs"
+    assert client.delete("/accommodations/1", headers=host).status_code == 412
+    assert title(client) == "Theirs"
@@ -0,0 +1,23 @@
+"""Production entry point.
+
+    WORKER_MODE=threaded gunicorn -c gunicorn.conf.py wsgi:app
+
+In sync and threaded mode gunicorn.conf.py preloads this module in the
+master and calls after_fork() in every worker it forks.
+"""
+from app import app
+from extensions import db
+from services import events
+
+
+def after_fork():
+    """Make the state inherited from the preloaded master safe to use in a worker"""
+    with app.app_context():
+        for engine in db.engines.values():
+            # Forget pooled connections copied from the master; close=False
+            # leaves the sockets alone, since the master still owns them
+            engine.dispose(close=False)
+    # Threads don't survive a fork: rebuild the broker so a RedisBroker
+    # starts its listener in this process. (The job worker starts lazily on
+    # the first request, so it's already per process.)
+    events.init_app(app)